@@ -0,0 +1,222 @@
+"""
+Admission control for the AtmosAI AI Service.
+
+Each POST endpoint gets a bounded number of requests in flight. Requests
+beyond that wait in a FIFO queue of bounded depth for at most a queue
+deadline. A request that finds the queue full is rejected at once with 429,
+and one that cannot start before its deadline gets 503. Both carry a
+Retry-After estimated from the endpoint's recent service time. Under a
+traffic spike callers get a fast answer they can fall back on instead of a
+latency that grows without bound.
+
+Rejections happen in the middleware, before the request body is read.
+"""
+
+import asyncio
+import logging
+import math
+import re
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from metrics import metrics
+from responses import dumps
+
+logger = logging.getLogger(__name__)
+
+QUEUE_FULL, QUEUE_TIMEOUT = 'queue_full', 'queue_timeout'
+
+# path=max_in_flight[:max_queue[:queue_timeout_seconds]]
+LIMIT_SPEC = re.compile(r'^(/[^=\s]*)=(\d+)(?::(\d+)(?::(\d+(?:\.\d+)?))?)?$')
+
+
+class AdmissionLimit:
+    """In-flight, queue depth and queue deadline for one endpoint"""
+
+    __slots__ = ('max_in_flight', 'max_queue', 'queue_timeout')
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = max(0.0, queue_timeout)
+
+    def __repr__(self) -> str:
+        return f"AdmissionLimit({self.max_in_flight}, {self.max_queue}, {self.queue_timeout})"
+
+
+def parse_limits(spec: str, default: AdmissionLimit) -> Dict[str, AdmissionLimit]:
+    """Per-endpoint overrides from a comma-separated `path=in_flight[:queue[:timeout]]` list"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        match = LIMIT_SPEC.match(item)
+        if not match:
+            raise ValueError(f"Invalid admission limit '{item}', expected path=in_flight[:queue[:timeout]]")
+        path, in_flight, queue, timeout = match.groups()
+        limits[path] = AdmissionLimit(
+            int(in_flight),
+            int(queue) if queue is not None else default.max_queue,
+            float(timeout) if timeout is not None else default.queue_timeout
+        )
+    return limits
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Gate:
+    """Slots and waiters of one endpoint; only touched from the event loop thread"""
+
+    __slots__ = ('limit', 'in_flight', 'waiters', 'admitted', 'rejected', 'service_seconds')
+
+    def __init__(self, limit: AdmissionLimit):
+        self.limit = limit
+        self.in_flight = 0
+        self.waiters: deque = deque()
+        self.admitted = 0
+        self.rejected = {QUEUE_FULL: 0, QUEUE_TIMEOUT: 0}
+        # Moving average of how long an admitted request holds its slot
+        self.service_seconds = 0.0
+
+    def retry_after(self) -> int:
+        """Whole seconds until the current queue should have drained"""
+        backlog = (len(self.waiters) + 1) * self.service_seconds / self.limit.max_in_flight
+        return max(1, math.ceil(backlog))
+
+    def reject(self, reason: str) -> Rejected:
+        self.rejected[reason] += 1
+        return Rejected(reason, self.retry_after())
+
+    async def acquire(self) -> None:
+        if self.in_flight < self.limit.max_in_flight and not self.waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+        if len(self.waiters) >= self.limit.max_queue:
+            raise self.reject(QUEUE_FULL)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            done, _ = await asyncio.wait((waiter,), timeout=self.limit.queue_timeout)
+        except asyncio.CancelledError:
+            # The caller went away; hand over a slot it may just have been given
+            if waiter.done() and not waiter.cancelled():
+                self.release(0.0)
+            else:
+                waiter.cancel()
+                self.waiters.remove(waiter)
+            raise
+        if not done:
+            waiter.cancel()
+            self.waiters.remove(waiter)
+            raise self.reject(QUEUE_TIMEOUT)
+        # release() passed its slot on, so in_flight already counts this request
+        self.admitted += 1
+
+    def release(self, seconds: float) -> None:
+        if seconds:
+            self.service_seconds += 0.2 * (seconds - self.service_seconds)
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+class AdmissionController:
+    """Per-endpoint gates; endpoints without an override use `default`"""
+
+    def __init__(self, default: AdmissionLimit, limits: Optional[Dict[str, AdmissionLimit]] = None):
+        self.default = default
+        self.limits = limits or {}
+        self._gates: Dict[str, _Gate] = {}
+
+    def gate(self, path: str) -> _Gate:
+        gate = self._gates.get(path)
+        if gate is None:
+            gate = self._gates[path] = _Gate(self.limits.get(path, self.default))
+        return gate
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            path: {
+                'max_in_flight': gate.limit.max_in_flight,
+                'max_queue': gate.limit.max_queue,
+                'queue_timeout_s': gate.limit.queue_timeout,
+                'in_flight': gate.in_flight,
+                'queued': len(gate.waiters),
+                'admitted': gate.admitted,
+                'rejected': dict(gate.rejected),
+                'service_ms': round(gate.service_seconds * 1000, 3)
+            }
+            for path, gate in sorted(self._gates.items())
+        }
+
+    def collect(self) -> Iterable[Tuple[str, str, str, Dict[str, Any], float]]:
+        """Queue gauges and rejection counters for /metrics"""
+        for path, gate in sorted(self._gates.items()):
+            labels = {'endpoint': path}
+            yield 'admission_in_flight', 'gauge', 'Requests admitted and not yet finished', labels, gate.in_flight
+            yield 'admission_queue_depth', 'gauge', 'Requests waiting for an in-flight slot', labels, len(gate.waiters)
+            for reason, count in gate.rejected.items():
+                yield 'admission_rejected_total', 'counter', 'Requests shed by admission control', {**labels, 'reason': reason}, count
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying AdmissionController to POST requests on known routes"""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+        self.paths: Optional[frozenset] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['method'] != 'POST':
+            await self.app(scope, receive, send)
+            return
+        if self.paths is None:
+            self.paths = frozenset(route.path for route in scope['app'].routes)
+        path = scope['path']
+        if path not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        gate = self.controller.gate(path)
+        queued_at = time.perf_counter()
+        try:
+            await gate.acquire()
+        except Rejected as rejected:
+            await self.reject(send, rejected)
+            return
+        started = time.perf_counter()
+        metrics.observe_stage('queue', started - queued_at)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release(time.perf_counter() - started)
+
+    @staticmethod
+    async def reject(send: Send, rejected: Rejected) -> None:
+        if rejected.reason == QUEUE_FULL:
+            status, detail = 429, "Too many requests queued for this endpoint"
+        else:
+            status, detail = 503, "Service overloaded, request could not start in time"
+        body = dumps({"detail": detail, "reason": rejected.reason, "retry_after": rejected.retry_after})
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'retry-after', str(rejected.retry_after).encode())
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,191 @@
+"""
+Incremental alert state for the AtmosAI AI Service.
+
+AlertGenerator is stateless: every poll for a location re-creates the same
+heat or UV alert with a fresh start time, and every copy travels downstream.
+`AlertStateStore` remembers the active alert per (location, category) and
+turns each evaluation into changes only:
+
+- new: a category starts alerting. The alert gets a stable `id` and its
+  start time, which later evaluations keep.
+- updated: its type, severity or precautions changed, or its window is
+  about to run out while the condition persists. The window is then
+  extended by the alert's duration, so a steady alert is re-sent about once
+  per `refresh_fraction` of its duration instead of on every poll.
+- cleared: a category has not alerted for `clear_grace_seconds`, or its
+  window ended. It is sent once with `isActive` false.
+
+Readings quoted in titles and descriptions (AQI 120, UV 8.4, 91.3°F) do not
+count as changes; the stored alert keeps the latest text, which goes out
+with its next change and in the full state.
+
+State lives in the worker process. With several workers, the same location
+must reach the same worker for its changes to be complete.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+NEW, UPDATED, CLEARED, UNCHANGED = 'new', 'updated', 'cleared', 'unchanged'
+CHANGE_KINDS = (NEW, UPDATED, CLEARED)
+
+# Alert fields whose change is sent downstream straight away
+MATERIAL_FIELDS = ('type', 'severity', 'precautions')
+
+
+def location_key(lat: float, lng: float) -> str:
+    """Key of a location: its coordinates rounded to about 10 m"""
+    return f"{lat:.4f},{lng:.4f}"
+
+
+def _signature(alert: Dict[str, Any]) -> tuple:
+    return tuple(repr(alert.get(field)) for field in MATERIAL_FIELDS)
+
+
+class _ActiveAlert:
+    __slots__ = ('alert', 'signature', 'last_seen')
+
+    def __init__(self, alert: Dict[str, Any], now: datetime):
+        self.alert = alert
+        self.signature = _signature(alert)
+        self.last_seen = now
+
+
+class AlertChanges:
+    """What one evaluation changed for a location"""
+
+    __slots__ = ('new', 'updated', 'cleared', 'unchanged')
+
+    def __init__(self):
+        self.new: List[Dict[str, Any]] = []
+        self.updated: List[Dict[str, Any]] = []
+        self.cleared: List[Dict[str, Any]] = []
+        self.unchanged = 0
+
+    def __len__(self) -> int:
+        return len(self.new) + len(self.updated) + len(self.cleared)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'new': self.new,
+            'updated': self.updated,
+            'cleared': self.cleared,
+            'unchanged': self.unchanged
+        }
+
+
+class AlertStateStore:
+    """Thread-safe active alerts per location and category.
+
+    Locations are kept least-recently-evaluated first; past `max_locations`
+    the oldest location's state is dropped, so its next evaluation reports
+    its alerts as new again.
+    """
+
+    def __init__(self, max_locations: int = 100000, clear_grace_seconds: float = 600.0, refresh_fraction: float = 0.5):
+        self.max_locations = max(1, max_locations)
+        self.clear_grace = timedelta(seconds=max(0.0, clear_grace_seconds))
+        self.refresh_fraction = min(1.0, max(0.0, refresh_fraction))
+        self._locations: "OrderedDict[str, Dict[str, _ActiveAlert]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counts = {NEW: 0, UPDATED: 0, CLEARED: 0, UNCHANGED: 0}
+        self.evictions = 0
+
+    def update(self, key: str, alerts: Iterable[Dict[str, Any]], now: Optional[datetime] = None) -> AlertChanges:
+        """Apply the alerts generated for location `key` now and return the changes.
+
+        Alerts are AlertGenerator dicts, at most one per category; their
+        `startTime` and `endTime` give the window a new alert would get.
+        """
+        now = now or datetime.now()
+        changes = AlertChanges()
+        with self._lock:
+            existing = self._locations.get(key)
+            # A location is kept, and may evict another, only once it has active alerts
+            state = {} if existing is None else existing
+
+            seen = set()
+            for alert in alerts:
+                category = alert['category']
+                seen.add(category)
+                self._apply(state, category, alert, now, changes)
+
+            for category in [category for category in state if category not in seen]:
+                active = state[category]
+                if now - active.last_seen >= self.clear_grace or active.alert['endTime'] <= now:
+                    del state[category]
+                    changes.cleared.append({**active.alert, 'isActive': False, 'endTime': min(now, active.alert['endTime'])})
+                else:
+                    # Briefly below its threshold: stays active for now
+                    changes.unchanged += 1
+
+            if not state:
+                if existing is not None:
+                    del self._locations[key]
+            elif existing is None:
+                self._locations[key] = state
+                while len(self._locations) > self.max_locations:
+                    self._locations.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._locations.move_to_end(key)
+            for kind in CHANGE_KINDS:
+                self.counts[kind] += len(getattr(changes, kind))
+            self.counts[UNCHANGED] += changes.unchanged
+        return changes
+
+    def _apply(self, state: Dict[str, _ActiveAlert], category: str, alert: Dict[str, Any], now: datetime, changes: AlertChanges) -> None:
+        # Whole seconds: the generator reads the clock separately for start and end
+        duration = timedelta(seconds=round((alert['endTime'] - alert['startTime']).total_seconds()))
+        active = state.get(category)
+        if active is None or active.alert['endTime'] <= now:
+            # A window that ran out has ended downstream too, so this is a new alert
+            stored = {**alert, 'id': uuid.uuid4().hex, 'startTime': now, 'endTime': now + duration}
+            state[category] = _ActiveAlert(stored, now)
+            changes.new.append(dict(stored))
+            return
+
+        signature = _signature(alert)
+        stored = {**alert, 'id': active.alert['id'], 'startTime': active.alert['startTime'], 'endTime': active.alert['endTime']}
+        active.last_seen = now
+        if signature != active.signature or stored['endTime'] - now < duration * self.refresh_fraction:
+            stored['endTime'] = now + duration
+            active.alert = stored
+            active.signature = signature
+            changes.updated.append(dict(stored))
+        else:
+            active.alert = stored
+            changes.unchanged += 1
+
+    def active(self, key: str) -> List[Dict[str, Any]]:
+        """Copies of the alerts currently active for location `key`"""
+        with self._lock:
+            state = self._locations.get(key, {})
+            return [dict(active.alert) for active in state.values()]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._locations.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'locations': len(self._locations),
+                'active_alerts': sum(len(state) for state in self._locations.values()),
+                'max_locations': self.max_locations,
+                'clear_grace_seconds': self.clear_grace.total_seconds(),
+                'refresh_fraction': self.refresh_fraction,
+                'evictions': self.evictions,
+                **{kind: count for kind, count in self.counts.items()}
+            }
+
+    def collect(self) -> Iterable[Tuple[str, str, str, Dict[str, Any], float]]:
+        """State gauges and change counters for /metrics"""
+        stats = self.stats()
+        yield 'alert_state_locations', 'gauge', 'Locations with active alerts', {}, stats['locations']
+        yield 'alert_state_active', 'gauge', 'Active alerts held by the alert state store', {}, stats['active_alerts']
+        for kind in CHANGE_KINDS + (UNCHANGED,):
+            yield 'alert_state_changes_total', 'counter', 'Alerts evaluated, by the change they caused', {'change': kind}, stats[kind]
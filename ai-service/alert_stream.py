@@ -0,0 +1,132 @@
+"""
+Streaming alert generation for the AtmosAI AI Service.
+
+Reads newline-delimited JSON records (one AlertGenerationRequest per line)
+from the request body and emits alerts as newline-delimited JSON while the
+input is still arriving. Each stage is a generator, so only the record being
+processed and a partial input line are held in memory.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
+
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
+
+from metrics import metrics
+from responses import dumps
+
+logger = logging.getLogger(__name__)
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body iterator consumes the request body.
+
+    Starlette's StreamingResponse watches for disconnects by calling
+    `receive` concurrently, which would steal request body chunks from the
+    iterator. Here the iterator is the only receiver; a client disconnect
+    surfaces as ClientDisconnect from `request.stream()` and ends the response.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except ClientDisconnect:
+            return
+        if self.background is not None:
+            await self.background()
+
+
+def ndjson_line(payload: Any) -> bytes:
+    return dumps(payload) + b"\n"
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Optional[bytes]]:
+    """Split a byte stream into non-empty lines.
+
+    A line longer than `max_line_bytes` is dropped and reported as None so
+    one oversized record cannot grow the buffer without bound.
+    """
+    buffer = bytearray()
+    oversized = False
+    async for chunk in chunks:
+        buffer.extend(chunk)
+        while True:
+            newline = buffer.find(b"\n")
+            if newline < 0:
+                break
+            line = bytes(buffer[:newline]).strip()
+            del buffer[:newline + 1]
+            if oversized or len(line) > max_line_bytes:
+                oversized = False
+                yield None
+            elif line:
+                yield line
+        if len(buffer) > max_line_bytes:
+            buffer.clear()
+            oversized = True
+    line = bytes(buffer).strip()
+    if oversized or len(line) > max_line_bytes:
+        yield None
+    elif line:
+        yield line
+
+
+async def stream_alerts(
+    chunks: AsyncIterator[bytes],
+    alert_generator,
+    request_model,
+    max_line_bytes: int
+) -> AsyncIterator[bytes]:
+    """Yield one NDJSON line per alert, per failed record, and a final summary"""
+    records = 0
+    alert_count = 0
+    errors = 0
+
+    async for line in iter_lines(chunks, max_line_bytes):
+        record = records
+        records += 1
+
+        if line is None:
+            errors += 1
+            yield ndjson_line({"record": record, "error": f"Record exceeds {max_line_bytes} bytes"})
+            continue
+
+        try:
+            item = request_model.model_validate_json(line)
+        except ValidationError as e:
+            errors += 1
+            yield ndjson_line({
+                "record": record,
+                "error": "Invalid request",
+                "details": [
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                    for error in e.errors()
+                ]
+            })
+            continue
+
+        try:
+            with metrics.stage('analysis'):
+                alerts = alert_generator.generate_alerts(item.weather_data, item.location)
+        except Exception as e:
+            logger.error(f"Streaming alert generation error at record {record}: {str(e)}")
+            errors += 1
+            yield ndjson_line({"record": record, "error": "Alert generation failed"})
+            continue
+
+        for alert in alerts:
+            alert_count += 1
+            yield ndjson_line({"record": record, "alert": alert})
+
+    yield ndjson_line({
+        "summary": {
+            "records": records,
+            "alerts": alert_count,
+            "errors": errors,
+            "timestamp": datetime.now().isoformat()
+        }
+    })
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Alert change volume simulation for the AtmosAI AI Service.
+
+Polls a set of locations every few minutes over simulated days, with
+readings following each payload's hourly curve (see payloads.py), and
+compares what goes downstream: every alert of every /generate-alerts
+response, or only the new, updated and cleared alerts of
+/generate-alerts/changes. Reports alert records (Mongo writes on the
+backend) and response bytes for both.
+
+Usage:
+    python benchmarks/alert_state_benchmark.py [--locations 200] [--days 2] [--poll-minutes 5]
+        [--mixes mild mixed] [--json out.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Dict
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+logging.disable(logging.INFO)
+
+from payloads import PayloadGenerator
+
+
+def simulate(main, mix: str, args) -> Dict[str, float]:
+    """Alert records and bytes sent by both endpoints for one condition mix"""
+    from alert_state import AlertStateStore, location_key
+    from responses import dumps
+    from weather_features import WeatherFeatures
+
+    generator = PayloadGenerator(hours=args.days * 24, forecast_days=0, mix=mix, seed=args.seed)
+    store = AlertStateStore(
+        clear_grace_seconds=main.alert_state.clear_grace.total_seconds(),
+        refresh_fraction=main.alert_state.refresh_fraction
+    )
+    locations = []
+    for index in range(args.locations):
+        location = main.Location(**generator.location())
+        # Distinct coordinates per simulated location
+        location.lat += index * 0.01
+        locations.append((location, generator.weather_data()['hourly']))
+
+    start = datetime(2024, 7, 1)
+    polls_per_hour = 60 // args.poll_minutes
+    totals = {'polls': 0, 'full_alerts': 0, 'full_bytes': 0, 'change_alerts': 0, 'change_bytes': 0}
+    for hour in range(args.days * 24):
+        for poll in range(polls_per_hour):
+            now = start + timedelta(hours=hour, minutes=poll * args.poll_minutes)
+            for location, hourly in locations:
+                features = WeatherFeatures.from_current(hourly[hour])
+                alerts = main.alert_generator.generate_alerts_for(features, location)
+                totals['polls'] += 1
+                totals['full_alerts'] += len(alerts)
+                totals['full_bytes'] += len(dumps(main.build_alerts_response(alerts)))
+
+                key = location_key(location.lat, location.lng)
+                changes = store.update(key, alerts, now)
+                totals['change_alerts'] += len(changes)
+                totals['change_bytes'] += len(dumps({
+                    "location_key": key,
+                    **changes.to_dict(),
+                    "total_changes": len(changes),
+                    "timestamp": now.isoformat()
+                }))
+
+    totals['alert_reduction'] = round(totals['full_alerts'] / max(1, totals['change_alerts']), 1)
+    totals['byte_reduction'] = round(totals['full_bytes'] / max(1, totals['change_bytes']), 1)
+    return totals
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--locations', type=int, default=200, help='locations polled')
+    parser.add_argument('--days', type=int, default=2, help='simulated days')
+    parser.add_argument('--poll-minutes', type=int, default=5, help='minutes between polls of a location')
+    parser.add_argument('--mixes', nargs='+', default=['mild', 'mixed'], help='condition mixes to simulate')
+    parser.add_argument('--seed', type=int, default=0, help='payload generator seed')
+    parser.add_argument('--json', dest='json_path', help='write results to this file')
+    args = parser.parse_args()
+
+    import main
+
+    results = {mix: simulate(main, mix, args) for mix in args.mixes}
+
+    print(f"{args.locations} locations polled every {args.poll_minutes} min for {args.days} days\n")
+    print(f"{'mix':<8}{'polls':>9}{'alerts':>10}{'changes':>10}{'x':>7}{'full MB':>10}{'changes MB':>12}{'x':>7}")
+    for mix, row in results.items():
+        print(
+            f"{mix:<8}{row['polls']:>9}{row['full_alerts']:>10}{row['change_alerts']:>10}{row['alert_reduction']:>7}"
+            f"{row['full_bytes'] / 1e6:>10.2f}{row['change_bytes'] / 1e6:>12.2f}{row['byte_reduction']:>7}"
+        )
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,50 @@
+"""
+Minimal in-process HTTP client for the AtmosAI AI Service benchmarks.
+
+Calls an ASGI app directly with a prepared request body, so measurements
+include routing, validation and serialization but no sockets or test client
+overhead.
+"""
+
+import os
+from typing import Tuple
+
+API_KEY = os.getenv("AI_SERVICE_API_KEY", "default-key")
+
+
+async def post(app, path: str, body: bytes, api_key: str = API_KEY) -> Tuple[int, bytes]:
+    """Run one POST through `app` and return (status code, response body)"""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'POST',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [
+            (b'host', b'bench'),
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            (b'authorization', f'Bearer {api_key}'.encode())
+        ],
+        'client': ('127.0.0.1', 50000),
+        'server': ('127.0.0.1', 8000)
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    status = []
+    chunks = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+        elif message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+
+    await app(scope, receive, send)
+    return status[0], b''.join(chunks)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Comfort index benchmark for the AtmosAI AI Service.
+
+Computes the heat index, wind chill, dew point and apparent temperature of
+N random readings with comfort_indices.comfort_many (NumPy, whole arrays)
+and, on a sample, with the scalar functions one reading at a time, which
+is what a Python loop over the readings would cost. Every sampled scalar
+result is checked against the array result.
+
+Exits with status 1 if comfort_many takes longer than --max-seconds.
+
+Usage:
+    python benchmarks/comfort_indices_benchmark.py [--readings 1000000] [--sample 100000]
+        [--max-seconds 1.0] [--json out.json]
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+import numpy as np
+
+from comfort_indices import INDICES, ComfortIndices, comfort_many, rounded_lists
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--readings', type=int, default=1000000, help='readings computed with NumPy')
+    parser.add_argument('--sample', type=int, default=100000, help='readings computed one at a time')
+    parser.add_argument('--max-seconds', type=float, default=1.0, help='allowed time for comfort_many over --readings')
+    parser.add_argument('--seed', type=int, default=0, help='reading seed')
+    parser.add_argument('--json', dest='json_path', help='write results to this file')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    temperatures = rng.uniform(-40, 120, args.readings)
+    humidities = rng.uniform(0, 100, args.readings)
+    wind_speeds = rng.uniform(0, 60, args.readings)
+
+    started = time.perf_counter()
+    indices = comfort_many(temperatures, humidities, wind_speeds)
+    vector_s = time.perf_counter() - started
+    started = time.perf_counter()
+    rounded_lists(indices)
+    lists_s = time.perf_counter() - started
+
+    sample = min(args.sample, args.readings)
+    rows = list(zip(temperatures[:sample].tolist(), humidities[:sample].tolist(), wind_speeds[:sample].tolist()))
+    started = time.perf_counter()
+    scalar = [ComfortIndices.from_readings(*row) for row in rows]
+    scalar_s = (time.perf_counter() - started) / sample * args.readings
+
+    for index, result in enumerate(scalar):
+        for name in INDICES:
+            expected, value = indices[name][index], getattr(result, name)
+            if (value is None) != math.isnan(expected) or (value is not None and not math.isclose(value, expected, abs_tol=1e-9)):
+                raise RuntimeError(f"{name} differs for reading {rows[index]}: {value} against {expected}")
+
+    print(f"{args.readings} readings ({sample} computed one at a time and checked against the arrays)\n")
+    print(f"comfort_many       {vector_s * 1e3:>10.1f} ms  ({vector_s / args.readings * 1e9:.0f} ns per reading)")
+    print(f"  to JSON lists    {lists_s * 1e3:>10.1f} ms")
+    print(f"one at a time      {scalar_s * 1e3:>10.1f} ms  (extrapolated, {scalar_s / vector_s:.0f}x slower)")
+
+    passed = vector_s <= args.max_seconds
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({
+                'config': vars(args),
+                'vector_seconds': round(vector_s, 4),
+                'lists_seconds': round(lists_s, 4),
+                'scalar_seconds': round(scalar_s, 4),
+                'passed': passed
+            }, f, indent=2)
+
+    print()
+    if not passed:
+        print(f"FAIL: comfort_many took {vector_s:.3f} s over {args.readings} readings, more than {args.max_seconds} s")
+        sys.exit(1)
+    print("PASS")
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Request decoding benchmark for the AtmosAI AI Service.
+
+Measures CPU time and peak allocation for decoding one /analyze-weather body:
+FastAPI's default path (json.loads + full model validation), the full model
+validated from raw bytes, and the lean model used when AI_LEAN_DECODING is on.
+
+Usage:
+    python benchmarks/decoding_benchmark.py [--hours 48] [--forecast 7] [--json out.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+logging.disable(logging.INFO)
+
+import main
+
+
+def sample_body(hours: int, forecast_days: int) -> bytes:
+    hourly = [
+        {
+            'time': f'2024-07-01T{hour % 24:02d}:00:00Z',
+            'temperature': 70 + hour % 12,
+            'humidity': 55,
+            'pressure': 1012,
+            'windSpeed': 6,
+            'windDirection': 180,
+            'condition': {'main': 'Clear', 'description': 'clear sky', 'icon': '01d'},
+            'precipitation': {'probability': 10, 'amount': 0}
+        }
+        for hour in range(hours)
+    ]
+    forecast = [
+        {
+            'date': f'2024-07-{day + 1:02d}',
+            'temperature': {'min': 62, 'max': 84, 'day': 80, 'night': 64, 'eve': 75, 'morn': 63},
+            'humidity': 50,
+            'pressure': 1010,
+            'windSpeed': 8,
+            'windDirection': 200,
+            'uvIndex': 7,
+            'condition': {'main': 'Clear', 'description': 'clear sky', 'icon': '01d'},
+            'precipitation': {'probability': 5, 'amount': 0},
+            'airQuality': {'aqi': 40, 'pm25': 8, 'pm10': 14}
+        }
+        for day in range(forecast_days)
+    ]
+    return json.dumps({
+        'weather_data': {
+            'current': {'temperature': 78, 'humidity': 55, 'uvIndex': 7, 'windSpeed': 6, 'airQuality': {'aqi': 40}},
+            'forecast': forecast,
+            'hourly': hourly,
+            'alerts': []
+        },
+        'location': {'name': 'Austin, TX', 'lat': 30.2672, 'lng': -97.7431}
+    }).encode()
+
+
+def measure(func, repeat: int) -> dict:
+    timer = timeit.Timer(func)
+    per_call = min(timer.repeat(repeat=5, number=repeat)) / repeat
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'us': round(per_call * 1e6, 2), 'peak_bytes': peak}
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--hours', type=int, default=48, help='hourly entries in the payload')
+    parser.add_argument('--forecast', type=int, default=7, help='forecast days in the payload')
+    parser.add_argument('--repeat', type=int, default=500, help='decodes per timing run')
+    parser.add_argument('--json', dest='json_path', help='write results to this file')
+    args = parser.parse_args()
+
+    body = sample_body(args.hours, args.forecast)
+    modes = {
+        'fastapi-default': lambda: main.WeatherAnalysisRequest.model_validate(json.loads(body)),
+        'full-from-bytes': lambda: main.WeatherAnalysisRequest.model_validate_json(body),
+        'lean-from-bytes': lambda: main.CurrentWeatherRequest.model_validate_json(body)
+    }
+    results = {name: measure(func, args.repeat) for name, func in modes.items()}
+
+    print(f"payload: {len(body)} bytes ({args.hours} hourly, {args.forecast} forecast)")
+    print(f"{'mode':<18}{'us/decode':>12}{'peak bytes':>12}")
+    for name, row in results.items():
+        print(f"{name:<18}{row['us']:>12}{row['peak_bytes']:>12}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'payload_bytes': len(body), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main_cli()
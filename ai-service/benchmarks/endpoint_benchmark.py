@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Endpoint benchmark suite for the AtmosAI AI Service.
+
+Drives the four POST endpoints of main.py and main-simple.py with synthetic
+WeatherData payloads (see payloads.py), either in-process through the ASGI
+app or over HTTP against a local uvicorn server, and reports throughput and
+p50/p95/p99 latency per app, mode and endpoint. Results are written as JSON
+so runs can be compared for regressions.
+
+main.py serves /event-recommendations and /health-insights from its result
+cache; set AI_CACHE_MAX_ENTRIES=0 to measure the uncached path.
+
+Usage:
+    python benchmarks/endpoint_benchmark.py [--apps main main-simple] [--modes inprocess uvicorn]
+        [--requests 2000] [--concurrency 16] [--hours 48] [--forecast 7] [--mix mixed]
+        [--output endpoint_benchmark.json]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+logging.disable(logging.INFO)
+
+from asgi_client import API_KEY, post
+from payloads import CONDITION_MIXES, PayloadGenerator
+
+APPS = ('main', 'main-simple')
+MODES = ('inprocess', 'uvicorn')
+ENDPOINTS = ('/analyze-weather', '/generate-alerts', '/event-recommendations', '/health-insights')
+
+
+def load_app(name: str):
+    """Import `name`.py from the service directory (main-simple.py is not a valid module name)"""
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), os.path.join(SERVICE_DIR, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    latencies = sorted(latencies)
+    completed = len(latencies)
+    return {
+        'requests': completed + errors,
+        'errors': errors,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(completed / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(sum(latencies) / completed * 1e3, 3) if completed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1e3, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1e3, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1e3, 3)
+    }
+
+
+async def run_load(send, bodies: List[bytes], requests: int, concurrency: int) -> Dict[str, float]:
+    """Issue `requests` calls of `send(body)` from `concurrency` workers, cycling through `bodies`"""
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal errors, next_index
+        while next_index < requests:
+            body = bodies[next_index % len(bodies)]
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                status = await send(body)
+            except Exception:
+                status = None
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def bench_inprocess(app, bodies: List[bytes], args) -> Dict[str, dict]:
+    results = {}
+    for path in ENDPOINTS:
+        async def send(body: bytes, path: str = path) -> int:
+            status, _ = await post(app, path, body)
+            return status
+
+        await run_load(send, bodies, args.warmup, args.concurrency)
+        results[path] = await run_load(send, bodies, args.requests, args.concurrency)
+    return results
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(name: str, port: int) -> subprocess.Popen:
+    """Start uvicorn for `name` and wait until /health answers"""
+    import httpx
+
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', f'{name}:app', '--host', '127.0.0.1', '--port', str(port),
+         '--log-level', 'warning', '--no-access-log'],
+        cwd=SERVICE_DIR
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn for {name} exited with code {process.returncode}")
+        try:
+            if httpx.get(f'http://127.0.0.1:{port}/health', timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"uvicorn for {name} did not become ready")
+
+
+async def bench_uvicorn(name: str, bodies: List[bytes], args) -> Dict[str, dict]:
+    import httpx
+
+    port = free_port()
+    process = start_server(name, port)
+    headers = {'Authorization': f'Bearer {API_KEY}', 'Content-Type': 'application/json'}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {}
+    try:
+        async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', headers=headers, limits=limits, timeout=30) as client:
+            for path in ENDPOINTS:
+                async def send(body: bytes, path: str = path) -> int:
+                    return (await client.post(path, content=body)).status_code
+
+                await run_load(send, bodies, args.warmup, args.concurrency)
+                results[path] = await run_load(send, bodies, args.requests, args.concurrency)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--apps', nargs='+', choices=APPS, default=list(APPS), help='apps to benchmark')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES), help='in-process ASGI calls and/or HTTP against uvicorn')
+    parser.add_argument('--requests', type=int, default=2000, help='measured requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=200, help='unmeasured requests per endpoint before measuring')
+    parser.add_argument('--concurrency', type=int, default=16, help='requests in flight at once')
+    parser.add_argument('--payloads', type=int, default=64, help='distinct payloads to cycle through')
+    parser.add_argument('--hours', type=int, default=48, help='hourly entries per payload')
+    parser.add_argument('--forecast', type=int, default=7, help='forecast days per payload')
+    parser.add_argument('--mix', choices=sorted(CONDITION_MIXES), default='mixed', help='condition mix of the payloads')
+    parser.add_argument('--seed', type=int, default=0, help='payload generator seed')
+    parser.add_argument('--output', default='endpoint_benchmark.json', help='JSON results file')
+    args = parser.parse_args()
+
+    generator = PayloadGenerator(hours=args.hours, forecast_days=args.forecast, mix=args.mix, seed=args.seed)
+    bodies = generator.encoded_bodies(args.payloads)
+
+    results = []
+    for name in args.apps:
+        for mode in args.modes:
+            if mode == 'inprocess':
+                by_endpoint = asyncio.run(bench_inprocess(load_app(name), bodies, args))
+            else:
+                by_endpoint = asyncio.run(bench_uvicorn(name, bodies, args))
+            for path, row in by_endpoint.items():
+                results.append({'app': name, 'mode': mode, 'endpoint': path, **row})
+
+    print(f"{'app':<13}{'mode':<11}{'endpoint':<24}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for row in results:
+        print(
+            f"{row['app']:<13}{row['mode']:<11}{row['endpoint']:<24}{row['throughput_rps']:>10}"
+            f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{row['errors']:>8}"
+        )
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'payload_bytes': round(sum(len(body) for body in bodies) / len(bodies)),
+            'config': {key: value for key, value in vars(args).items() if key != 'output'}
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main_cli()
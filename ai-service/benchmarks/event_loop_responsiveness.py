@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Event loop responsiveness check for the AtmosAI AI Service.
+
+Keeps several large /analyze-weather/batch requests in flight against main.py
+in-process while a probe measures how late the event loop wakes up from a
+short sleep and how long a small /analyze-weather request takes. Runs once
+per executor mode; with analysis inline the loop stalls for the length of a
+whole batch, with a pool it should keep serving. Decoding the request body
+still runs on the loop, so very large batches stall it briefly either way.
+
+Exits with status 1 if the p99 loop lag of any offloading mode (thread,
+process) exceeds --max-lag-ms.
+
+Usage:
+    python benchmarks/event_loop_responsiveness.py [--modes inline thread process] [--batch-size 1000]
+        [--heavy-requests 4] [--rounds 6] [--max-lag-ms 50] [--json out.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, List
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+logging.disable(logging.INFO)
+
+from asgi_client import post
+from endpoint_benchmark import percentile
+from executor import EXECUTOR_MODES, INLINE, AnalysisExecutor
+from payloads import PayloadGenerator
+
+
+def batch_body(generator: PayloadGenerator, size: int) -> bytes:
+    items = []
+    for _ in range(size):
+        current = generator.weather_data()['current']
+        items.append({'weather_data': {'current': current, 'forecast': [], 'hourly': [], 'alerts': []}})
+    return json.dumps({'items': items}).encode()
+
+
+async def measure(app, heavy_body: bytes, small_body: bytes, args) -> Dict[str, float]:
+    """Loop lag and small-request latency while heavy batches are in flight"""
+    # Start the app the way a server does, so its startup hooks run
+    async with app.router.lifespan_context(app):
+        # Warm the pool and the models outside the measurement
+        await post(app, '/analyze-weather/batch', heavy_body)
+        return await measure_started(app, heavy_body, small_body, args)
+
+
+async def measure_started(app, heavy_body: bytes, small_body: bytes, args) -> Dict[str, float]:
+    """`measure` once the app has started"""
+    lags: List[float] = []
+    small: List[float] = []
+    heavy: List[float] = []
+    interval = args.interval_ms / 1000
+    done = asyncio.Event()
+
+    async def heavy_client():
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            status, _ = await post(app, '/analyze-weather/batch', heavy_body)
+            if status != 200:
+                raise RuntimeError(f"/analyze-weather/batch returned {status}")
+            heavy.append(time.perf_counter() - started)
+
+    async def lag_probe():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, time.perf_counter() - started - interval))
+
+    async def small_client():
+        while not done.is_set():
+            started = time.perf_counter()
+            status, _ = await post(app, '/analyze-weather', small_body)
+            if status != 200:
+                raise RuntimeError(f"/analyze-weather returned {status}")
+            small.append(time.perf_counter() - started)
+            await asyncio.sleep(interval)
+
+    probes = [asyncio.create_task(lag_probe()), asyncio.create_task(small_client())]
+    started = time.perf_counter()
+    await asyncio.gather(*(heavy_client() for _ in range(args.heavy_requests)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await asyncio.gather(*probes)
+
+    lags.sort()
+    small.sort()
+    return {
+        'elapsed_s': round(elapsed, 3),
+        'batches_per_s': round(len(heavy) / elapsed, 2),
+        'lag_p50_ms': round(percentile(lags, 0.50) * 1e3, 2),
+        'lag_p99_ms': round(percentile(lags, 0.99) * 1e3, 2),
+        'lag_max_ms': round(lags[-1] * 1e3, 2) if lags else 0.0,
+        'small_requests': len(small),
+        'small_p50_ms': round(percentile(small, 0.50) * 1e3, 2),
+        'small_p99_ms': round(percentile(small, 0.99) * 1e3, 2)
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modes', nargs='+', choices=EXECUTOR_MODES, default=[INLINE, 'thread'], help='executor modes to compare')
+    parser.add_argument('--batch-size', type=int, default=1000, help='items per heavy batch request')
+    parser.add_argument('--heavy-requests', type=int, default=4, help='heavy requests in flight at once')
+    parser.add_argument('--rounds', type=int, default=6, help='heavy requests issued by each heavy client')
+    parser.add_argument('--interval-ms', type=float, default=5.0, help='probe sleep interval')
+    parser.add_argument('--workers', type=int, default=0, help='pool size (0: one per CPU)')
+    parser.add_argument('--max-lag-ms', type=float, default=50.0, help='p99 loop lag allowed when analysis is offloaded')
+    parser.add_argument('--seed', type=int, default=0, help='payload generator seed')
+    parser.add_argument('--json', dest='json_path', help='write results to this file')
+    args = parser.parse_args()
+
+    # A plain import, so process pool workers can unpickle references to main's functions
+    import main
+
+    generator = PayloadGenerator(hours=0, forecast_days=0, seed=args.seed)
+    heavy_body = batch_body(generator, args.batch_size)
+    small_body = json.dumps(generator.request_body()).encode()
+
+    results = {}
+    for mode in args.modes:
+        main.analysis_executor = AnalysisExecutor(mode=mode, max_workers=args.workers or None, initializer=main.warm_analysis_process)
+        results[mode] = asyncio.run(measure(main.app, heavy_body, small_body, args))
+
+    print(f"{args.heavy_requests} x {args.rounds} batches of {args.batch_size} items, probe every {args.interval_ms:g} ms\n")
+    print(f"{'mode':<10}{'batches/s':>11}{'lag p50':>10}{'lag p99':>10}{'lag max':>10}{'small n':>9}{'small p50':>11}{'small p99':>11}")
+    for mode, row in results.items():
+        print(
+            f"{mode:<10}{row['batches_per_s']:>11}{row['lag_p50_ms']:>10}{row['lag_p99_ms']:>10}{row['lag_max_ms']:>10}"
+            f"{row['small_requests']:>9}{row['small_p50_ms']:>11}{row['small_p99_ms']:>11}"
+        )
+
+    failures = [
+        f"{mode}: p99 loop lag {row['lag_p99_ms']} ms exceeds {args.max_lag_ms:g} ms"
+        for mode, row in results.items()
+        if mode != INLINE and row['lag_p99_ms'] > args.max_lag_ms
+    ]
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'config': vars(args), 'results': results, 'passed': not failures}, f, indent=2)
+
+    print()
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print("PASS")
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Forecast alert benchmark for the AtmosAI AI Service.
+
+Compares two ways of alerting on a location's coming hours: calling
+AlertGenerator.generate_alerts_for once per hourly slot, as if each slot
+were the current conditions, and AlertGenerator.generate_forecast_alerts,
+which scans the hourly slots (and the forecast days after them) in one
+pass and merges consecutive exceeding slots into one alert per window.
+Reports time per location and alert records per location for a few
+horizons.
+
+Usage:
+    python benchmarks/forecast_alerts_benchmark.py [--hours 48 120 240] [--forecast-days 7]
+        [--locations 200] [--mix severe] [--json out.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+logging.disable(logging.INFO)
+
+from payloads import CONDITION_MIXES, PayloadGenerator
+
+
+def measure(main, hours: int, args) -> Dict[str, float]:
+    from weather_features import WeatherFeatures
+
+    generator = PayloadGenerator(hours=hours, forecast_days=args.forecast_days, mix=args.mix, seed=args.seed)
+    bodies = [generator.request_body() for _ in range(args.locations)]
+    location = main.Location(name='Benchmark', lat=37.77, lng=-122.42)
+    # Scan from the first slot so that no window counts as already over
+    now = datetime.fromisoformat(bodies[0]['weather_data']['hourly'][0]['time']) if hours else None
+
+    started = time.perf_counter()
+    per_slot_alerts = 0
+    for body in bodies:
+        for slot in body['weather_data']['hourly']:
+            per_slot_alerts += len(main.alert_generator.generate_alerts_for(WeatherFeatures.from_current(slot), location))
+    per_slot_s = time.perf_counter() - started
+
+    results = {}
+    for label, forecast_days in (('hourly', 0), ('hourly_forecast', args.forecast_days)):
+        started = time.perf_counter()
+        windows = 0
+        for body in bodies:
+            weather = body['weather_data']
+            windows += len(main.alert_generator.generate_forecast_alerts(
+                weather['hourly'], weather['forecast'][:forecast_days], location, now
+            ))
+        results[label] = (time.perf_counter() - started, windows)
+
+    single_s, window_alerts = results['hourly']
+    return {
+        'hours': hours,
+        'per_slot_us': round(per_slot_s / args.locations * 1e6, 1),
+        'single_pass_us': round(single_s / args.locations * 1e6, 1),
+        'with_forecast_us': round(results['hourly_forecast'][0] / args.locations * 1e6, 1),
+        'per_slot_alerts': round(per_slot_alerts / args.locations, 1),
+        'window_alerts': round(window_alerts / args.locations, 1),
+        'with_forecast_alerts': round(results['hourly_forecast'][1] / args.locations, 1)
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--hours', type=int, nargs='+', default=[48, 120, 240], help='hourly slots per location')
+    parser.add_argument('--forecast-days', type=int, default=7, help='forecast days per location')
+    parser.add_argument('--locations', type=int, default=200, help='locations per horizon')
+    parser.add_argument('--mix', default='severe', choices=sorted(CONDITION_MIXES), help='payload condition mix')
+    parser.add_argument('--seed', type=int, default=0, help='payload seed')
+    parser.add_argument('--json', dest='json_path', help='write results to this file')
+    args = parser.parse_args()
+
+    import main
+
+    rows = [measure(main, hours, args) for hours in args.hours]
+
+    print(f"{args.locations} locations, '{args.mix}' payloads; time and alert records per location\n")
+    print(f"{'hours':>6}{'per slot us':>13}{'single pass us':>16}{'+forecast us':>14}{'per slot alerts':>17}{'windows':>9}{'+forecast':>11}")
+    for row in rows:
+        print(
+            f"{row['hours']:>6}{row['per_slot_us']:>13}{row['single_pass_us']:>16}{row['with_forecast_us']:>14}"
+            f"{row['per_slot_alerts']:>17}{row['window_alerts']:>9}{row['with_forecast_alerts']:>11}"
+        )
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'config': vars(args), 'results': rows}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main_cli()
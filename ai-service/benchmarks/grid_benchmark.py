@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Grid fan-out benchmark for the AtmosAI AI Service.
+
+Places N saved locations around a few city centers and compares generating
+alerts for every location (one /generate-alerts body each) with generating
+them once per geohash cell and listing the cell's locations
+(/generate-alerts/grid). Every cell has one observation, as when the
+backend fetches upstream weather once per cell. Reports analysis time for
+growing N; HTTP and validation cost per request, which the grid call also
+saves, is left out.
+
+Usage:
+    python benchmarks/grid_benchmark.py [--counts 1000 10000 100000] [--precision 6] [--spread-degrees 0.02]
+        [--json out.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, List
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+logging.disable(logging.INFO)
+
+import numpy as np
+
+from payloads import PayloadGenerator
+
+# (lat, lng) of the metro areas the locations are spread around
+CENTERS = ((37.77, -122.42), (40.71, -74.0), (34.05, -118.24), (41.88, -87.63), (29.76, -95.37))
+
+
+def best_of(run, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def measure(main, count: int, args) -> Dict[str, float]:
+    from geo_grid import encode_many
+    from weather_features import WeatherFeatures
+
+    rng = np.random.default_rng(args.seed)
+    centers = np.array(CENTERS)[rng.integers(0, len(CENTERS), count)]
+    lats = centers[:, 0] + rng.normal(0, args.spread_degrees, count)
+    lngs = centers[:, 1] + rng.normal(0, args.spread_degrees, count)
+    generator = PayloadGenerator(hours=0, forecast_days=0, mix='severe', seed=args.seed)
+
+    cell_weather = {}
+    per_location: List[tuple] = []
+    grid_locations = []
+    for index, (lat, lng, cell) in enumerate(zip(lats.tolist(), lngs.tolist(), encode_many(lats, lngs, args.precision))):
+        observed = cell not in cell_weather
+        if observed:
+            cell_weather[cell] = generator.request_body()['weather_data']['current']
+        current = cell_weather[cell]
+        per_location.append((current, main.Location(name=f"Location {index}", lat=lat, lng=lng)))
+        grid_locations.append(main.GridLocation(
+            id=str(index), lat=lat, lng=lng, city='Metro',
+            weather_data={'current': current} if observed else None
+        ))
+
+    def each_location():
+        for current, location in per_location:
+            main.build_alerts_response(main.alert_generator.generate_alerts_for(WeatherFeatures.from_current(current), location))
+
+    repeats = max(1, args.repeats if count <= 10000 else 1)
+    per_location_s = best_of(each_location, repeats)
+    grid_s = best_of(lambda: main.grid_alerts_body(grid_locations, args.precision), repeats)
+    return {
+        'locations': count,
+        'cells': len(cell_weather),
+        'per_location_ms': round(per_location_s * 1e3, 2),
+        'grid_ms': round(grid_s * 1e3, 2),
+        'speedup': round(per_location_s / grid_s, 1)
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--counts', type=int, nargs='+', default=[1000, 10000, 100000], help='numbers of locations')
+    parser.add_argument('--precision', type=int, default=6, help='geohash precision of the cells')
+    parser.add_argument('--spread-degrees', type=float, default=0.02, help='standard deviation of locations around a center')
+    parser.add_argument('--repeats', type=int, default=3, help='timed runs per size (best is kept)')
+    parser.add_argument('--seed', type=int, default=0, help='placement and payload seed')
+    parser.add_argument('--json', dest='json_path', help='write results to this file')
+    args = parser.parse_args()
+
+    import main
+
+    rows = [measure(main, count, args) for count in args.counts]
+
+    print(f"precision {args.precision}, locations spread {args.spread_degrees} degrees around {len(CENTERS)} centers\n")
+    print(f"{'locations':>10}{'cells':>8}{'per location ms':>17}{'grid ms':>10}{'x':>7}")
+    for row in rows:
+        print(f"{row['locations']:>10}{row['cells']:>8}{row['per_location_ms']:>17}{row['grid_ms']:>10}{row['speedup']:>7}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'config': vars(args), 'results': rows}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Per-request memory benchmark for the AtmosAI AI Service.
+
+Drives each POST endpoint of main.py in-process through its ASGI app and
+reports, per request, the peak traced allocation (tracemalloc) and the
+number of memory blocks still allocated afterwards, plus the footprint of
+the slotted feature and result records against equivalent plain dicts.
+
+Usage:
+    python benchmarks/memory_benchmark.py [--requests 200] [--json out.json]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+logging.disable(logging.INFO)
+
+import main
+from asgi_client import post
+from weather_features import ConditionResult, WeatherFeatures
+
+WEATHER_DATA = {
+    'current': {
+        'temperature': 88,
+        'humidity': 82,
+        'uvIndex': 9,
+        'windSpeed': 16,
+        'airQuality': {'aqi': 120},
+        'condition': {'main': 'Clear', 'description': 'clear sky'}
+    },
+    'forecast': [],
+    'hourly': [],
+    'alerts': []
+}
+LOCATION = {'name': 'Austin, TX', 'lat': 30.2672, 'lng': -97.7431}
+
+ENDPOINTS = {
+    '/analyze-weather': {'weather_data': WEATHER_DATA},
+    '/generate-alerts': {'weather_data': WEATHER_DATA, 'location': LOCATION},
+    '/event-recommendations': {'weather_data': WEATHER_DATA},
+    '/health-insights': {'weather_data': WEATHER_DATA}
+}
+
+
+async def measure(path: str, body: bytes, requests: int) -> dict:
+    for _ in range(20):
+        await post(main.app, path, body)
+    gc.collect()
+
+    peaks = []
+    tracemalloc.start()
+    blocks_before = len(tracemalloc.take_snapshot().traces)
+    for _ in range(requests):
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        status, _ = await post(main.app, path, body)
+        assert status == 200, f"{path} returned {status}"
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    gc.collect()
+    blocks_after = len(tracemalloc.take_snapshot().traces)
+    tracemalloc.stop()
+
+    peaks.sort()
+    return {
+        'median_peak_bytes': peaks[len(peaks) // 2],
+        'max_peak_bytes': peaks[-1],
+        'retained_blocks_per_request': round((blocks_after - blocks_before) / requests, 2)
+    }
+
+
+def traced_bytes(build, count: int) -> int:
+    """Bytes held by `count` objects made by `build`, measured with tracemalloc"""
+    gc.collect()
+    tracemalloc.start()
+    objects = [build(index) for index in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+def record_footprint(count: int) -> dict:
+    """Bytes per record: slotted classes against the dicts they replace"""
+    current = WEATHER_DATA['current']
+    recommendations = ['Stay hydrated', 'Limit outdoor time']
+    builders = {
+        'features_slots': lambda i: WeatherFeatures.from_current(current),
+        'features_dict': lambda i: {
+            'temperature': current['temperature'],
+            'humidity': current['humidity'],
+            'uv_index': current['uvIndex'],
+            'aqi': current['airQuality']['aqi'],
+            'wind_speed': current['windSpeed']
+        },
+        'condition_slots': lambda i: ConditionResult('hot', 'high', recommendations),
+        'condition_dict': lambda i: {'condition': 'hot', 'risk': 'high', 'recommendations': recommendations}
+    }
+    return {name: round(traced_bytes(build, count) / count, 1) for name, build in builders.items()}
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200, help='requests measured per endpoint')
+    parser.add_argument('--records', type=int, default=100000, help='records built for the footprint comparison')
+    parser.add_argument('--json', dest='json_path', help='write results to this file')
+    args = parser.parse_args()
+
+    results = {}
+    for path, payload in ENDPOINTS.items():
+        results[path] = asyncio.run(measure(path, json.dumps(payload).encode(), args.requests))
+
+    print(f"{'endpoint':<24}{'median peak B':>15}{'max peak B':>12}{'retained blk/req':>18}")
+    for path, row in results.items():
+        print(f"{path:<24}{row['median_peak_bytes']:>15}{row['max_peak_bytes']:>12}{row['retained_blocks_per_request']:>18}")
+
+    footprint = record_footprint(args.records)
+    print()
+    print(f"{'record':<24}{'bytes/record':>15}")
+    for name, size in footprint.items():
+        print(f"{name:<24}{size:>15}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'requests': results, 'records': footprint}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main_cli()
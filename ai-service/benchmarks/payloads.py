@@ -0,0 +1,152 @@
+"""
+Synthetic WeatherData payloads for the AtmosAI AI Service benchmarks.
+
+Payloads follow the shape the backend sends: a `current` block, `hourly`
+entries and daily `forecast` entries. Readings follow a diurnal curve around
+a per-payload base climate. The condition mix controls how often payloads
+land in mild, wet or severe buckets, so benchmarks can exercise every
+branch of the analyzers rather than a single cached path.
+"""
+
+import json
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+# (weight, condition main, description) per mix
+CONDITION_MIXES = {
+    'mild': (
+        (70, 'Clear', 'clear sky'),
+        (25, 'Clouds', 'scattered clouds'),
+        (5, 'Rain', 'light rain')
+    ),
+    'mixed': (
+        (40, 'Clear', 'clear sky'),
+        (25, 'Clouds', 'broken clouds'),
+        (20, 'Rain', 'moderate rain'),
+        (8, 'Thunderstorm', 'thunderstorm with rain'),
+        (5, 'Snow', 'light snow'),
+        (2, 'Tornado', 'tornado')
+    ),
+    'severe': (
+        (15, 'Rain', 'heavy intensity rain'),
+        (45, 'Thunderstorm', 'heavy thunderstorm'),
+        (15, 'Snow', 'heavy snow'),
+        (10, 'Blizzard', 'blizzard'),
+        (10, 'Hurricane', 'hurricane'),
+        (5, 'Tornado', 'tornado')
+    )
+}
+
+# (temperature mean, daily swing, humidity mean, aqi mean, wind mean) per climate
+CLIMATES = (
+    (78, 14, 35, 60, 8),   # hot and dry
+    (84, 8, 82, 45, 6),    # hot and humid
+    (62, 12, 60, 35, 10),  # temperate
+    (25, 10, 70, 30, 18),  # cold
+    (70, 10, 55, 140, 5)   # polluted
+)
+
+LOCATIONS = (
+    ('Phoenix, AZ', 33.4484, -112.0740),
+    ('Miami, FL', 25.7617, -80.1918),
+    ('Seattle, WA', 47.6062, -122.3321),
+    ('Minneapolis, MN', 44.9778, -93.2650),
+    ('Los Angeles, CA', 34.0522, -118.2437)
+)
+
+
+class PayloadGenerator:
+    """Deterministic source of WeatherData payloads for a given seed"""
+
+    def __init__(self, hours: int = 48, forecast_days: int = 7, mix: str = 'mixed', seed: int = 0):
+        if mix not in CONDITION_MIXES:
+            raise ValueError(f"Unknown condition mix '{mix}'. Valid mixes: {', '.join(CONDITION_MIXES)}")
+        self.hours = hours
+        self.forecast_days = forecast_days
+        self.mix = mix
+        self.rng = random.Random(seed)
+        self.start = datetime(2024, 7, 1, tzinfo=timezone.utc)
+        weights, mains, descriptions = zip(*CONDITION_MIXES[mix])
+        self.conditions = list(zip(mains, descriptions))
+        self.condition_weights = weights
+
+    def _condition(self) -> Dict[str, str]:
+        main, description = self.rng.choices(self.conditions, weights=self.condition_weights)[0]
+        return {'main': main, 'description': description, 'icon': '01d'}
+
+    def _reading(self, climate: tuple, hour: int) -> Dict[str, Any]:
+        temp_mean, swing, humidity_mean, aqi_mean, wind_mean = climate
+        # Coolest around 05:00, warmest around 17:00
+        phase = math.sin((hour % 24 - 11) / 24 * 2 * math.pi)
+        daylight = max(0.0, math.sin((hour % 24 - 6) / 12 * math.pi))
+        severe = self.mix == 'severe'
+        return {
+            'temperature': round(temp_mean + swing / 2 * phase + self.rng.gauss(0, 3), 1),
+            'humidity': int(min(100, max(5, humidity_mean - 10 * phase + self.rng.gauss(0, 6)))),
+            'uvIndex': round(max(0.0, 11 * daylight + self.rng.gauss(0, 1)), 1),
+            'windSpeed': round(max(0.0, self.rng.gauss(wind_mean * (2.5 if severe else 1), 4)), 1),
+            'airQuality': {'aqi': int(max(0, self.rng.gauss(aqi_mean, 25)))}
+        }
+
+    def weather_data(self) -> Dict[str, Any]:
+        climate = self.rng.choice(CLIMATES)
+        now_hour = self.rng.randrange(24)
+
+        current = self._reading(climate, now_hour)
+        current.update({
+            'feelsLike': current['temperature'],
+            'pressure': self.rng.randint(995, 1030),
+            'visibility': 10,
+            'condition': self._condition()
+        })
+
+        hourly = []
+        for offset in range(self.hours):
+            entry = self._reading(climate, now_hour + offset)
+            entry.update({
+                'time': (self.start + timedelta(hours=now_hour + offset)).isoformat(),
+                'pressure': current['pressure'],
+                'windDirection': self.rng.randrange(360),
+                'condition': self._condition(),
+                'precipitation': {'probability': self.rng.randrange(101), 'amount': round(self.rng.random(), 2)}
+            })
+            hourly.append(entry)
+
+        forecast = []
+        for day in range(self.forecast_days):
+            noon = self._reading(climate, 14)
+            swing = climate[1]
+            forecast.append({
+                'date': (self.start + timedelta(days=day)).date().isoformat(),
+                'temperature': {
+                    'min': round(noon['temperature'] - swing, 1),
+                    'max': noon['temperature'],
+                    'day': noon['temperature'],
+                    'night': round(noon['temperature'] - swing * 0.8, 1),
+                    'eve': round(noon['temperature'] - swing * 0.3, 1),
+                    'morn': round(noon['temperature'] - swing * 0.7, 1)
+                },
+                'humidity': noon['humidity'],
+                'pressure': current['pressure'],
+                'windSpeed': noon['windSpeed'],
+                'windDirection': self.rng.randrange(360),
+                'uvIndex': noon['uvIndex'],
+                'condition': self._condition(),
+                'precipitation': {'probability': self.rng.randrange(101), 'amount': round(self.rng.random() * 5, 2)},
+                'airQuality': noon['airQuality']
+            })
+
+        return {'current': current, 'forecast': forecast, 'hourly': hourly, 'alerts': []}
+
+    def location(self) -> Dict[str, Any]:
+        name, lat, lng = self.rng.choice(LOCATIONS)
+        return {'name': name, 'lat': lat, 'lng': lng}
+
+    def request_body(self) -> Dict[str, Any]:
+        """One request body accepted by every POST endpoint of both apps"""
+        return {'weather_data': self.weather_data(), 'location': self.location()}
+
+    def encoded_bodies(self, count: int) -> List[bytes]:
+        return [json.dumps(self.request_body()).encode() for _ in range(count)]
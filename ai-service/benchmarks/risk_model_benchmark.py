@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Risk model latency check for the AtmosAI AI Service.
+
+Compares the threshold path with an exported risk model (see
+train_risk_model.py) three ways: inference cost per item at several batch
+sizes, the latency of building one /analyze-weather body, and end-to-end
+/analyze-weather latency through main.py in-process, with requests sent one
+at a time and the two paths alternating in blocks so drift affects both.
+
+Exits with status 1 if the model's end-to-end p99 exceeds the threshold
+path's by more than --max-regression.
+
+Usage:
+    python benchmarks/risk_model_benchmark.py [--model models/risk_model.npz] [--requests 10000]
+        [--calls 20000] [--max-regression 0.10] [--json out.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+logging.disable(logging.INFO)
+
+from asgi_client import post
+from endpoint_benchmark import percentile
+from payloads import PayloadGenerator
+
+BATCH_SIZES = (1, 16, 64, 1024)
+THRESHOLDS, MODEL = 'thresholds', 'model'
+
+
+def latency_row(latencies: List[float]) -> Dict[str, float]:
+    latencies = sorted(latencies)
+    return {
+        'p50_us': round(percentile(latencies, 0.50) * 1e6, 2),
+        'p99_us': round(percentile(latencies, 0.99) * 1e6, 2)
+    }
+
+
+def inference_costs(main, model, rows: List[tuple]) -> Dict[int, Dict[str, float]]:
+    """Mean microseconds per item to classify (thresholds) or score (model) a batch"""
+    costs = {}
+    for size in BATCH_SIZES:
+        batch = (rows * (size // len(rows) + 1))[:size]
+        repeats = max(20, 20000 // size)
+        timings = {}
+        for path, run in (
+            (THRESHOLDS, lambda: main.encode_many(main.vector_analyzer.classify_readings(batch)['conditions'])),
+            (MODEL, lambda: model.predict(batch))
+        ):
+            run()
+            started = time.perf_counter()
+            for _ in range(repeats):
+                run()
+            timings[path] = round((time.perf_counter() - started) / repeats / size * 1e6, 3)
+        costs[size] = timings
+    return costs
+
+
+def body_latencies(main, model, features: list, calls: int) -> Dict[str, Dict[str, float]]:
+    """Latency of main.analysis_body per call on each path"""
+    results = {}
+    timestamp = datetime.now().isoformat()
+    for path, active in ((THRESHOLDS, None), (MODEL, model)):
+        main.get_risk_model = lambda active=active: active
+        latencies = []
+        for index in range(calls):
+            item = features[index % len(features)]
+            started = time.perf_counter()
+            main.analysis_body(item, timestamp)
+            latencies.append(time.perf_counter() - started)
+        results[path] = latency_row(latencies)
+    return results
+
+
+async def endpoint_latencies(main, model, bodies: List[bytes], requests: int, block: int) -> Dict[str, Dict[str, float]]:
+    """Sequential /analyze-weather latency per path, alternating in blocks of `block` requests"""
+    latencies = {THRESHOLDS: [], MODEL: []}
+    async with main.app.router.lifespan_context(main.app):
+        for body in bodies[:block]:
+            await post(main.app, '/analyze-weather', body)
+        sent = 0
+        while sent < requests:
+            for path, active in ((THRESHOLDS, None), (MODEL, model)):
+                main.get_risk_model = lambda active=active: active
+                for index in range(sent, sent + block):
+                    started = time.perf_counter()
+                    status, _ = await post(main.app, '/analyze-weather', bodies[index % len(bodies)])
+                    if status != 200:
+                        raise RuntimeError(f"/analyze-weather returned {status}")
+                    latencies[path].append(time.perf_counter() - started)
+            sent += block
+    return {path: latency_row(values) for path, values in latencies.items()}
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model', help='exported risk model (default: AI_RISK_MODEL_PATH or models/risk_model.npz)')
+    parser.add_argument('--requests', type=int, default=10000, help='/analyze-weather requests per path')
+    parser.add_argument('--block', type=int, default=50, help='requests per path before switching')
+    parser.add_argument('--calls', type=int, default=20000, help='analysis_body calls per path')
+    parser.add_argument('--max-regression', type=float, default=0.10, help='allowed relative increase of end-to-end p99')
+    parser.add_argument('--seed', type=int, default=0, help='payload generator seed')
+    parser.add_argument('--json', dest='json_path', help='write results to this file')
+    args = parser.parse_args()
+
+    # The registry must not load the model itself; each measurement picks the path explicitly
+    os.environ['AI_RISK_MODEL_ENABLED'] = 'false'
+    os.environ['AI_COALESCING'] = 'false'
+    import main
+    from risk_model import RiskModel
+    from weather_features import WeatherFeatures
+
+    path = args.model or os.getenv('AI_RISK_MODEL_PATH') or main.RISK_MODEL_PATH
+    if not os.path.exists(path):
+        print(f"No risk model at {path}; train one with: python train_risk_model.py --bootstrap 50000")
+        sys.exit(2)
+    model = RiskModel.load(path)
+
+    generator = PayloadGenerator(hours=0, forecast_days=0, seed=args.seed)
+    payloads = [generator.request_body() for _ in range(500)]
+    features = [WeatherFeatures.from_current(payload['weather_data']['current']) for payload in payloads]
+    rows = [item.readings() for item in features]
+    bodies = [json.dumps(payload).encode() for payload in payloads]
+
+    costs = inference_costs(main, model, rows)
+    calls = body_latencies(main, model, features, args.calls)
+    endpoint = asyncio.run(endpoint_latencies(main, model, bodies, args.requests, args.block))
+
+    print(f"{model!r}\n")
+    print(f"{'batch':>6}{'thresholds us/item':>20}{'model us/item':>15}")
+    for size, row in costs.items():
+        print(f"{size:>6}{row[THRESHOLDS]:>20}{row[MODEL]:>15}")
+    print(f"\n{'':<28}{'thresholds p50':>16}{'p99':>10}{'model p50':>12}{'p99':>10}  (us)")
+    for label, table in (('analysis_body', calls), ('/analyze-weather end-to-end', endpoint)):
+        print(
+            f"{label:<28}{table[THRESHOLDS]['p50_us']:>16}{table[THRESHOLDS]['p99_us']:>10}"
+            f"{table[MODEL]['p50_us']:>12}{table[MODEL]['p99_us']:>10}"
+        )
+
+    limit = endpoint[THRESHOLDS]['p99_us'] * (1 + args.max_regression)
+    passed = endpoint[MODEL]['p99_us'] <= limit
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({
+                'config': vars(args),
+                'model': repr(model),
+                'inference_us_per_item': costs,
+                'analysis_body': calls,
+                'endpoint': endpoint,
+                'passed': passed
+            }, f, indent=2)
+
+    print()
+    if not passed:
+        print(f"FAIL: model p99 {endpoint[MODEL]['p99_us']} us exceeds {limit:.1f} us")
+        sys.exit(1)
+    print("PASS")
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Response serialization benchmark for the AtmosAI AI Service.
+
+Compares FastAPI's default path (jsonable_encoder + JSONResponse) with
+FastJSONResponse for a representative body from each endpoint.
+
+Usage:
+    python benchmarks/serialization_benchmark.py [--repeat 200] [--json out.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+logging.disable(logging.INFO)
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import main
+from decision_table import encode
+from responses import FastJSONResponse, orjson
+from risk_timeline import build_risk_timeline
+
+CURRENT = {
+    'temperature': 95,
+    'humidity': 85,
+    'uvIndex': 9,
+    'windSpeed': 32,
+    'airQuality': {'aqi': 160},
+    'condition': {'main': 'Thunderstorm', 'description': 'heavy thunderstorm'}
+}
+LOCATION = main.Location(name='Phoenix, AZ', lat=33.4484, lng=-112.074)
+
+
+def sample_bodies(alert_count: int, batch_size: int, hours: int) -> dict:
+    """One representative response body per endpoint, as the handlers build them"""
+    timestamp = datetime.now().isoformat()
+    features = main.WeatherFeatures.from_current(CURRENT)
+    code = encode(main.vector_analyzer.condition_codes(features.readings()))
+    weather_data = main.WeatherData(current=CURRENT, forecast=[], hourly=[], alerts=[])
+
+    alerts = []
+    while len(alerts) < alert_count:
+        alerts.extend(main.alert_generator.generate_alerts(weather_data, LOCATION))
+    alerts = alerts[:alert_count]
+
+    hourly = [
+        {'time': f'2024-07-01T{hour % 24:02d}:00:00Z', 'temperature': 70 + hour % 30, 'humidity': 50, 'windSpeed': hour % 35}
+        for hour in range(hours)
+    ]
+
+    return {
+        'analyze-weather': main.get_decision_table().response(code, timestamp),
+        'analyze-weather/batch': {
+            'results': [
+                {'index': index, 'success': True, 'data': main.get_decision_table().response(code, timestamp)}
+                for index in range(batch_size)
+            ],
+            'total': batch_size,
+            'succeeded': batch_size,
+            'failed': 0,
+            'timestamp': timestamp
+        },
+        'analyze-weather/timeline': {
+            'hours': hours,
+            **build_risk_timeline(hourly, main.vector_analyzer, main.get_decision_table()),
+            'timestamp': timestamp
+        },
+        'generate-alerts': {
+            'alerts': alerts,
+            'total_alerts': len(alerts),
+            'severity_distribution': {'severe': 0, 'moderate': 0, 'info': 0},
+            'confidence': 0.90,
+            'timestamp': timestamp
+        },
+        'event-recommendations': {**main.build_event_recommendations(features), 'timestamp': timestamp},
+        'health-insights': {**main.build_health_insights(features), 'timestamp': timestamp}
+    }
+
+
+def default_render(body) -> bytes:
+    return JSONResponse(jsonable_encoder(body)).body
+
+
+def fast_render(body) -> bytes:
+    return FastJSONResponse(body).body
+
+
+def time_per_call(func, body, repeat: int) -> float:
+    """Best-of-5 microseconds per call"""
+    timer = timeit.Timer(lambda: func(body))
+    return min(timer.repeat(repeat=5, number=repeat)) / repeat * 1e6
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200, help='encodes per timing run')
+    parser.add_argument('--alerts', type=int, default=500, help='alerts in the generate-alerts body')
+    parser.add_argument('--batch', type=int, default=200, help='items in the batch body')
+    parser.add_argument('--hours', type=int, default=48, help='hourly entries in the timeline body')
+    parser.add_argument('--json', dest='json_path', help='write results to this file')
+    args = parser.parse_args()
+
+    results = []
+    for endpoint, body in sample_bodies(args.alerts, args.batch, args.hours).items():
+        # Both paths must produce the same document
+        assert json.loads(default_render(body)) == json.loads(fast_render(body)), endpoint
+        before = time_per_call(default_render, body, args.repeat)
+        after = time_per_call(fast_render, body, args.repeat)
+        results.append({
+            'endpoint': endpoint,
+            'bytes': len(fast_render(body)),
+            'before_us': round(before, 2),
+            'after_us': round(after, 2),
+            'speedup': round(before / after, 1)
+        })
+
+    print(f"encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+    print(f"{'endpoint':<26}{'bytes':>10}{'before us':>12}{'after us':>12}{'speedup':>9}")
+    for row in results:
+        print(f"{row['endpoint']:<26}{row['bytes']:>10}{row['before_us']:>12}{row['after_us']:>12}{row['speedup']:>8}x")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'encoder': 'orjson' if orjson is not None else 'json', 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Subscription index benchmark for the AtmosAI AI Service.
+
+Bulk loads N subscriptions (half clustered around cities, half spread over
+the globe) into spatial_index.SubscriptionIndex, then measures radius
+queries centered on random subscriptions against a NumPy haversine scan of
+every subscription, and the cost of incremental inserts and deletes. Every
+query's result is checked against the scan.
+
+Exits with status 1 if the p99 query latency at --gate-radius exceeds
+--max-query-ms.
+
+Usage:
+    python benchmarks/spatial_index_benchmark.py [--subscriptions 1000000] [--queries 200]
+        [--radii 5 25 100] [--gate-radius 25] [--max-query-ms 20] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+import numpy as np
+
+from endpoint_benchmark import percentile
+from geo_grid import haversine_many_km
+from spatial_index import SubscriptionIndex
+
+CITIES = ((37.77, -122.42), (40.71, -74.0), (51.51, -0.13), (35.68, 139.69), (-33.87, 151.21), (19.43, -99.13), (28.61, 77.21))
+
+
+def subscriptions(count: int, rng) -> Dict[str, np.ndarray]:
+    clustered = count // 2
+    cities = np.array(CITIES)[rng.integers(0, len(CITIES), clustered)]
+    lats = np.concatenate((
+        np.clip(cities[:, 0] + rng.normal(0, 0.5, clustered), -90, 90),
+        np.degrees(np.arcsin(rng.uniform(-1, 1, count - clustered)))
+    ))
+    lngs = np.concatenate((
+        (cities[:, 1] + rng.normal(0, 0.5, clustered) + 180) % 360 - 180,
+        rng.uniform(-180, 180, count - clustered)
+    ))
+    return {'ids': np.array([f"sub-{index}" for index in range(count)], dtype=object), 'lats': lats, 'lngs': lngs}
+
+
+def latency_row(latencies: List[float]) -> Dict[str, float]:
+    latencies = sorted(latencies)
+    return {
+        'p50_ms': round(percentile(latencies, 0.50) * 1e3, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1e3, 3)
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--subscriptions', type=int, default=1000000, help='subscriptions loaded')
+    parser.add_argument('--queries', type=int, default=200, help='queries per radius')
+    parser.add_argument('--radii', type=float, nargs='+', default=[5, 25, 100], help='query radii in km')
+    parser.add_argument('--updates', type=int, default=20000, help='incremental inserts and deletes timed')
+    parser.add_argument('--gate-radius', type=float, default=25, help='radius whose p99 is checked')
+    parser.add_argument('--max-query-ms', type=float, default=20.0, help='allowed p99 query latency at --gate-radius')
+    parser.add_argument('--seed', type=int, default=0, help='placement seed')
+    parser.add_argument('--json', dest='json_path', help='write results to this file')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    data = subscriptions(args.subscriptions, rng)
+    index = SubscriptionIndex(background=False)
+    started = time.perf_counter()
+    index.load(data['ids'].tolist(), data['lats'], data['lngs'])
+    load_s = time.perf_counter() - started
+
+    results = {}
+    for radius in args.radii:
+        centers = rng.integers(0, args.subscriptions, args.queries)
+        indexed, scanned, sizes = [], [], []
+        for center in centers.tolist():
+            lat, lng = float(data['lats'][center]), float(data['lngs'][center])
+            started = time.perf_counter()
+            ids, _ = index.query_radius(lat, lng, radius)
+            indexed.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            distances = haversine_many_km(np.full(args.subscriptions, lat), np.full(args.subscriptions, lng), data['lats'], data['lngs'])
+            expected = data['ids'][distances <= radius].tolist()
+            scanned.append(time.perf_counter() - started)
+            if sorted(ids) != sorted(expected):
+                raise RuntimeError(f"Index and scan disagree at ({lat}, {lng}) within {radius} km")
+            sizes.append(len(ids))
+        results[radius] = {
+            'index': latency_row(indexed),
+            'scan': latency_row(scanned),
+            'mean_results': round(float(np.mean(sizes)), 1),
+            'max_results': int(max(sizes))
+        }
+
+    # Incremental updates: move existing subscriptions, then delete them
+    moved = rng.choice(args.subscriptions, args.updates, replace=False)
+    moved_ids = data['ids'][moved].tolist()
+    started = time.perf_counter()
+    for member, lat, lng in zip(moved_ids, rng.uniform(-60, 60, args.updates).tolist(), rng.uniform(-180, 180, args.updates).tolist()):
+        index.add(member, lat, lng)
+    insert_us = (time.perf_counter() - started) / args.updates * 1e6
+    started = time.perf_counter()
+    for member in moved_ids:
+        index.remove(member)
+    delete_us = (time.perf_counter() - started) / args.updates * 1e6
+    stats = index.stats()
+
+    print(f"{args.subscriptions} subscriptions loaded in {load_s:.2f} s ({stats['tree_nodes']} tree nodes)\n")
+    print(f"{'radius km':>10}{'index p50':>11}{'p99':>9}{'scan p50':>11}{'p99':>9}{'mean hits':>11}{'max hits':>10}  (ms)")
+    for radius, row in results.items():
+        print(
+            f"{radius:>10g}{row['index']['p50_ms']:>11}{row['index']['p99_ms']:>9}"
+            f"{row['scan']['p50_ms']:>11}{row['scan']['p99_ms']:>9}{row['mean_results']:>11}{row['max_results']:>10}"
+        )
+    print(f"\ninsert or move {insert_us:.1f} us, delete {delete_us:.1f} us (amortized over {stats['rebuilds'] - 1} rebuilds, last {stats['last_build_seconds']} s)")
+
+    gate = results.get(args.gate_radius)
+    passed = gate is None or gate['index']['p99_ms'] <= args.max_query_ms
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({
+                'config': vars(args),
+                'load_seconds': round(load_s, 3),
+                'queries': {str(radius): row for radius, row in results.items()},
+                'insert_us': round(insert_us, 2),
+                'delete_us': round(delete_us, 2),
+                'stats': stats,
+                'passed': passed
+            }, f, indent=2)
+
+    print()
+    if not passed:
+        print(f"FAIL: p99 query latency {gate['index']['p99_ms']} ms at {args.gate_radius:g} km exceeds {args.max_query_ms} ms")
+        sys.exit(1)
+    print("PASS")
+
+
+if __name__ == '__main__':
+    main_cli()
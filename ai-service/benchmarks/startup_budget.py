@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Cold-start budget check for the AtmosAI AI Service.
+
+Imports main.py in a fresh interpreter with `-X importtime` and fails (exit
+status 1) if the import takes longer than the budget or pulls in a heavy ML
+library at module load. Heavy libraries belong in model_registry loaders so
+new instances start serving quickly on scale-out.
+
+Usage:
+    python benchmarks/startup_budget.py [--budget-ms 2000] [--runs 3] [--top 15] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Top-level packages that must not be imported when main.py loads
+HEAVY_MODULES = ('torch', 'transformers', 'sklearn', 'pandas', 'openai', 'scipy', 'tensorflow')
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def import_profile() -> dict:
+    """Wall time and per-module import times for `import main` in a new interpreter"""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'],
+        cwd=SERVICE_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"import main failed:\n{completed.stderr[-2000:]}")
+
+    modules = {}
+    for line in completed.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = {
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000,
+                'top_level': len(indent) == 1
+            }
+    import_ms = modules.get('main', {}).get('cumulative_ms', 0.0)
+    return {'wall_ms': wall_ms, 'import_ms': import_ms, 'modules': modules}
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('AI_STARTUP_BUDGET_MS', 2000)),
+                        help='maximum median import time of main.py')
+    parser.add_argument('--runs', type=int, default=3, help='fresh interpreters to start')
+    parser.add_argument('--top', type=int, default=15, help='slowest modules to list')
+    parser.add_argument('--json', dest='json_path', help='write results to this file')
+    args = parser.parse_args()
+
+    runs = [import_profile() for _ in range(args.runs)]
+    runs.sort(key=lambda run: run['import_ms'])
+    median = runs[len(runs) // 2]
+
+    heavy = sorted(
+        name for name in median['modules']
+        if name.split('.')[0] in HEAVY_MODULES
+    )
+    heavy_roots = sorted({name.split('.')[0] for name in heavy})
+    slowest = sorted(median['modules'].items(), key=lambda item: item[1]['self_ms'], reverse=True)[:args.top]
+
+    print(f"import main: median {median['import_ms']:.1f} ms over {args.runs} runs "
+          f"(interpreter wall {median['wall_ms']:.1f} ms), budget {args.budget_ms:.0f} ms")
+    print(f"\n{'module':<48}{'self ms':>10}{'cumulative ms':>15}")
+    for name, row in slowest:
+        print(f"{name:<48}{row['self_ms']:>10.1f}{row['cumulative_ms']:>15.1f}")
+
+    failures = []
+    if median['import_ms'] > args.budget_ms:
+        failures.append(f"import time {median['import_ms']:.1f} ms exceeds budget of {args.budget_ms:.0f} ms")
+    if heavy_roots:
+        failures.append(f"heavy modules imported at load: {', '.join(heavy_roots)} (load them in a model_registry loader)")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({
+                'budget_ms': args.budget_ms,
+                'import_ms': [round(run['import_ms'], 1) for run in runs],
+                'median_import_ms': round(median['import_ms'], 1),
+                'heavy_modules': heavy_roots,
+                'slowest': {name: row for name, row in slowest},
+                'passed': not failures
+            }, f, indent=2)
+
+    print()
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print("PASS")
+
+
+if __name__ == '__main__':
+    main_cli()
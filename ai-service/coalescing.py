@@ -0,0 +1,68 @@
+"""
+Request coalescing for the AtmosAI AI Service.
+
+At the top of the hour many users of the same city send byte-identical
+weather data within milliseconds. `SingleFlight` lets concurrent requests
+with the same key share one in-flight computation: the first caller starts
+it, later callers await the same result, and the key is forgotten as soon
+as the computation finishes, so nothing is served stale.
+
+Keys come from `payload_key`, a digest of the canonical JSON of only the
+inputs an endpoint reads. Requests that differ in fields the endpoint
+ignores (user preferences, hourly data for /analyze-weather) coalesce;
+70 and 70.0 do not, since they can render differently.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar('T')
+
+
+def _canonical_default(value: Any) -> Any:
+    if hasattr(value, 'model_dump'):
+        return value.model_dump()
+    return repr(value)
+
+
+def payload_key(endpoint: str, *inputs: Any) -> tuple:
+    """(endpoint, 128-bit digest of the inputs with keys sorted)"""
+    canonical = json.dumps(inputs, sort_keys=True, separators=(',', ':'), default=_canonical_default)
+    return endpoint, hashlib.blake2b(canonical.encode(), digest_size=16).digest()
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one computation; only used from the event loop"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        """Result of `compute()`, or of the identical computation already in flight.
+
+        The computation runs in its own task, so a caller that disconnects
+        does not cancel it for the others. Exceptions reach every caller.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = self._calls[key] = asyncio.ensure_future(compute())
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.followers += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'in_flight': len(self._calls),
+            'computations': self.leaders,
+            'coalesced': self.followers
+        }
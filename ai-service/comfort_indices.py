@@ -0,0 +1,231 @@
+"""
+Derived comfort indices for the AtmosAI AI Service.
+
+The analyzers classify temperature, humidity and wind one at a time, but
+88°F at 75% humidity feels like 103°F and 20°F in a 25 mph wind like 3°F.
+This module derives what the body actually feels from those readings:
+
+    heat_index            NWS heat index: Steadman's simple formula, and the
+                          Rothfusz regression with the NWS low/high humidity
+                          adjustments once the result reaches 80°F
+    wind_chill            NWS (2001) wind chill, defined at or below 50°F with
+                          wind above 3 mph; the air temperature elsewhere
+    dew_point             Magnus formula (Alduchov and Eskridge coefficients);
+                          undefined (None/NaN) at 0% humidity
+    apparent_temperature  "Feels like": the wind chill where it is defined,
+                          the heat index at 80°F and above, else the air
+                          temperature
+
+Units follow WeatherData: °F, mph and relative humidity in percent, which
+is clipped to 0-100. The scalar functions serve a single `current` reading
+in plain Python; `comfort_many` evaluates the same formulas over whole
+arrays (a full hourly series, a batch of locations) with NumPy.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Rothfusz regression: c0 + c1 T + c2 R + c3 T R + c4 T² + c5 R² + c6 T² R + c7 T R² + c8 T² R²
+ROTHFUSZ_COEFFICIENTS = (
+    -42.379, 2.04901523, 10.14333127, -0.22475541, -6.83783e-3,
+    -5.481717e-2, 1.22874e-3, 8.5282e-4, -1.99e-6
+)
+HEAT_INDEX_REGRESSION_MIN = 80
+WIND_CHILL_MAX_TEMPERATURE = 50
+WIND_CHILL_MIN_WIND_SPEED = 3
+# Magnus formula coefficients, degrees Celsius
+MAGNUS_B = 17.625
+MAGNUS_C = 243.04
+
+INDICES = ('heat_index', 'wind_chill', 'dew_point', 'apparent_temperature')
+
+
+# The polynomials below take floats or arrays alike
+def _steadman(temperature, humidity):
+    simple = 0.5 * (temperature + 61.0 + (temperature - 68.0) * 1.2 + humidity * 0.094)
+    return (simple + temperature) / 2
+
+
+def _rothfusz(temperature, humidity):
+    c = ROTHFUSZ_COEFFICIENTS
+    t2 = temperature * temperature
+    r2 = humidity * humidity
+    return (
+        c[0] + c[1] * temperature + c[2] * humidity + c[3] * temperature * humidity + c[4] * t2
+        + c[5] * r2 + c[6] * t2 * humidity + c[7] * temperature * r2 + c[8] * t2 * r2
+    )
+
+
+def _wind_chill(temperature, wind_power):
+    """NWS formula, `wind_power` being the wind speed to the 0.16"""
+    return 35.74 + 0.6215 * temperature - 35.75 * wind_power + 0.4275 * temperature * wind_power
+
+
+def _clip_humidity(humidity: float) -> float:
+    return min(max(humidity, 0.0), 100.0)
+
+
+def heat_index(temperature: float, humidity: float) -> float:
+    humidity = _clip_humidity(humidity)
+    simple = _steadman(temperature, humidity)
+    if simple < HEAT_INDEX_REGRESSION_MIN:
+        return simple
+    index = _rothfusz(temperature, humidity)
+    if humidity < 13 and 80 <= temperature <= 112:
+        index -= (13 - humidity) / 4 * math.sqrt((17 - abs(temperature - 95)) / 17)
+    elif humidity > 85 and 80 <= temperature <= 87:
+        index += (humidity - 85) / 10 * ((87 - temperature) / 5)
+    return index
+
+
+def wind_chill(temperature: float, wind_speed: float) -> float:
+    if temperature > WIND_CHILL_MAX_TEMPERATURE or wind_speed <= WIND_CHILL_MIN_WIND_SPEED:
+        return temperature
+    return _wind_chill(temperature, wind_speed ** 0.16)
+
+
+def dew_point(temperature: float, humidity: float) -> Optional[float]:
+    # The ratio, not the humidity: a subnormal humidity divides down to 0
+    ratio = _clip_humidity(humidity) / 100
+    if ratio <= 0:
+        return None
+    celsius = (temperature - 32) * 5 / 9
+    gamma = math.log(ratio) + MAGNUS_B * celsius / (MAGNUS_C + celsius)
+    return MAGNUS_C * gamma / (MAGNUS_B - gamma) * 9 / 5 + 32
+
+
+def apparent_temperature(temperature: float, humidity: float, wind_speed: float) -> float:
+    if temperature <= WIND_CHILL_MAX_TEMPERATURE and wind_speed > WIND_CHILL_MIN_WIND_SPEED:
+        return wind_chill(temperature, wind_speed)
+    if temperature >= HEAT_INDEX_REGRESSION_MIN:
+        return heat_index(temperature, humidity)
+    return temperature
+
+
+def _readings(values: Sequence[Any]) -> np.ndarray:
+    """Float array of readings; NaN for any value `_finite` rejects, such as ints past the float range"""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (OverflowError, TypeError, ValueError):
+        return np.array([value if _finite(value) else np.nan for value in values], dtype=np.float64)
+
+
+def comfort_many(temperatures: Sequence[float], humidities: Sequence[float],
+                 wind_speeds: Sequence[float]) -> Dict[str, np.ndarray]:
+    """Every index in INDICES over whole arrays of readings, element-wise like the scalar functions"""
+    temperature = _readings(temperatures)
+    humidity = np.clip(_readings(humidities), 0.0, 100.0)
+    wind = _readings(wind_speeds)
+
+    # Readings near the float limits overflow to inf or NaN, which rounded_lists turns into None
+    with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+        heat = _steadman(temperature, humidity)
+        regression = heat >= HEAT_INDEX_REGRESSION_MIN
+        if regression.any():
+            adjusted = _rothfusz(temperature, humidity)
+            in_range = (temperature >= 80) & (temperature <= 112)
+            dry = (humidity < 13) & in_range
+            humid = (humidity > 85) & (temperature >= 80) & (temperature <= 87)
+            adjusted -= np.where(dry, (13 - humidity) / 4 * np.sqrt((17 - np.abs(temperature - 95)) / 17), 0.0)
+            adjusted += np.where(humid, (humidity - 85) / 10 * ((87 - temperature) / 5), 0.0)
+            heat = np.where(regression, adjusted, heat)
+
+        chilled = (temperature <= WIND_CHILL_MAX_TEMPERATURE) & (wind > WIND_CHILL_MIN_WIND_SPEED)
+        chill = np.where(chilled, _wind_chill(temperature, np.power(wind, 0.16)), temperature)
+
+        celsius = (temperature - 32) * 5 / 9
+        ratio = humidity / 100
+        gamma = np.log(ratio) + MAGNUS_B * celsius / (MAGNUS_C + celsius)
+        dew = np.where(ratio > 0, MAGNUS_C * gamma / (MAGNUS_B - gamma) * 9 / 5 + 32, np.nan)
+
+    apparent = np.where(chilled, chill, np.where(temperature >= HEAT_INDEX_REGRESSION_MIN, heat, temperature))
+    indices = {'heat_index': heat, 'wind_chill': chill, 'dew_point': dew, 'apparent_temperature': apparent}
+    undefined = ~(np.isfinite(temperature) & np.isfinite(humidity) & np.isfinite(wind))
+    if undefined.any():
+        # Like ComfortIndices.from_readings: no index unless all three readings are finite
+        for values in indices.values():
+            values[undefined] = np.nan
+    return indices
+
+
+def _finite(value: Any) -> bool:
+    """True for an int or float the formulas can take: finite and within the float range"""
+    if not isinstance(value, (int, float)):
+        return False
+    try:
+        return math.isfinite(value)
+    except OverflowError:
+        # An int past the float range
+        return False
+
+
+def _rounded(value: Optional[float]) -> Optional[float]:
+    if value is None or not math.isfinite(value * 10):
+        # Undefined, or too large to round to one decimal
+        return None
+    # Same arithmetic as np.round(values, 1), so scalar and array results agree
+    return round(value * 10) / 10
+
+
+def rounded_lists(indices: Dict[str, np.ndarray]) -> Dict[str, list]:
+    """`comfort_many` output as JSON-ready lists, one decimal, None where undefined"""
+    lists = {}
+    for name, values in indices.items():
+        with np.errstate(over='ignore'):
+            rounded = np.round(values, 1)
+        # Undefined, or too large to round to one decimal, as in `_rounded`
+        undefined = ~np.isfinite(rounded)
+        if undefined.any():
+            rounded = rounded.astype(object)
+            rounded[undefined] = None
+        lists[name] = rounded.tolist()
+    return lists
+
+
+def comfort_dicts(temperatures: Sequence[float], humidities: Sequence[float],
+                  wind_speeds: Sequence[float]) -> List[Dict[str, Optional[float]]]:
+    """One `ComfortIndices.to_dict()` per reading, computed over whole arrays"""
+    columns = rounded_lists(comfort_many(temperatures, humidities, wind_speeds))
+    return [dict(zip(INDICES, values)) for values in zip(*(columns[name] for name in INDICES))]
+
+
+class ComfortIndices:
+    """The derived indices of one reading"""
+
+    __slots__ = INDICES
+
+    def __init__(self, heat_index: Optional[float], wind_chill: Optional[float], dew_point: Optional[float],
+                 apparent_temperature: Optional[float]):
+        self.heat_index = heat_index
+        self.wind_chill = wind_chill
+        self.dew_point = dew_point
+        self.apparent_temperature = apparent_temperature
+
+    @classmethod
+    def from_readings(cls, temperature: Any, humidity: Any, wind_speed: Any) -> 'ComfortIndices':
+        """Indices of one reading; all None unless the three readings are numbers"""
+        if not (_finite(temperature) and _finite(humidity) and _finite(wind_speed)):
+            return cls(None, None, None, None)
+        return cls(
+            heat_index(temperature, humidity),
+            wind_chill(temperature, wind_speed),
+            dew_point(temperature, humidity),
+            apparent_temperature(temperature, humidity, wind_speed)
+        )
+
+    @classmethod
+    def from_features(cls, features) -> 'ComfortIndices':
+        return cls.from_readings(features.temperature, features.humidity, features.wind_speed)
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        return {
+            'heat_index': _rounded(self.heat_index),
+            'wind_chill': _rounded(self.wind_chill),
+            'dew_point': _rounded(self.dew_point),
+            'apparent_temperature': _rounded(self.apparent_temperature)
+        }
+
+    def __repr__(self) -> str:
+        return f"ComfortIndices({', '.join(f'{name}={getattr(self, name)!r}' for name in INDICES)})"
@@ -0,0 +1,129 @@
+"""
+Precomputed /analyze-weather results for the AtmosAI AI Service.
+
+Each of the five factors WeatherAnalyzer classifies falls into one of three
+buckets, so there are only 3**5 = 243 distinct analyses. They are built once
+at startup, frozen, and shared by every request; the hot path encodes the
+bucket codes into an integer and indexes the table.
+
+A learned risk model (risk_model.py) may overrule the thresholds' overall
+risk level, so every combination is also kept with each of the three
+levels; only the per-factor analyses come from the buckets then.
+"""
+
+import copyreg
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+from vector_analyzer import FACTORS, RISK_LEVELS
+from weather_features import RiskAssessment, WeatherAssessment
+
+BUCKETS_PER_FACTOR = 3
+TABLE_SIZE = BUCKETS_PER_FACTOR ** len(FACTORS)
+
+# Place value of each factor in the combined code (temperature most significant)
+CODE_WEIGHTS = np.array(
+    [BUCKETS_PER_FACTOR ** power for power in reversed(range(len(FACTORS)))],
+    dtype=np.int16
+)
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts and lists into read-only equivalents"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def _mapping_proxy(mapping: Dict[str, Any]) -> Mapping[str, Any]:
+    return MappingProxyType(mapping)
+
+
+# Frozen bodies are returned from analysis pool processes (see executor.py), so they must pickle
+copyreg.pickle(MappingProxyType, lambda proxy: (_mapping_proxy, (dict(proxy),)))
+
+
+def encode(condition_codes: Sequence[int]) -> int:
+    """Combine per-factor bucket codes into a single table index"""
+    code = 0
+    for condition_code in condition_codes:
+        code = code * BUCKETS_PER_FACTOR + condition_code
+    return code
+
+
+def encode_many(conditions: np.ndarray) -> np.ndarray:
+    """Vectorized `encode` for a (5, n) condition array from VectorizedWeatherAnalyzer"""
+    return CODE_WEIGHTS @ conditions.astype(np.int16)
+
+
+def decode(code: int) -> tuple:
+    """Split a table index back into per-factor bucket codes"""
+    condition_codes = []
+    for _ in FACTORS:
+        code, condition_code = divmod(code, BUCKETS_PER_FACTOR)
+        condition_codes.append(condition_code)
+    return tuple(reversed(condition_codes))
+
+
+class DecisionTable:
+    """Frozen /analyze-weather response bodies for every bucket combination.
+
+    `build_insights` turns an analysis into the response body; it is called
+    once per combination while the table is built and never on the hot path.
+    """
+
+    def __init__(self, analyzer, vector_analyzer, build_insights: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        entries = []
+        level_entries = []
+        for code in range(TABLE_SIZE):
+            results = [
+                vector_analyzer.condition_results[row][condition_code]
+                for row, condition_code in enumerate(decode(code))
+            ]
+            risk = analyzer._calculate_risk_level(results)
+            entries.append(self._entry(WeatherAssessment(results, risk), build_insights))
+            level_entries.append(tuple(
+                self._entry(
+                    WeatherAssessment(results, RiskAssessment(level, risk.factors, analyzer._get_overall_recommendations(level))),
+                    build_insights
+                )
+                for level in RISK_LEVELS
+            ))
+        self.entries = tuple(entries)
+        self.level_entries = tuple(level_entries)
+
+    @staticmethod
+    def _entry(assessment: WeatherAssessment, build_insights: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Mapping[str, Any]:
+        body = build_insights(assessment.to_dict())
+        body['analysis'].pop('timestamp', None)
+        body.pop('timestamp', None)
+        return freeze(body)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, code: int) -> Mapping[str, Any]:
+        """Shared, read-only response body (without timestamps) for `code`"""
+        return self.entries[code]
+
+    def response(self, code: int, timestamp: str, level: Optional[int] = None, confidence: Optional[float] = None) -> Dict[str, Any]:
+        """Response body for `code` stamped with `timestamp`.
+
+        `level` (an index into RISK_LEVELS) and `confidence` replace the
+        thresholds' overall risk and the fixed confidence when a risk model
+        scored the readings. Only the two outer dicts are allocated; every
+        list and nested analysis is shared with the table.
+        """
+        body = self.entries[code] if level is None else self.level_entries[code][level]
+        response = {
+            **body,
+            'analysis': {**body['analysis'], 'timestamp': timestamp},
+            'timestamp': timestamp
+        }
+        if confidence is not None:
+            response['confidence'] = confidence
+        return response
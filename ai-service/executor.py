@@ -0,0 +1,115 @@
+"""
+Off-loop execution of CPU-bound analysis for the AtmosAI AI Service.
+
+The endpoints are `async def`, so analysis run inline blocks the event loop
+and every other connection on the worker waits for it. `AnalysisExecutor`
+runs analysis callables in a thread or process pool instead, but only when
+the work is large enough to be worth the hand-off: a single set of current
+readings takes microseconds, less than the cost of crossing to a pool
+thread, so small requests stay inline.
+
+Threads keep the loop responsive (the interpreter switches threads every few
+milliseconds) but share one core for pure-Python work. Processes run
+analysis in parallel; callables and their arguments must then be picklable,
+module-level functions, and each worker process imports the app once.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from profiling import profiled_call, task_stats
+
+logger = logging.getLogger(__name__)
+
+INLINE, THREAD, PROCESS = 'inline', 'thread', 'process'
+EXECUTOR_MODES = (INLINE, THREAD, PROCESS)
+
+
+def _cpu_count() -> int:
+    if hasattr(os, 'sched_getaffinity'):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+class AnalysisExecutor:
+    """Runs analysis inline or in a pool depending on the size of the work"""
+
+    def __init__(self, mode: str = THREAD, max_workers: Optional[int] = None, min_size: int = 64,
+                 initializer: Optional[Callable[[], Any]] = None):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode '{mode}'. Valid modes: {', '.join(EXECUTOR_MODES)}")
+        self.mode = mode
+        self.max_workers = max_workers or _cpu_count()
+        self.min_size = max(1, min_size)
+        self.initializer = initializer
+        self.inline_calls = 0
+        self.offloaded_calls = 0
+        self.in_flight = 0
+        self._pool: Optional[Executor] = None
+
+    def offloads(self, size: int) -> bool:
+        """Whether work of `size` units (entries, items, ...) leaves the event loop"""
+        return self.mode != INLINE and size >= self.min_size
+
+    def _get_pool(self) -> Executor:
+        # Created on first offload so importing the app starts no threads or processes
+        if self._pool is None:
+            if self.mode == THREAD:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='analysis')
+            else:
+                # spawn, not fork: the server process already runs threads (model warmup, anyio)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=self.initializer
+                )
+            logger.info(f"Started {self.mode} pool with {self.max_workers} workers for analysis")
+        return self._pool
+
+    async def run(self, fn: Callable[..., Any], *args: Any, size: int = 1) -> Any:
+        """`fn(*args)`, in the pool if `size` reaches the threshold, otherwise inline"""
+        if not self.offloads(size):
+            self.inline_calls += 1
+            return fn(*args)
+
+        pool = self._get_pool()
+        # A profiled request's tasks are profiled where they run; the loop thread's profiler cannot see them
+        profiles = task_stats()
+        if profiles is not None:
+            fn, args = profiled_call, (fn, *args)
+        if self.mode == THREAD:
+            # Context variables (the metrics endpoint label) do not follow run_in_executor on their own
+            call = functools.partial(contextvars.copy_context().run, fn, *args)
+        else:
+            call = functools.partial(fn, *args)
+        self.offloaded_calls += 1
+        self.in_flight += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(pool, call)
+        finally:
+            self.in_flight -= 1
+        if profiles is not None:
+            result, stats = result
+            profiles.append(stats)
+        return result
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'mode': self.mode,
+            'max_workers': self.max_workers,
+            'min_size': self.min_size,
+            'inline_calls': self.inline_calls,
+            'offloaded_calls': self.offloaded_calls,
+            'in_flight': self.in_flight
+        }
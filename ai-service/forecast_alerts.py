@@ -0,0 +1,237 @@
+"""
+Forecast-window alerting for the AtmosAI AI Service.
+
+AlertGenerator looks at `current` only and guesses how long an alert lasts.
+`alert_windows` scans WeatherData.hourly followed by the daily forecast in
+one vectorized pass, checks every slot against the alert thresholds at
+once, and merges consecutive exceeding slots into windows with real start
+and end times, so a heat wave two days out is one alert from its first hot
+slot to its last.
+
+Slots are laid end to end: a reading holds until the next one starts.
+Hourly entries start at their `time` (the last one lasts as long as the
+typical spacing between them); forecast days take over where the hourly
+entries end. Missing readings never exceed a threshold.
+"""
+
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Alert thresholds shared with AlertGenerator
+SEVERE_CONDITIONS = ('thunderstorm', 'tornado', 'hurricane', 'blizzard')
+SEVERE_WIND_SPEED = 30
+AQI_ALERT = 100
+UV_ALERT = 8
+HEAT_ALERT = 90
+COLD_ALERT = 20
+
+# Window kinds, one column each in the exceedance matrix
+SEVERE, AIR_QUALITY, UV, HEAT, COLD = 'severe_weather', 'air_quality', 'uv', 'heat', 'cold'
+WINDOW_KINDS = (SEVERE, AIR_QUALITY, UV, HEAT, COLD)
+
+# Slot readings: daily forecasts give a high and a low temperature, hourly entries one temperature for both
+HIGH, LOW, AQI, UV_INDEX, WIND, SEVERE_CONDITION = range(6)
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+
+class AlertWindow:
+    """One merged run of slots exceeding a threshold"""
+
+    __slots__ = ('kind', 'start', 'end', 'peak_time', 'peak_value', 'peak_entry', 'slots')
+
+    def __init__(self, kind: str, start: datetime, end: datetime, peak_time: datetime, peak_value: float,
+                 peak_entry: Dict[str, Any], slots: int):
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.peak_time = peak_time
+        self.peak_value = peak_value
+        self.peak_entry = peak_entry
+        self.slots = slots
+
+    def __repr__(self) -> str:
+        return f"AlertWindow(kind={self.kind!r}, start={self.start.isoformat()}, end={self.end.isoformat()}, peak={self.peak_value!r})"
+
+
+def parse_time(value: Any) -> Optional[datetime]:
+    """Aware UTC datetime from an ISO string, a date string or epoch seconds; None if unreadable"""
+    try:
+        if isinstance(value, str):
+            parsed = datetime.fromisoformat(value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            return datetime.fromtimestamp(value, tz=timezone.utc)
+        else:
+            return None
+    except (ValueError, OverflowError, OSError):
+        return None
+    return as_utc(parsed)
+
+
+def as_utc(moment: datetime) -> datetime:
+    """Aware UTC datetime; naive ones are taken to be UTC already"""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+# Types np.array converts the way _number does; bools and numeric strings are not among them
+_PLAIN_NUMBER_TYPES = frozenset((int, float, type(None)))
+
+
+def _number(value: Any) -> float:
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return np.nan
+    try:
+        return float(value)
+    except OverflowError:
+        # An int past the float range is still past every threshold
+        return math.inf if value > 0 else -math.inf
+
+
+def _numbers(values: List[Any]) -> np.ndarray:
+    """Float column with NaN for missing or non-numeric values"""
+    if {type(value) for value in values} <= _PLAIN_NUMBER_TYPES:
+        try:
+            # None becomes NaN; the common all-numeric column never leaves C
+            return np.array(values, dtype=np.float64)
+        except OverflowError:
+            pass
+    return np.array([_number(value) for value in values], dtype=np.float64)
+
+
+def _field(values: List[Any], key: str) -> List[Any]:
+    return [value.get(key) if isinstance(value, dict) else None for value in values]
+
+
+def readings(entries: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """(n, 6) float matrix of the readings the thresholds look at, one row per entry"""
+    temperatures = [entry.get('temperature') for entry in entries]
+    if any(isinstance(temperature, dict) for temperature in temperatures):
+        # Daily forecasts: {'min': .., 'max': ..}; hourly entries keep their single value in both
+        high = _numbers([t.get('max') if isinstance(t, dict) else t for t in temperatures])
+        low = _numbers([t.get('min') if isinstance(t, dict) else t for t in temperatures])
+    else:
+        high = low = _numbers(temperatures)
+    severe = [
+        isinstance(main, str) and main.lower() in SEVERE_CONDITIONS
+        for main in _field([entry.get('condition') for entry in entries], 'main')
+    ]
+    return np.column_stack((
+        high,
+        low,
+        _numbers(_field([entry.get('airQuality') for entry in entries], 'aqi')),
+        _numbers([entry.get('uvIndex') for entry in entries]),
+        _numbers([entry.get('windSpeed') for entry in entries]),
+        np.array(severe, dtype=np.float64)
+    ))
+
+
+def _slot_starts(entries: Sequence[Dict[str, Any]], key: str, anchor: datetime, default_step: timedelta) -> tuple:
+    """Start of each entry's slot and the step used past the last one"""
+    parsed = [parse_time(entry.get(key)) for entry in entries]
+    known = [moment for moment in parsed if moment is not None]
+    gaps = [later - earlier for earlier, later in zip(known, known[1:]) if later > earlier]
+    step = sorted(gaps)[len(gaps) // 2] if gaps else default_step
+    starts = []
+    previous = None
+    for moment in parsed:
+        if moment is None or (previous is not None and moment <= previous):
+            # Unreadable or out of order: follow the previous slot
+            moment = anchor if previous is None else previous + step
+        starts.append(moment)
+        previous = moment
+    return starts, step
+
+
+def exceedances(values: np.ndarray) -> np.ndarray:
+    """(n, len(WINDOW_KINDS)) boolean matrix: which thresholds each slot exceeds"""
+    with np.errstate(invalid='ignore'):
+        return np.column_stack((
+            (values[:, SEVERE_CONDITION] > 0) | (values[:, WIND] > SEVERE_WIND_SPEED),
+            values[:, AQI] > AQI_ALERT,
+            values[:, UV_INDEX] >= UV_ALERT,
+            values[:, HIGH] > HEAT_ALERT,
+            values[:, LOW] < COLD_ALERT
+        ))
+
+
+def column_runs(mask: np.ndarray) -> List[tuple]:
+    """(column, start, end) for each run of True down each column of a 2-d mask, end inclusive"""
+    padded = np.zeros((mask.shape[0] + 2, mask.shape[1]), dtype=np.int8)
+    padded[1:-1] = mask
+    rows, columns = np.nonzero(np.diff(padded, axis=0))
+    # Edges alternate start, stop within a column once sorted by column then row
+    order = np.lexsort((rows, columns))
+    rows, columns = rows[order], columns[order]
+    return [
+        (int(column), int(start), int(stop) - 1)
+        for column, start, stop in zip(columns[::2].tolist(), rows[::2].tolist(), rows[1::2].tolist())
+    ]
+
+
+# Reading whose extreme is reported for each kind, and whether the extreme is the minimum
+_PEAKS = {SEVERE: (WIND, False), AIR_QUALITY: (AQI, False), UV: (UV_INDEX, False), HEAT: (HIGH, False), COLD: (LOW, True)}
+
+
+def alert_windows(hourly: Sequence[Dict[str, Any]], forecast: Sequence[Dict[str, Any]],
+                  now: Optional[datetime] = None) -> List[AlertWindow]:
+    """Merged threshold-exceeding windows over the hourly entries and the forecast days that follow them.
+
+    Windows that ended before `now` are left out. Returned in start order.
+    """
+    now = as_utc(now) if now is not None else datetime.now(timezone.utc)
+    hourly_starts, hourly_step = _slot_starts(hourly, 'time', now, HOUR)
+    day_starts, _ = _slot_starts(forecast, 'date', now, DAY)
+
+    entries: List[Dict[str, Any]] = list(hourly)
+    starts = list(hourly_starts)
+    horizon = hourly_starts[-1] + hourly_step if hourly_starts else None
+    for entry, day_start in zip(forecast, day_starts):
+        if horizon is not None and day_start + DAY <= horizon:
+            # Fully covered by hourly entries
+            continue
+        entries.append(entry)
+        starts.append(max(day_start, horizon) if horizon is not None else day_start)
+    if not entries:
+        return []
+    ends = starts[1:] + [starts[-1] + (hourly_step if len(entries) == len(hourly) else DAY)]
+
+    values = readings(entries)
+    # Windows are short: finding their peaks in Python beats a NumPy call per window
+    columns = values.T.tolist()
+    windows = []
+    for column, start, end in column_runs(exceedances(values)):
+        if ends[end] <= now:
+            continue
+        kind = WINDOW_KINDS[column]
+        reading, lowest = _PEAKS[kind]
+        span = range(start, end + 1)
+        series = columns[reading]
+        if kind == SEVERE and not any(series[slot] > SEVERE_WIND_SPEED for slot in span):
+            # Condition-only window: report its first severe-condition slot
+            peak = next(slot for slot in span if columns[SEVERE_CONDITION][slot])
+        else:
+            # NaN readings compare false, so they never become the peak unless all are NaN
+            peak = start
+            for slot in span:
+                if (series[slot] < series[peak]) if lowest else (series[slot] > series[peak]):
+                    peak = slot
+                elif series[peak] != series[peak]:
+                    peak = slot
+        value = series[peak]
+        windows.append(AlertWindow(
+            kind=kind,
+            start=starts[start],
+            end=ends[end],
+            peak_time=starts[peak],
+            peak_value=int(value) if float(value).is_integer() else round(float(value), 1),
+            peak_entry=entries[peak],
+            slots=end - start + 1
+        ))
+    windows.sort(key=lambda window: (window.start, WINDOW_KINDS.index(window.kind)))
+    return windows
@@ -0,0 +1,278 @@
+"""
+Geohash grid for the AtmosAI AI Service.
+
+Saved locations cluster: hundreds of users' places can fall in the same few
+square kilometres and share one upstream observation. Keying work by grid
+cell instead of by location makes its cost grow with the number of occupied
+cells, not the number of locations.
+
+Cells are standard geohashes. A cell of precision p is the interleaving of
+5p bits, longitude first, that halve the longitude and latitude ranges in
+turn, written in the geohash base32 alphabet, so a cell's prefixes are the
+cells containing it. Approximate cell sizes:
+
+    precision   cell size
+    4           39 km x 20 km
+    5           4.9 km x 4.9 km
+    6           1.2 km x 0.61 km
+    7           153 m x 153 m
+
+`encode` handles one point in plain Python; `encode_many` encodes whole
+coordinate arrays with NumPy and gives the same cells.
+"""
+
+import math
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_DECODE = {char: value for value, char in enumerate(BASE32)}
+_ALPHABET = np.frombuffer(BASE32.encode(), dtype=np.uint8)
+# Value of each byte in BASE32 (upper case too), -1 for bytes outside it
+_CHAR_VALUES = np.full(256, -1, dtype=np.int64)
+_CHAR_VALUES[_ALPHABET] = np.arange(32)
+_CHAR_VALUES[np.frombuffer(BASE32.upper().encode(), dtype=np.uint8)] = np.arange(32)
+
+MAX_PRECISION = 12
+EARTH_RADIUS_KM = 6371.0088
+
+# Below this many points the plain Python path is faster than the NumPy one
+VECTORIZE_MIN_POINTS = 16
+
+
+def _bit_counts(precision: int) -> Tuple[int, int]:
+    """Longitude and latitude bits of a cell; longitude gets the odd bit"""
+    if not 1 <= precision <= MAX_PRECISION:
+        raise ValueError(f"Geohash precision must be between 1 and {MAX_PRECISION}, got {precision}")
+    bits = precision * 5
+    return (bits + 1) // 2, bits // 2
+
+
+def _quantize(value: float, low: float, span: float, bits: int) -> int:
+    """Index of the 2**bits slice of [low, low + span] containing value"""
+    slices = 1 << bits
+    index = int((value - low) / span * slices)
+    return min(max(index, 0), slices - 1)
+
+
+def _interleave(lng_index: int, lat_index: int, lng_bits: int, lat_bits: int) -> int:
+    code = 0
+    for bit in range(lng_bits + lat_bits):
+        # Even positions (from the most significant) are longitude bits
+        if bit % 2 == 0:
+            code = (code << 1) | ((lng_index >> (lng_bits - 1 - bit // 2)) & 1)
+        else:
+            code = (code << 1) | ((lat_index >> (lat_bits - 1 - bit // 2)) & 1)
+    return code
+
+
+def encode(lat: float, lng: float, precision: int = 6) -> str:
+    """Geohash cell of one point"""
+    if not (math.isfinite(lat) and math.isfinite(lng)):
+        raise ValueError(f"Cannot place ({lat}, {lng}) in a grid cell")
+    lng_bits, lat_bits = _bit_counts(precision)
+    code = _interleave(
+        _quantize(lng, -180.0, 360.0, lng_bits),
+        _quantize(lat, -90.0, 180.0, lat_bits),
+        lng_bits, lat_bits
+    )
+    return ''.join(BASE32[(code >> shift) & 31] for shift in range(precision * 5 - 5, -1, -5))
+
+
+def encode_many(lats: Sequence[float], lngs: Sequence[float], precision: int = 6) -> List[str]:
+    """Geohash cells of many points, computed over whole arrays"""
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    if lats.shape != lngs.shape or lats.ndim != 1:
+        raise ValueError("Expected two one-dimensional coordinate arrays of the same length")
+    if len(lats) < VECTORIZE_MIN_POINTS:
+        return [encode(lat, lng, precision) for lat, lng in zip(lats.tolist(), lngs.tolist())]
+    if not (np.isfinite(lats).all() and np.isfinite(lngs).all()):
+        raise ValueError("Cannot place non-finite coordinates in a grid cell")
+
+    lng_bits, lat_bits = _bit_counts(precision)
+    lng_index = np.clip(((lngs + 180.0) / 360.0 * (1 << lng_bits)).astype(np.int64), 0, (1 << lng_bits) - 1)
+    lat_index = np.clip(((lats + 90.0) / 180.0 * (1 << lat_bits)).astype(np.int64), 0, (1 << lat_bits) - 1)
+    code = np.zeros(len(lats), dtype=np.int64)
+    for bit in range(lng_bits + lat_bits):
+        source, width = (lng_index, lng_bits) if bit % 2 == 0 else (lat_index, lat_bits)
+        code = (code << 1) | ((source >> (width - 1 - bit // 2)) & 1)
+
+    shifts = np.arange(precision * 5 - 5, -1, -5, dtype=np.int64)
+    chars = _ALPHABET[(code[:, None] >> shifts) & 31]
+    return np.ascontiguousarray(chars).view(f'S{precision}').ravel().astype(str).tolist()
+
+
+def decode(cell: str) -> Tuple[float, float, float, float]:
+    """Center (lat, lng) of a cell and its half height and half width in degrees"""
+    try:
+        code = 0
+        for char in cell.lower():
+            code = (code << 5) | _DECODE[char]
+    except KeyError:
+        raise ValueError(f"'{cell}' is not a geohash") from None
+    lng_bits, lat_bits = _bit_counts(len(cell))
+    lng_index = lat_index = 0
+    for bit in range(lng_bits + lat_bits):
+        value = (code >> (lng_bits + lat_bits - 1 - bit)) & 1
+        if bit % 2 == 0:
+            lng_index = (lng_index << 1) | value
+        else:
+            lat_index = (lat_index << 1) | value
+    lat_half = 90.0 / (1 << lat_bits)
+    lng_half = 180.0 / (1 << lng_bits)
+    return (
+        -90.0 + (2 * lat_index + 1) * lat_half,
+        -180.0 + (2 * lng_index + 1) * lng_half,
+        lat_half,
+        lng_half
+    )
+
+
+def decode_many(cells: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """`decode` over many cells of one precision, as arrays"""
+    if not cells:
+        empty = np.zeros(0)
+        return empty, empty, empty, empty
+    precision = len(cells[0])
+    lng_bits, lat_bits = _bit_counts(precision)
+    try:
+        chars = np.array(cells, dtype=f'S{precision}')
+    except UnicodeEncodeError:
+        raise ValueError("Cells must be geohashes") from None
+    values = _CHAR_VALUES[chars.view(np.uint8).reshape(len(cells), precision)]
+    if any(len(cell) != precision for cell in cells) or (values < 0).any():
+        raise ValueError(f"Cells must be geohashes of one precision ({precision})")
+
+    code = np.zeros(len(cells), dtype=np.int64)
+    for column in range(precision):
+        code = (code << 5) | values[:, column]
+    lng_index = np.zeros(len(cells), dtype=np.int64)
+    lat_index = np.zeros(len(cells), dtype=np.int64)
+    for bit in range(lng_bits + lat_bits):
+        value = (code >> (lng_bits + lat_bits - 1 - bit)) & 1
+        if bit % 2 == 0:
+            lng_index = (lng_index << 1) | value
+        else:
+            lat_index = (lat_index << 1) | value
+    lat_half = 90.0 / (1 << lat_bits)
+    lng_half = 180.0 / (1 << lng_bits)
+    return (
+        -90.0 + (2 * lat_index + 1) * lat_half,
+        -180.0 + (2 * lng_index + 1) * lng_half,
+        np.full(len(cells), lat_half),
+        np.full(len(cells), lng_half)
+    )
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def cell_radius_km(cell: str) -> float:
+    """Distance from a cell's center to its farthest corner, so the circle covers the cell"""
+    lat, lng, lat_half, lng_half = decode(cell)
+    # A degree of longitude is wider on the side nearer the equator, so measure both corners
+    return max(
+        haversine_km(lat, lng, lat + lat_half, lng + lng_half),
+        haversine_km(lat, lng, lat - lat_half, lng + lng_half)
+    )
+
+
+def haversine_many_km(lat1: np.ndarray, lng1: np.ndarray, lat2: np.ndarray, lng2: np.ndarray) -> np.ndarray:
+    """Element-wise great-circle distances between two sets of points"""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(np.radians(lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def cell_geometry(cells: Sequence[str]) -> Tuple[List[float], List[float], List[float]]:
+    """Center latitudes, center longitudes and `cell_radius_km` of many cells of one precision"""
+    lat, lng, lat_half, lng_half = decode_many(cells)
+    radius = np.maximum(
+        haversine_many_km(lat, lng, lat + lat_half, lng + lng_half),
+        haversine_many_km(lat, lng, lat - lat_half, lng + lng_half)
+    )
+    return lat.tolist(), lng.tolist(), radius.tolist()
+
+
+class GridIndex:
+    """Members (location ids) grouped by the grid cell they fall in.
+
+    Cells and members keep insertion order. Not thread-safe: build one per
+    request, or guard a shared one.
+    """
+
+    def __init__(self, precision: int = 6):
+        _bit_counts(precision)
+        self.precision = precision
+        self._cells: Dict[str, Dict[Hashable, None]] = {}
+        self._member_cells: Dict[Hashable, str] = {}
+
+    def add(self, member: Hashable, lat: float, lng: float) -> str:
+        """Place a member, moving it if it was already indexed; returns its cell"""
+        cell = encode(lat, lng, self.precision)
+        self._place(member, cell)
+        return cell
+
+    def add_many(self, members: Sequence[Hashable], lats: Sequence[float], lngs: Sequence[float]) -> List[str]:
+        """Place many members at once; returns their cells in order"""
+        cells = encode_many(lats, lngs, self.precision)
+        if len(cells) != len(members):
+            raise ValueError("Expected one coordinate pair per member")
+        # _place inlined: this loop is most of the cost of indexing a large set
+        member_cells, groups = self._member_cells, self._cells
+        for member, cell in zip(members, cells):
+            previous = member_cells.get(member)
+            if previous is not None:
+                if previous == cell:
+                    continue
+                self._discard(member, previous)
+            member_cells[member] = cell
+            group = groups.get(cell)
+            if group is None:
+                group = groups[cell] = {}
+            group[member] = None
+        return cells
+
+    def _place(self, member: Hashable, cell: str) -> None:
+        previous = self._member_cells.get(member)
+        if previous == cell:
+            return
+        if previous is not None:
+            self._discard(member, previous)
+        self._member_cells[member] = cell
+        self._cells.setdefault(cell, {})[member] = None
+
+    def remove(self, member: Hashable) -> bool:
+        cell = self._member_cells.pop(member, None)
+        if cell is None:
+            return False
+        self._discard(member, cell)
+        return True
+
+    def _discard(self, member: Hashable, cell: str) -> None:
+        members = self._cells[cell]
+        del members[member]
+        if not members:
+            del self._cells[cell]
+
+    def cell_of(self, member: Hashable) -> Optional[str]:
+        return self._member_cells.get(member)
+
+    def members(self, cell: str) -> List[Hashable]:
+        return list(self._cells.get(cell, ()))
+
+    def cells(self) -> Dict[str, List[Hashable]]:
+        """Every occupied cell with its members"""
+        return {cell: list(members) for cell, members in self._cells.items()}
+
+    def __len__(self) -> int:
+        return len(self._member_cells)
+
+    def __contains__(self, member: Hashable) -> bool:
+        return member in self._member_cells
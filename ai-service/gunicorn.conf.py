@@ -0,0 +1,36 @@
+"""
+Gunicorn configuration for running the AtmosAI AI Service in production.
+
+    gunicorn -c gunicorn.conf.py main:app
+
+Every setting can be overridden from the environment (see env.example).
+"""
+
+import os
+
+from serving import default_workers, warm_app
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', 8000)}"
+workers = default_workers()
+worker_class = "serving.AtmosUvicornWorker"
+
+# Import the app and load its models once in the master; workers inherit them on fork
+preload_app = True
+
+# Recycle each worker after this many requests (0 disables); jitter staggers the restarts
+max_requests = int(os.getenv("AI_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("AI_MAX_REQUESTS_JITTER", max_requests // 10))
+
+# SIGTERM lets in-flight requests finish for up to graceful_timeout seconds
+graceful_timeout = int(os.getenv("AI_GRACEFUL_TIMEOUT", 30))
+timeout = int(os.getenv("AI_WORKER_TIMEOUT", 60))
+keepalive = int(os.getenv("AI_KEEPALIVE", 5))
+
+loglevel = os.getenv("LOG_LEVEL", "info")
+accesslog = "-" if os.getenv("AI_ACCESS_LOG", "false").lower() in ("1", "true", "yes") else None
+errorlog = "-"
+
+
+def when_ready(server):
+    # Runs in the master after the app is preloaded and before any worker forks
+    warm_app(server.app.app_uri)
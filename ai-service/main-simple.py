@@ -4,9 +4,13 @@ from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import uvicorn
 import os
+import sys
 from datetime import datetime, timedelta
 import logging
 
+from responses import FastJSONResponse
+from weather_features import WeatherFeatures
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,7 +18,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="AtmosAI AI Service",
     description="AI-powered weather analysis and recommendations",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware
@@ -71,10 +76,10 @@ class WeatherAnalysisRequest(BaseModel):
 # Simple AI Analysis
 def analyze_weather_simple(weather_data: WeatherData) -> Dict[str, Any]:
     """Simple weather analysis without heavy ML dependencies"""
-    current = weather_data.current
+    features = WeatherFeatures.from_current(weather_data.current)
     
     # Basic temperature analysis
-    temp = current.get('temperature', 70)
+    temp = features.temperature
     if temp > 85:
         temp_condition = "hot"
         temp_recommendations = ["Stay hydrated", "Avoid prolonged sun exposure", "Wear light clothing"]
@@ -86,7 +91,7 @@ def analyze_weather_simple(weather_data: WeatherData) -> Dict[str, Any]:
         temp_recommendations = ["Enjoy outdoor activities"]
     
     # Humidity analysis
-    humidity = current.get('humidity', 50)
+    humidity = features.humidity
     if humidity > 80:
         humidity_condition = "high"
         humidity_recommendations = ["Use fans or AC", "Stay hydrated", "Avoid strenuous activities"]
@@ -98,7 +103,7 @@ def analyze_weather_simple(weather_data: WeatherData) -> Dict[str, Any]:
         humidity_recommendations = ["Normal humidity levels"]
     
     # UV Index analysis
-    uv_index = current.get('uvIndex', 0)
+    uv_index = features.uv_index
     if uv_index >= 8:
         uv_condition = "very_high"
         uv_recommendations = ["Avoid sun 10am-4pm", "Apply SPF 30+ sunscreen", "Wear protective clothing"]
@@ -110,8 +115,7 @@ def analyze_weather_simple(weather_data: WeatherData) -> Dict[str, Any]:
         uv_recommendations = ["Minimal sun protection needed"]
     
     # Air Quality analysis
-    air_quality = current.get('airQuality', {})
-    aqi = air_quality.get('aqi', 0)
+    aqi = features.aqi
     if aqi >= 100:
         air_condition = "unhealthy"
         air_recommendations = ["Limit outdoor activities", "Keep windows closed", "Use air purifiers"]
@@ -191,13 +195,13 @@ def get_overall_recommendations(risk_level: str) -> List[str]:
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
+    return FastJSONResponse({
         "status": "healthy",
         "service": "AtmosAI AI Service",
         "version": "1.0.0",
         "uptime": "running",
         "timestamp": datetime.now().isoformat()
-    }
+    })
 
 @app.post("/analyze-weather")
 async def analyze_weather(
@@ -237,14 +241,14 @@ async def analyze_weather(
                 'Postpone outdoor plans'
             ]
         
-        return {
+        return FastJSONResponse({
             "analysis": analysis,
             "health_tips": health_tips[:5],
             "activity_suggestions": activity_suggestions,
             "risk_assessment": analysis['overall_risk'],
             "confidence": 0.85,
             "timestamp": datetime.now().isoformat()
-        }
+        })
     except Exception as e:
         logger.error(f"Weather analysis error: {str(e)}")
         raise HTTPException(status_code=500, detail="Weather analysis failed")
@@ -256,13 +260,13 @@ async def generate_alerts(
 ):
     """Generate simple weather alerts"""
     try:
-        current = request.weather_data.current
+        features = WeatherFeatures.from_current(request.weather_data.current)
         alerts = []
         
         # Check for severe weather
-        temp = current.get('temperature', 70)
-        uv_index = current.get('uvIndex', 0)
-        air_quality = current.get('airQuality', {}).get('aqi', 0)
+        temp = features.temperature
+        uv_index = features.uv_index
+        air_quality = features.aqi
         
         if temp > 90:
             alerts.append({
@@ -291,12 +295,12 @@ async def generate_alerts(
                 "precautions": ["Limit outdoor activities", "Keep windows closed", "Use air purifiers"]
             })
         
-        return {
+        return FastJSONResponse({
             "alerts": alerts,
             "total_alerts": len(alerts),
             "confidence": 0.90,
             "timestamp": datetime.now().isoformat()
-        }
+        })
     except Exception as e:
         logger.error(f"Alert generation error: {str(e)}")
         raise HTTPException(status_code=500, detail="Alert generation failed")
@@ -308,9 +312,9 @@ async def event_recommendations(
 ):
     """Generate simple event recommendations"""
     try:
-        current = request.weather_data.current
-        temp = current.get('temperature', 70)
-        condition = current.get('condition', {}).get('main', '').lower()
+        features = WeatherFeatures.from_current(request.weather_data.current)
+        temp = features.temperature
+        condition = features.condition
         
         if temp > 85 or temp < 32:
             suitable_activities = [
@@ -346,13 +350,13 @@ async def event_recommendations(
                 'Enjoy outdoor activities'
             ]
         
-        return {
+        return FastJSONResponse({
             "suitable_activities": suitable_activities,
             "weather_considerations": weather_considerations,
             "optimal_times": ["Morning (8-11 AM)", "Afternoon (2-5 PM)", "Evening (6-8 PM)"],
             "confidence": 0.88,
             "timestamp": datetime.now().isoformat()
-        }
+        })
     except Exception as e:
         logger.error(f"Event recommendations error: {str(e)}")
         raise HTTPException(status_code=500, detail="Event recommendations failed")
@@ -364,11 +368,8 @@ async def health_insights(
 ):
     """Generate simple health insights"""
     try:
-        current = request.weather_data.current
-        temp = current.get('temperature', 70)
-        humidity = current.get('humidity', 50)
-        uv_index = current.get('uvIndex', 0)
-        air_quality = current.get('airQuality', {}).get('aqi', 0)
+        features = WeatherFeatures.from_current(request.weather_data.current)
+        temp, humidity, uv_index, air_quality, _ = features.readings()
         
         general_tips = [
             'Stay hydrated throughout the day',
@@ -409,22 +410,28 @@ async def health_insights(
         if not risk_factors:
             risk_factors.append('Normal risk level for current conditions')
         
-        return {
+        return FastJSONResponse({
             "general_tips": general_tips,
             "weather_specific": weather_specific,
             "risk_factors": risk_factors,
             "confidence": 0.87,
             "timestamp": datetime.now().isoformat()
-        }
+        })
     except Exception as e:
         logger.error(f"Health insights error: {str(e)}")
         raise HTTPException(status_code=500, detail="Health insights failed")
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "main-simple:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
+    # Same switch as run.py: auto-reload only in development
+    if "--production" in sys.argv or os.getenv("AI_ENV") == "production":
+        from serving import run_production
+
+        run_production("main-simple:app")
+    else:
+        uvicorn.run(
+            "main-simple:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=True,
+            log_level="info"
+        )
@@ -1,23 +1,140 @@
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from fastapi.responses import PlainTextResponse, Response
+from pydantic import BaseModel, ValidationError
+from typing import Optional, List, Dict, Any, Awaitable, Callable, Tuple
+from contextlib import asynccontextmanager
 import uvicorn
+import gc
+import math
 import os
+import sys
 from datetime import datetime, timedelta
 import logging
 import json
 
+from admission import AdmissionController, AdmissionLimit, AdmissionMiddleware, parse_limits
+from alert_state import AlertStateStore, location_key
+from alert_stream import DuplexStreamingResponse, stream_alerts
+from coalescing import SingleFlight, payload_key
+from comfort_indices import ComfortIndices, comfort_dicts
+from decision_table import DecisionTable, encode, encode_many
+from executor import INLINE, THREAD, AnalysisExecutor
+from forecast_alerts import (
+    AIR_QUALITY, AQI_ALERT, COLD_ALERT, HEAT_ALERT, SEVERE, SEVERE_CONDITIONS, SEVERE_WIND_SPEED, UV, UV_ALERT,
+    alert_windows
+)
+from geo_grid import MAX_PRECISION as GRID_MAX_PRECISION, GridIndex, cell_geometry, encode_many as encode_cells
+from metrics import MetricsMiddleware, metrics
+from micro_batching import MicroBatcher
+from model_registry import ModelRegistry
+from profiling import PROFILE_SORT_KEYS, ProfilingMiddleware, RequestProfiler
+from responses import FastJSONResponse, dumps
+from request_decoding import LeanBodyModel, decoded_body
+from result_cache import ResultCache
+from risk_model import RiskModel
+from risk_timeline import build_risk_timeline
+from spatial_index import SubscriptionIndex
+from vector_analyzer import VectorizedWeatherAnalyzer, is_numeric_reading
+from weather_features import ConditionResult, RiskAssessment, WeatherAssessment, WeatherFeatures
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Models and precomputed artifacts load on first use or in the startup warmup, never at import
+model_registry = ModelRegistry()
+
+def warm_analysis_process():
+    """Load models in a new analysis pool process before it takes work"""
+    model_registry.load_all()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    model_registry.warmup()
+    # Move everything loaded at import out of the collector's view; a full collection
+    # traversing it would otherwise stall the event loop for tens of milliseconds
+    gc.freeze()
+    yield
+    analysis_executor.shutdown()
+    index_executor.shutdown()
+
 app = FastAPI(
     title="AtmosAI AI Service",
     description="AI-powered weather analysis and recommendations",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
+)
+
+# Upper bound on items accepted by /analyze-weather/batch
+BATCH_MAX_ITEMS = int(os.getenv("AI_BATCH_MAX_ITEMS", 5000))
+
+# Geohash precision of the grid cells that share one observation (6: about 1.2 km x 0.6 km)
+GRID_PRECISION = int(os.getenv("AI_GRID_PRECISION", 6))
+
+# Result sections /insights can return, each matching its standalone endpoint's body
+INSIGHT_SECTIONS = ('analysis', 'alerts', 'event_recommendations', 'health_insights')
+
+# Validate only the request fields each endpoint uses (AI_LEAN_DECODING=false restores full validation)
+LEAN_DECODING = os.getenv("AI_LEAN_DECODING", "true").lower() in ("1", "true", "yes")
+
+# Longest single NDJSON record accepted by /generate-alerts/stream
+STREAM_MAX_LINE_BYTES = int(os.getenv("AI_STREAM_MAX_LINE_BYTES", 1024 * 1024))
+
+# Request counters and per-stage latency histograms served at /metrics
+METRICS_ENABLED = os.getenv("AI_METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Opt-in cProfile of POST requests, by `X-Profile: true` header and/or a sampling rate
+profiler = RequestProfiler(
+    directory=os.getenv("AI_PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "profiles")),
+    sample_rate=float(os.getenv("AI_PROFILE_SAMPLE_RATE", 0)),
+    header_enabled=os.getenv("AI_PROFILE_HEADER", "false").lower() in ("1", "true", "yes"),
+    keep=int(os.getenv("AI_PROFILE_KEEP", 50))
+)
+
+# Bounded in-flight requests per POST endpoint; the overflow waits in a short queue, then is shed with Retry-After
+ADMISSION_ENABLED = os.getenv("AI_ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+admission_default = AdmissionLimit(
+    max_in_flight=int(os.getenv("AI_MAX_IN_FLIGHT", 64)),
+    max_queue=int(os.getenv("AI_MAX_QUEUE", 128)),
+    queue_timeout=float(os.getenv("AI_QUEUE_TIMEOUT", 2.0))
+)
+admission = AdmissionController(
+    admission_default,
+    parse_limits(os.getenv("AI_ADMISSION_LIMITS", "/analyze-weather/batch=8:16"), admission_default)
 )
 
+# Analysis of at least AI_OFFLOAD_MIN_SIZE entries or items runs in a thread or process pool
+analysis_executor = AnalysisExecutor(
+    mode=os.getenv("AI_EXECUTOR", "thread").lower(),
+    max_workers=int(os.getenv("AI_EXECUTOR_WORKERS", 0)) or None,
+    min_size=int(os.getenv("AI_OFFLOAD_MIN_SIZE", 64)),
+    initializer=warm_analysis_process
+)
+
+# Subscription index updates get one thread of their own: the index lives in this
+# process, so a process pool would only update a copy
+index_executor = AnalysisExecutor(
+    mode=INLINE if analysis_executor.mode == INLINE else THREAD,
+    max_workers=1,
+    min_size=analysis_executor.min_size
+)
+
+# Concurrent requests with identical inputs share one analysis run instead of repeating it
+COALESCING_ENABLED = os.getenv("AI_COALESCING", "true").lower() in ("1", "true", "yes")
+coalescer = SingleFlight()
+
+async def coalesced(endpoint: str, inputs: tuple, compute: Callable[[], Awaitable[Any]]) -> Any:
+    """`compute()`, shared by concurrent requests whose `inputs` match"""
+    if not COALESCING_ENABLED:
+        return await compute()
+    return await coalescer.run(payload_key(endpoint, *inputs), compute)
+
+async def run_analysis(endpoint: str, inputs: tuple, fn, *args):
+    """`fn(*args)` through the analysis executor, shared by concurrent requests whose `inputs` match"""
+    return await coalesced(endpoint, inputs, lambda: analysis_executor.run(fn, *args))
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -27,21 +144,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if profiler.enabled:
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+if ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware, controller=admission)
+
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+
 # API Key validation
 def verify_api_key(authorization: str = Header(None)):
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Authorization header required")
-    
-    if not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Invalid authorization format")
-    
-    token = authorization.split(" ")[1]
-    expected_token = os.getenv("AI_SERVICE_API_KEY", "default-key")
-    
-    if token != expected_token:
-        raise HTTPException(status_code=401, detail="Invalid API key")
-    
-    return token
+    with metrics.stage('auth'):
+        if not authorization:
+            raise HTTPException(status_code=401, detail="Authorization header required")
+        
+        if not authorization.startswith("Bearer "):
+            raise HTTPException(status_code=401, detail="Invalid authorization format")
+        
+        token = authorization.split(" ")[1]
+        expected_token = os.getenv("AI_SERVICE_API_KEY", "default-key")
+        
+        if token != expected_token:
+            raise HTTPException(status_code=401, detail="Invalid API key")
+        
+        return token
 
 # Pydantic models
 class WeatherData(BaseModel):
@@ -74,6 +201,18 @@ class AlertGenerationRequest(BaseModel):
     location: Location
     user_preferences: Optional[UserPreferences] = None
 
+class AlertChangesRequest(AlertGenerationRequest):
+    # Also return every alert still active for the location
+    full_state: bool = False
+
+class AlertFanoutRequest(AlertGenerationRequest):
+    # Subscriptions within this distance receive the alerts; AI_FANOUT_RADIUS_KM when omitted
+    radius_km: Optional[float] = None
+
+class ForecastAlertGenerationRequest(AlertGenerationRequest):
+    # Windows that ended before this time are left out; the server's clock when omitted
+    now: Optional[datetime] = None
+
 class EventRecommendationRequest(BaseModel):
     weather_data: WeatherData
     user_preferences: Optional[UserPreferences] = None
@@ -85,6 +224,95 @@ class HealthInsightsRequest(BaseModel):
     user_health_data: Optional[Dict[str, Any]] = None
     location: Optional[Location] = None
 
+# Lean request views: only the fields an endpoint reads are validated (see request_decoding.py)
+class CurrentWeatherData(BaseModel):
+    current: Dict[str, Any]
+
+class HourlyWeatherData(BaseModel):
+    hourly: List[Dict[str, Any]]
+
+class CurrentWeatherRequest(LeanBodyModel):
+    weather_data: CurrentWeatherData
+
+class HourlyWeatherRequest(LeanBodyModel):
+    weather_data: HourlyWeatherData
+
+class CurrentAlertRequest(LeanBodyModel):
+    weather_data: CurrentWeatherData
+    location: Location
+
+class ForecastWeatherData(BaseModel):
+    hourly: List[Dict[str, Any]]
+    forecast: List[Dict[str, Any]]
+
+class ForecastAlertRequest(LeanBodyModel):
+    weather_data: ForecastWeatherData
+    location: Location
+    now: Optional[datetime] = None
+
+class CurrentAlertChangesRequest(LeanBodyModel):
+    weather_data: CurrentWeatherData
+    location: Location
+    full_state: bool = False
+
+class CurrentAlertFanoutRequest(LeanBodyModel):
+    weather_data: CurrentWeatherData
+    location: Location
+    radius_km: Optional[float] = None
+
+class InsightsRequest(BaseModel):
+    weather_data: WeatherData
+    location: Optional[Location] = None
+    user_preferences: Optional[UserPreferences] = None
+    user_health_data: Optional[Dict[str, Any]] = None
+    event_type: Optional[str] = None
+    date: Optional[str] = None
+    # Subset of INSIGHT_SECTIONS to compute; all of them when omitted
+    sections: Optional[List[str]] = None
+
+class CurrentInsightsRequest(LeanBodyModel):
+    weather_data: CurrentWeatherData
+    location: Optional[Location] = None
+    sections: Optional[List[str]] = None
+
+class BatchWeatherAnalysisRequest(BaseModel):
+    # Items are validated one by one so a bad entry fails only itself
+    items: List[Dict[str, Any]]
+
+class SubscriptionLoadRequest(BaseModel):
+    # Columns rather than objects: a million subscriptions validate as three flat lists
+    ids: List[str]
+    lats: List[float]
+    lngs: List[float]
+    # Replace every indexed subscription instead of adding to them
+    replace: bool = False
+
+class SubscriptionRemoveRequest(BaseModel):
+    ids: List[str]
+
+class RadiusQueryRequest(BaseModel):
+    lat: float
+    lng: float
+    radius_km: float
+    # Only the nearest subscriptions, with their distances
+    limit: Optional[int] = None
+    include_distances: bool = False
+
+class GridLocation(BaseModel):
+    # Locations are fanned out by id; a repeated id keeps its last coordinates
+    id: str
+    lat: float
+    lng: float
+    name: Optional[str] = None
+    city: Optional[str] = None
+    # Observation for the location's grid cell; one location per cell needs it
+    weather_data: Optional[CurrentWeatherData] = None
+
+class GridAlertRequest(BaseModel):
+    locations: List[GridLocation]
+    # Geohash precision of the cells; AI_GRID_PRECISION when omitted
+    precision: Optional[int] = None
+
 # AI Analysis Classes
 class WeatherAnalyzer:
     def __init__(self):
@@ -98,192 +326,170 @@ class WeatherAnalyzer:
     
     def analyze_weather_conditions(self, weather_data: WeatherData) -> Dict[str, Any]:
         """Analyze weather conditions and provide insights"""
-        current = weather_data.current
-        
-        # Temperature analysis
-        temp = current.get('temperature', 70)
-        temp_condition = self._analyze_temperature(temp)
-        
-        # Humidity analysis
-        humidity = current.get('humidity', 50)
-        humidity_condition = self._analyze_humidity(humidity)
-        
-        # UV Index analysis
-        uv_index = current.get('uvIndex', 0)
-        uv_condition = self._analyze_uv_index(uv_index)
-        
-        # Air Quality analysis
-        air_quality = current.get('airQuality', {})
-        aqi = air_quality.get('aqi', 0)
-        air_quality_condition = self._analyze_air_quality(aqi)
-        
-        # Wind analysis
-        wind_speed = current.get('windSpeed', 0)
-        wind_condition = self._analyze_wind(wind_speed)
-        
-        # Overall risk assessment
-        risk_level = self._calculate_risk_level([
-            temp_condition, humidity_condition, uv_condition, 
-            air_quality_condition, wind_condition
-        ])
-        
-        return {
-            'temperature_analysis': temp_condition,
-            'humidity_analysis': humidity_condition,
-            'uv_analysis': uv_condition,
-            'air_quality_analysis': air_quality_condition,
-            'wind_analysis': wind_condition,
-            'overall_risk': risk_level,
-            'timestamp': datetime.now().isoformat()
-        }
+        features = WeatherFeatures.from_current(weather_data.current)
+        analysis = self.assess(features).to_dict()
+        analysis['timestamp'] = datetime.now().isoformat()
+        analysis['comfort'] = ComfortIndices.from_features(features).to_dict()
+        return analysis
+    
+    def assess(self, features: WeatherFeatures) -> WeatherAssessment:
+        """Classify each reading and combine them into an overall risk"""
+        conditions = [
+            self._analyze_temperature(features.temperature),
+            self._analyze_humidity(features.humidity),
+            self._analyze_uv_index(features.uv_index),
+            self._analyze_air_quality(features.aqi),
+            self._analyze_wind(features.wind_speed)
+        ]
+        return WeatherAssessment(conditions, self._calculate_risk_level(conditions))
     
-    def _analyze_temperature(self, temp: float) -> Dict[str, Any]:
+    def _analyze_temperature(self, temp: float) -> ConditionResult:
         if temp > self.risk_factors['temperature']['hot']:
-            return {
-                'condition': 'hot',
-                'risk': 'high',
-                'recommendations': [
+            return ConditionResult(
+                condition='hot',
+                risk='high',
+                recommendations=[
                     'Stay hydrated',
                     'Avoid prolonged sun exposure',
                     'Wear light, breathable clothing',
                     'Seek air conditioning'
                 ]
-            }
+            )
         elif temp < self.risk_factors['temperature']['cold']:
-            return {
-                'condition': 'cold',
-                'risk': 'high',
-                'recommendations': [
+            return ConditionResult(
+                condition='cold',
+                risk='high',
+                recommendations=[
                     'Dress in layers',
                     'Protect extremities',
                     'Stay dry',
                     'Limit outdoor time'
                 ]
-            }
+            )
         else:
-            return {
-                'condition': 'comfortable',
-                'risk': 'low',
-                'recommendations': ['Enjoy outdoor activities']
-            }
+            return ConditionResult(
+                condition='comfortable',
+                risk='low',
+                recommendations=['Enjoy outdoor activities']
+            )
     
-    def _analyze_humidity(self, humidity: float) -> Dict[str, Any]:
+    def _analyze_humidity(self, humidity: float) -> ConditionResult:
         if humidity > self.risk_factors['humidity']['high']:
-            return {
-                'condition': 'high_humidity',
-                'risk': 'moderate',
-                'recommendations': [
+            return ConditionResult(
+                condition='high_humidity',
+                risk='moderate',
+                recommendations=[
                     'Stay hydrated',
                     'Avoid strenuous activities',
                     'Use fans or air conditioning'
                 ]
-            }
+            )
         elif humidity < self.risk_factors['humidity']['low']:
-            return {
-                'condition': 'low_humidity',
-                'risk': 'low',
-                'recommendations': [
+            return ConditionResult(
+                condition='low_humidity',
+                risk='low',
+                recommendations=[
                     'Use moisturizer',
                     'Stay hydrated',
                     'Consider humidifier'
                 ]
-            }
+            )
         else:
-            return {
-                'condition': 'comfortable',
-                'risk': 'low',
-                'recommendations': ['Normal humidity levels']
-            }
+            return ConditionResult(
+                condition='comfortable',
+                risk='low',
+                recommendations=['Normal humidity levels']
+            )
     
-    def _analyze_uv_index(self, uv_index: float) -> Dict[str, Any]:
+    def _analyze_uv_index(self, uv_index: float) -> ConditionResult:
         if uv_index >= self.risk_factors['uv_index']['high']:
-            return {
-                'condition': 'very_high',
-                'risk': 'high',
-                'recommendations': [
+            return ConditionResult(
+                condition='very_high',
+                risk='high',
+                recommendations=[
                     'Avoid sun 10am-4pm',
                     'Apply SPF 30+ sunscreen',
                     'Wear protective clothing',
                     'Seek shade'
                 ]
-            }
+            )
         elif uv_index >= self.risk_factors['uv_index']['moderate']:
-            return {
-                'condition': 'moderate',
-                'risk': 'moderate',
-                'recommendations': [
+            return ConditionResult(
+                condition='moderate',
+                risk='moderate',
+                recommendations=[
                     'Apply sunscreen',
                     'Wear sunglasses',
                     'Limit sun exposure'
                 ]
-            }
+            )
         else:
-            return {
-                'condition': 'low',
-                'risk': 'low',
-                'recommendations': ['Minimal sun protection needed']
-            }
+            return ConditionResult(
+                condition='low',
+                risk='low',
+                recommendations=['Minimal sun protection needed']
+            )
     
-    def _analyze_air_quality(self, aqi: float) -> Dict[str, Any]:
+    def _analyze_air_quality(self, aqi: float) -> ConditionResult:
         if aqi >= self.risk_factors['air_quality']['unhealthy']:
-            return {
-                'condition': 'unhealthy',
-                'risk': 'high',
-                'recommendations': [
+            return ConditionResult(
+                condition='unhealthy',
+                risk='high',
+                recommendations=[
                     'Limit outdoor activities',
                     'Keep windows closed',
                     'Use air purifiers',
                     'Wear N95 masks if outdoors'
                 ]
-            }
+            )
         elif aqi >= self.risk_factors['air_quality']['moderate']:
-            return {
-                'condition': 'moderate',
-                'risk': 'moderate',
-                'recommendations': [
+            return ConditionResult(
+                condition='moderate',
+                risk='moderate',
+                recommendations=[
                     'Sensitive groups should limit outdoor time',
                     'Monitor air quality',
                     'Consider indoor activities'
                 ]
-            }
+            )
         else:
-            return {
-                'condition': 'good',
-                'risk': 'low',
-                'recommendations': ['Good air quality for outdoor activities']
-            }
+            return ConditionResult(
+                condition='good',
+                risk='low',
+                recommendations=['Good air quality for outdoor activities']
+            )
     
-    def _analyze_wind(self, wind_speed: float) -> Dict[str, Any]:
+    def _analyze_wind(self, wind_speed: float) -> ConditionResult:
         if wind_speed >= self.risk_factors['wind_speed']['high']:
-            return {
-                'condition': 'high_wind',
-                'risk': 'high',
-                'recommendations': [
+            return ConditionResult(
+                condition='high_wind',
+                risk='high',
+                recommendations=[
                     'Avoid outdoor activities',
                     'Secure loose objects',
                     'Be cautious driving'
                 ]
-            }
+            )
         elif wind_speed >= self.risk_factors['wind_speed']['moderate']:
-            return {
-                'condition': 'moderate_wind',
-                'risk': 'moderate',
-                'recommendations': [
+            return ConditionResult(
+                condition='moderate_wind',
+                risk='moderate',
+                recommendations=[
                     'Be cautious with outdoor activities',
                     'Secure loose items',
                     'Consider wind chill'
                 ]
-            }
+            )
         else:
-            return {
-                'condition': 'calm',
-                'risk': 'low',
-                'recommendations': ['Pleasant wind conditions']
-            }
+            return ConditionResult(
+                condition='calm',
+                risk='low',
+                recommendations=['Pleasant wind conditions']
+            )
     
-    def _calculate_risk_level(self, conditions: List[Dict[str, Any]]) -> Dict[str, Any]:
-        high_risk_count = sum(1 for condition in conditions if condition['risk'] == 'high')
-        moderate_risk_count = sum(1 for condition in conditions if condition['risk'] == 'moderate')
+    def _calculate_risk_level(self, conditions: List[ConditionResult]) -> RiskAssessment:
+        high_risk_count = sum(1 for condition in conditions if condition.risk == 'high')
+        moderate_risk_count = sum(1 for condition in conditions if condition.risk == 'moderate')
         
         if high_risk_count >= 2:
             overall_risk = 'high'
@@ -292,11 +498,11 @@ class WeatherAnalyzer:
         else:
             overall_risk = 'low'
         
-        return {
-            'level': overall_risk,
-            'factors': [condition['condition'] for condition in conditions if condition['risk'] != 'low'],
-            'recommendations': self._get_overall_recommendations(overall_risk)
-        }
+        return RiskAssessment(
+            level=overall_risk,
+            factors=[condition.condition for condition in conditions if condition.risk != 'low'],
+            recommendations=self._get_overall_recommendations(overall_risk)
+        )
     
     def _get_overall_recommendations(self, risk_level: str) -> List[str]:
         if risk_level == 'high':
@@ -355,38 +561,58 @@ class AlertGenerator:
     
     def generate_alerts(self, weather_data: WeatherData, location: Location) -> List[Dict[str, Any]]:
         """Generate weather alerts based on current conditions"""
+        return self.generate_alerts_for(WeatherFeatures.from_current(weather_data.current), location)
+    
+    def generate_alerts_for(self, features: WeatherFeatures, location: Location) -> List[Dict[str, Any]]:
+        """Generate weather alerts from already extracted features"""
         alerts = []
-        current = weather_data.current
         
         # Check for severe weather conditions
-        if self._is_severe_weather(current):
-            alerts.append(self._create_severe_weather_alert(current, location))
+        if self._is_severe_weather(features):
+            alerts.append(self._create_severe_weather_alert(features.current, location))
         
         # Check air quality
-        air_quality = current.get('airQuality', {})
-        aqi = air_quality.get('aqi', 0)
-        if aqi > 100:
+        aqi = features.aqi
+        if aqi > AQI_ALERT:
             alerts.append(self._create_air_quality_alert(aqi, location))
         
         # Check UV index
-        uv_index = current.get('uvIndex', 0)
-        if uv_index >= 8:
+        uv_index = features.uv_index
+        if uv_index >= UV_ALERT:
             alerts.append(self._create_uv_alert(uv_index, location))
         
         # Check temperature extremes
-        temp = current.get('temperature', 70)
-        if temp > 90 or temp < 20:
+        temp = features.temperature
+        if temp > HEAT_ALERT or temp < COLD_ALERT:
             alerts.append(self._create_temperature_alert(temp, location))
         
         return alerts
     
-    def _is_severe_weather(self, current: Dict[str, Any]) -> bool:
+    def generate_forecast_alerts(
+        self,
+        hourly: List[Dict[str, Any]],
+        forecast: List[Dict[str, Any]],
+        location: Location,
+        now: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """One alert per window of hourly/forecast slots exceeding a threshold, with its real start and end"""
+        alerts = []
+        for window in alert_windows(hourly, forecast, now):
+            if window.kind == SEVERE:
+                alert = self._create_severe_weather_alert(window.peak_entry, location)
+            elif window.kind == AIR_QUALITY:
+                alert = self._create_air_quality_alert(window.peak_value, location)
+            elif window.kind == UV:
+                alert = self._create_uv_alert(window.peak_value, location)
+            else:
+                alert = self._create_temperature_alert(window.peak_value, location)
+            alert.update(startTime=window.start, endTime=window.end, peakTime=window.peak_time)
+            alerts.append(alert)
+        return alerts
+    
+    def _is_severe_weather(self, features: WeatherFeatures) -> bool:
         """Check if current conditions indicate severe weather"""
-        condition = current.get('condition', {}).get('main', '').lower()
-        wind_speed = current.get('windSpeed', 0)
-        
-        severe_conditions = ['thunderstorm', 'tornado', 'hurricane', 'blizzard']
-        return (condition in severe_conditions or wind_speed > 30)
+        return (features.condition in SEVERE_CONDITIONS or features.wind_speed > SEVERE_WIND_SPEED)
     
     def _create_severe_weather_alert(self, current: Dict[str, Any], location: Location) -> Dict[str, Any]:
         condition = current.get('condition', {})
@@ -469,289 +695,1052 @@ class AlertGenerator:
 
 # Initialize analyzers
 weather_analyzer = WeatherAnalyzer()
+vector_analyzer = VectorizedWeatherAnalyzer(weather_analyzer)
+
+# Recommendation responses depend only on threshold buckets, so repeat conditions are served from memory
+result_cache = ResultCache(
+    max_entries=int(os.getenv("AI_CACHE_MAX_ENTRIES", 4096)),
+    ttl_seconds=float(os.getenv("AI_CACHE_TTL_SECONDS", 300))
+)
 alert_generator = AlertGenerator()
 
+# Active alerts per location, so /generate-alerts/changes sends only what changed since the last poll
+alert_state = AlertStateStore(
+    max_locations=int(os.getenv("AI_ALERT_STATE_MAX_LOCATIONS", 100000)),
+    clear_grace_seconds=float(os.getenv("AI_ALERT_CLEAR_GRACE_SECONDS", 600)),
+    refresh_fraction=float(os.getenv("AI_ALERT_REFRESH_FRACTION", 0.5))
+)
+
+# Subscribed locations for radius fan-out of alerts
+FANOUT_RADIUS_KM = float(os.getenv("AI_FANOUT_RADIUS_KM", 25))
+subscriptions = SubscriptionIndex(rebuild_fraction=float(os.getenv("AI_SUBSCRIPTION_REBUILD_FRACTION", 0.05)))
+
+def cache_metrics():
+    """Result cache counters for /metrics"""
+    stats = result_cache.stats()
+    yield 'result_cache_entries', 'gauge', 'Entries held by the result cache', {}, stats['size']
+    yield 'result_cache_max_entries', 'gauge', 'Result cache capacity', {}, stats['max_entries']
+    for counter in ('hits', 'misses', 'evictions', 'expirations'):
+        yield 'result_cache_events_total', 'counter', 'Result cache lookups and removals by outcome', {'event': counter}, stats[counter]
+
+metrics.add_collector(cache_metrics)
+
+def executor_metrics():
+    """Analysis pool counters for /metrics"""
+    stats = analysis_executor.stats()
+    yield 'analysis_in_flight', 'gauge', 'Analysis calls running in the pool', {}, stats['in_flight']
+    for placement in ('inline', 'offloaded'):
+        yield 'analysis_calls_total', 'counter', 'Analysis calls by where they ran', {'placement': placement}, stats[f'{placement}_calls']
+
+metrics.add_collector(executor_metrics)
+metrics.add_collector(admission.collect)
+metrics.add_collector(alert_state.collect)
+metrics.add_collector(subscriptions.collect)
+
+def coalescing_metrics():
+    """Single-flight counters for /metrics"""
+    stats = coalescer.stats()
+    yield 'coalescing_in_flight', 'gauge', 'Distinct analyses currently shared by concurrent requests', {}, stats['in_flight']
+    for role, counter in (('leader', 'computations'), ('follower', 'coalesced')):
+        yield 'coalesced_requests_total', 'counter', 'Requests that ran an analysis (leader) or shared one already in flight (follower)', {'role': role}, stats[counter]
+
+metrics.add_collector(coalescing_metrics)
+
+def microbatch_metrics():
+    """Micro-batching state and counters for /metrics"""
+    stats = analysis_batcher.stats()
+    yield 'microbatch_active', 'gauge', 'Whether /analyze-weather requests are being batched', {}, int(stats['active'])
+    yield 'microbatch_arrival_rate', 'gauge', 'Estimated /analyze-weather arrivals per second', {}, stats['arrival_rate']
+    yield 'microbatch_batches_total', 'counter', 'Batches run by the micro-batcher', {}, stats['batches']
+    for path, counter in (('batched', 'batched_items'), ('direct', 'direct_items')):
+        yield 'microbatch_items_total', 'counter', 'Requests served in a batch or one at a time', {'path': path}, stats[counter]
+
+metrics.add_collector(microbatch_metrics)
+
 # API Endpoints
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
+    return FastJSONResponse({
         "status": "healthy",
         "service": "AtmosAI AI Service",
         "version": "1.0.0",
         "uptime": "running",
         "timestamp": datetime.now().isoformat()
+    })
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until every required model has loaded"""
+    ready = model_registry.ready()
+    return FastJSONResponse(
+        {
+            "status": "ready" if ready else "warming_up",
+            "models": model_registry.status(),
+            "timestamp": datetime.now().isoformat()
+        },
+        status_code=200 if ready else 503
+    )
+
+def build_weather_insights(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the /analyze-weather response body from an analyzer result"""
+    # Generate health tips based on analysis
+    health_tips = []
+    if analysis['uv_analysis']['risk'] != 'low':
+        health_tips.extend(analysis['uv_analysis']['recommendations'])
+    if analysis['air_quality_analysis']['risk'] != 'low':
+        health_tips.extend(analysis['air_quality_analysis']['recommendations'])
+    if analysis['temperature_analysis']['risk'] != 'low':
+        health_tips.extend(analysis['temperature_analysis']['recommendations'])
+    
+    # Generate activity suggestions
+    activity_suggestions = []
+    if analysis['overall_risk']['level'] == 'low':
+        activity_suggestions = [
+            'Great weather for outdoor activities',
+            'Perfect for hiking or walking',
+            'Ideal for sports and recreation',
+            'Good conditions for gardening'
+        ]
+    elif analysis['overall_risk']['level'] == 'moderate':
+        activity_suggestions = [
+            'Consider indoor activities',
+            'Plan outdoor activities with precautions',
+            'Have backup indoor options ready',
+            'Monitor conditions throughout the day'
+        ]
+    else:
+        activity_suggestions = [
+            'Stay indoors if possible',
+            'Focus on indoor activities',
+            'Postpone outdoor plans',
+            'Have emergency plans ready'
+        ]
+    
+    return {
+        "analysis": analysis,
+        "health_tips": health_tips[:5],  # Limit to 5 tips
+        "activity_suggestions": activity_suggestions,
+        "risk_assessment": analysis['overall_risk'],
+        "confidence": 0.85,
+        "timestamp": datetime.now().isoformat()
     }
 
+# Every bucket combination is answered from this table instead of re-running the analyzer
+model_registry.register(
+    'decision_table',
+    lambda: DecisionTable(weather_analyzer, vector_analyzer, build_weather_insights)
+)
+
+def get_decision_table() -> DecisionTable:
+    return model_registry.get('decision_table')
+
+# A trained model (risk_model.py) sets the overall risk level and a real confidence. The thresholds
+# answer when no model is installed, it failed to load or it cannot score a reading
+RISK_MODEL_ENABLED = os.getenv("AI_RISK_MODEL_ENABLED", "true").lower() in ("1", "true", "yes")
+RISK_MODEL_PATH = os.getenv("AI_RISK_MODEL_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "risk_model.npz")
+if RISK_MODEL_ENABLED and (os.getenv("AI_RISK_MODEL_PATH") or os.path.exists(RISK_MODEL_PATH)):
+    # Not required for /ready: without it the service still answers from the thresholds
+    model_registry.register('risk_model', lambda: RiskModel.load(RISK_MODEL_PATH), required=False)
+
+def get_risk_model() -> Optional[RiskModel]:
+    return model_registry.available('risk_model')
+
+def score_risk(rows: List[tuple]) -> List[Tuple[Optional[int], Optional[float]]]:
+    """(overall level, confidence) per reading tuple from the risk model, in one batched call.
+
+    (None, None) leaves a row to the thresholds and the fixed confidence.
+    """
+    model = get_risk_model()
+    if model is None:
+        return [(None, None)] * len(rows)
+    try:
+        levels, confidences = model.predict(rows)
+    except Exception as e:
+        logger.error(f"Risk model error: {str(e)}")
+        return [(None, None)] * len(rows)
+    return [
+        (level, round(confidence, 3)) if math.isfinite(confidence) else (None, None)
+        for level, confidence in zip(levels, confidences)
+    ]
+
+def analysis_body(features: WeatherFeatures, timestamp: str) -> Dict[str, Any]:
+    """/analyze-weather response body for one set of features"""
+    readings = features.readings()
+    code = encode(vector_analyzer.condition_codes(readings))
+    level, confidence = score_risk((readings,))[0]
+    body = get_decision_table().response(code, timestamp, level, confidence)
+    # Exact values, so added per request rather than stored in the bucketed table
+    body['analysis']['comfort'] = ComfortIndices.from_features(features).to_dict()
+    return body
+
+def comfort_rows(rows: List[tuple]) -> List[Dict[str, Optional[float]]]:
+    """ComfortIndices.to_dict() for many all-numeric readings rows, computed over whole arrays"""
+    temperature, humidity, _, _, wind_speed = zip(*rows)
+    return comfort_dicts(temperature, humidity, wind_speed)
+
+def analysis_bodies(items: List[Tuple[WeatherFeatures, str]]) -> List[Dict[str, Any]]:
+    """analysis_body for many requests, classifying all numeric readings in one vectorized pass"""
+    readings = [features.readings() for features, _ in items]
+    numeric = [index for index, row in enumerate(readings) if all(is_numeric_reading(value) for value in row)]
+    bodies: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    if numeric:
+        rows = [readings[index] for index in numeric]
+        codes = encode_many(vector_analyzer.classify_readings(rows)['conditions']).tolist()
+        table = get_decision_table()
+        for index, code, (level, confidence), comfort in zip(numeric, codes, score_risk(rows), comfort_rows(rows)):
+            bodies[index] = table.response(code, items[index][1], level, confidence)
+            bodies[index]['analysis']['comfort'] = comfort
+    for index, body in enumerate(bodies):
+        if body is None:
+            # Irregular readings take the scalar path so errors match a lone request
+            bodies[index] = analysis_body(*items[index])
+    return bodies
+
+def analysis_body_item(item: Tuple[WeatherFeatures, str]) -> Dict[str, Any]:
+    return analysis_body(*item)
+
+# Under heavy load, /analyze-weather requests arriving within a few milliseconds are classified as one batch.
+# Off by default: a decision-table lookup costs a few microseconds, less than the batching itself
+MICROBATCH_ENABLED = os.getenv("AI_MICROBATCH_ENABLED", "false").lower() in ("1", "true", "yes")
+analysis_batcher = MicroBatcher(
+    analysis_bodies,
+    analysis_body_item,
+    window=float(os.getenv("AI_MICROBATCH_WINDOW_MS", 2)) / 1000,
+    max_batch=int(os.getenv("AI_MICROBATCH_MAX_SIZE", 64)),
+    min_rate=float(os.getenv("AI_MICROBATCH_MIN_RATE", 1000)),
+    run_batch=lambda process, items: analysis_executor.run(process, items, size=len(items))
+)
+
+def analyze_features(features: WeatherFeatures, timestamp: str) -> Awaitable[Dict[str, Any]]:
+    if MICROBATCH_ENABLED:
+        return analysis_batcher.submit((features, timestamp))
+    return analysis_executor.run(analysis_body, features, timestamp)
+
 @app.post("/analyze-weather")
 async def analyze_weather(
-    request: WeatherAnalysisRequest,
-    api_key: str = Depends(verify_api_key)
+    api_key: str = Depends(verify_api_key),
+    request: WeatherAnalysisRequest = Depends(decoded_body(WeatherAnalysisRequest, CurrentWeatherRequest, LEAN_DECODING))
 ):
     """Analyze weather conditions and provide AI insights"""
     try:
-        analysis = weather_analyzer.analyze_weather_conditions(request.weather_data)
-        
-        # Generate health tips based on analysis
-        health_tips = []
-        if analysis['uv_analysis']['risk'] != 'low':
-            health_tips.extend(analysis['uv_analysis']['recommendations'])
-        if analysis['air_quality_analysis']['risk'] != 'low':
-            health_tips.extend(analysis['air_quality_analysis']['recommendations'])
-        if analysis['temperature_analysis']['risk'] != 'low':
-            health_tips.extend(analysis['temperature_analysis']['recommendations'])
+        with metrics.stage('analysis'):
+            current = request.weather_data.current
+            features = WeatherFeatures.from_current(current)
+            timestamp = datetime.now().isoformat()
+            body = await coalesced('analyze-weather', (current,), lambda: analyze_features(features, timestamp))
+        return FastJSONResponse(body)
+    except Exception as e:
+        logger.error(f"Weather analysis error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Weather analysis failed")
+
+def item_coordinates(item: Dict[str, Any]) -> Optional[tuple]:
+    """(lat, lng) of a batch item's location, or None if it has no usable one"""
+    location = item.get('location')
+    if not isinstance(location, dict):
+        return None
+    lat, lng = location.get('lat'), location.get('lng')
+    if is_numeric_reading(lat) and is_numeric_reading(lng) and math.isfinite(lat) and math.isfinite(lng):
+        return lat, lng
+    return None
+
+def shared_cell_observations(items: List[Dict[str, Any]], precision: int) -> Dict[int, int]:
+    """Index of the item whose analysis each item without weather_data shares.
+
+    An item may leave out weather_data when another item in the same grid
+    cell carries it; the first such item is the cell's observation.
+    """
+    if all('weather_data' in item for item in items):
+        return {}
+    located = [(index, coordinates) for index, item in enumerate(items) if (coordinates := item_coordinates(item))]
+    if not located:
+        return {}
+    cells = encode_cells([lat for _, (lat, _) in located], [lng for _, (_, lng) in located], precision)
+    observations: Dict[str, int] = {}
+    for (index, _), cell in zip(located, cells):
+        if 'weather_data' in items[index]:
+            observations.setdefault(cell, index)
+    return {
+        index: observations[cell]
+        for (index, _), cell in zip(located, cells)
+        if 'weather_data' not in items[index] and cell in observations
+    }
+
+def analyze_batch_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per-item results for /analyze-weather/batch, in request order"""
+    batch_item_model = CurrentWeatherRequest if LEAN_DECODING else WeatherAnalysisRequest
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    vector_indices = []
+    vector_readings = []
+    shared = shared_cell_observations(items, GRID_PRECISION)
+    for index, item in enumerate(items):
+        if index in shared:
+            continue
+        try:
+            item_request = batch_item_model.model_validate(item)
+        except ValidationError as e:
+            results[index] = {
+                "index": index,
+                "success": False,
+                "error": "Invalid request",
+                "details": [
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                    for error in e.errors()
+                ]
+            }
+            continue
         
-        # Generate activity suggestions
-        activity_suggestions = []
-        if analysis['overall_risk']['level'] == 'low':
-            activity_suggestions = [
-                'Great weather for outdoor activities',
-                'Perfect for hiking or walking',
-                'Ideal for sports and recreation',
-                'Good conditions for gardening'
-            ]
-        elif analysis['overall_risk']['level'] == 'moderate':
-            activity_suggestions = [
-                'Consider indoor activities',
-                'Plan outdoor activities with precautions',
-                'Have backup indoor options ready',
-                'Monitor conditions throughout the day'
-            ]
-        else:
-            activity_suggestions = [
-                'Stay indoors if possible',
-                'Focus on indoor activities',
-                'Postpone outdoor plans',
-                'Have emergency plans ready'
-            ]
+        current = item_request.weather_data.current
+        try:
+            readings = WeatherFeatures.from_current(current).readings()
+        except Exception:
+            readings = None
+        if readings is not None and all(is_numeric_reading(value) for value in readings):
+            vector_indices.append(index)
+            vector_readings.append(readings)
+            continue
         
-        return {
-            "analysis": analysis,
-            "health_tips": health_tips[:5],  # Limit to 5 tips
-            "activity_suggestions": activity_suggestions,
-            "risk_assessment": analysis['overall_risk'],
-            "confidence": 0.85,
+        # Irregular readings go through the scalar path so errors match /analyze-weather
+        try:
+            analysis = weather_analyzer.analyze_weather_conditions(item_request.weather_data)
+            results[index] = {
+                "index": index,
+                "success": True,
+                "data": build_weather_insights(analysis)
+            }
+        except Exception as e:
+            logger.error(f"Batch weather analysis error at item {index}: {str(e)}")
+            results[index] = {
+                "index": index,
+                "success": False,
+                "error": "Weather analysis failed"
+            }
+    
+    if vector_readings:
+        classified = vector_analyzer.classify_readings(vector_readings)
+        codes = encode_many(classified['conditions']).tolist()
+        timestamp = datetime.now().isoformat()
+        table = get_decision_table()
+        rows = zip(vector_indices, codes, score_risk(vector_readings), comfort_rows(vector_readings))
+        for index, code, (level, confidence), comfort in rows:
+            data = table.response(code, timestamp, level, confidence)
+            data['analysis']['comfort'] = comfort
+            results[index] = {
+                "index": index,
+                "success": True,
+                "data": data
+            }
+    
+    # Items without their own observation get their grid cell's analysis
+    for index, source in shared.items():
+        results[index] = {**results[source], "index": index, "shared_with": source}
+    return results
+
+def batch_response_body(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """/analyze-weather/batch response body"""
+    results = analyze_batch_items(items)
+    succeeded = sum(1 for result in results if result['success'])
+    return {
+        "results": results,
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.post("/analyze-weather/batch")
+async def analyze_weather_batch(
+    api_key: str = Depends(verify_api_key),
+    request: BatchWeatherAnalysisRequest = Depends(
+        decoded_body(BatchWeatherAnalysisRequest, BatchWeatherAnalysisRequest, LEAN_DECODING, parse_first=True)
+    )
+):
+    """Analyze many locations in one call, reporting errors per item"""
+    if len(request.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch size {len(request.items)} exceeds limit of {BATCH_MAX_ITEMS}"
+        )
+    
+    with metrics.stage('analysis'):
+        body = await analysis_executor.run(batch_response_body, request.items, size=len(request.items))
+    # Timed on its own like FastJSONResponse does; encoding thousands of results would stall the loop
+    with metrics.stage('serialization'):
+        content = await analysis_executor.run(dumps, body, size=len(request.items))
+    return Response(content, media_type="application/json")
+
+def risk_timeline_body(hourly: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return build_risk_timeline(hourly, vector_analyzer, get_decision_table())
+
+@app.post("/analyze-weather/timeline")
+async def analyze_weather_timeline(
+    api_key: str = Depends(verify_api_key),
+    request: WeatherAnalysisRequest = Depends(decoded_body(WeatherAnalysisRequest, HourlyWeatherRequest, LEAN_DECODING))
+):
+    """Classify every hourly entry and merge elevated-risk hours into periods"""
+    try:
+        hourly = request.weather_data.hourly
+        with metrics.stage('analysis'):
+            timeline = await analysis_executor.run(risk_timeline_body, hourly, size=len(hourly))
+        return FastJSONResponse({
+            "hours": len(hourly),
+            **timeline,
             "timestamp": datetime.now().isoformat()
-        }
+        })
     except Exception as e:
-        logger.error(f"Weather analysis error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Weather analysis failed")
+        logger.error(f"Risk timeline error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Risk timeline failed")
+
+def build_alerts_response(alerts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the /generate-alerts response body from generated alerts"""
+    return {
+        "alerts": alerts,
+        "total_alerts": len(alerts),
+        "severity_distribution": {
+            "severe": len([a for a in alerts if a['type'] == 'severe']),
+            "moderate": len([a for a in alerts if a['type'] == 'moderate']),
+            "info": len([a for a in alerts if a['type'] == 'info'])
+        },
+        "confidence": 0.90,
+        "timestamp": datetime.now().isoformat()
+    }
+
+def alerts_body(weather_data: WeatherData, location: Location) -> Dict[str, Any]:
+    return build_alerts_response(alert_generator.generate_alerts(weather_data, location))
 
 @app.post("/generate-alerts")
 async def generate_alerts(
-    request: AlertGenerationRequest,
-    api_key: str = Depends(verify_api_key)
+    api_key: str = Depends(verify_api_key),
+    request: AlertGenerationRequest = Depends(decoded_body(AlertGenerationRequest, CurrentAlertRequest, LEAN_DECODING))
 ):
     """Generate AI-powered weather alerts"""
     try:
-        alerts = alert_generator.generate_alerts(request.weather_data, request.location)
-        
-        return {
-            "alerts": alerts,
-            "total_alerts": len(alerts),
-            "severity_distribution": {
-                "severe": len([a for a in alerts if a['type'] == 'severe']),
-                "moderate": len([a for a in alerts if a['type'] == 'moderate']),
-                "info": len([a for a in alerts if a['type'] == 'info'])
-            },
-            "confidence": 0.90,
-            "timestamp": datetime.now().isoformat()
-        }
+        with metrics.stage('analysis'):
+            body = await run_analysis(
+                'generate-alerts',
+                (request.weather_data.current, request.location),
+                alerts_body, request.weather_data, request.location
+            )
+        return FastJSONResponse(body)
     except Exception as e:
         logger.error(f"Alert generation error: {str(e)}")
         raise HTTPException(status_code=500, detail="Alert generation failed")
 
+def forecast_alerts_body(
+    hourly: List[Dict[str, Any]], forecast: List[Dict[str, Any]], location: Location, now: Optional[datetime]
+) -> Dict[str, Any]:
+    """/generate-alerts/forecast response body: one alert per threshold-exceeding window"""
+    body = build_alerts_response(alert_generator.generate_forecast_alerts(hourly, forecast, location, now))
+    body["scanned"] = {"hourly": len(hourly), "forecast": len(forecast)}
+    return body
+
+@app.post("/generate-alerts/forecast")
+async def generate_forecast_alerts(
+    api_key: str = Depends(verify_api_key),
+    request: ForecastAlertGenerationRequest = Depends(
+        decoded_body(ForecastAlertGenerationRequest, ForecastAlertRequest, LEAN_DECODING)
+    )
+):
+    """Alerts for the coming hours and days, one per window of slots exceeding a threshold"""
+    try:
+        hourly, forecast = request.weather_data.hourly, request.weather_data.forecast
+        with metrics.stage('analysis'):
+            body = await analysis_executor.run(
+                forecast_alerts_body, hourly, forecast, request.location, request.now, size=len(hourly) + len(forecast)
+            )
+        return FastJSONResponse(body)
+    except Exception as e:
+        logger.error(f"Forecast alert generation error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Alert generation failed")
+
+def alert_changes_body(current: Dict[str, Any], location: Location, full_state: bool) -> Dict[str, Any]:
+    """/generate-alerts/changes response body; applies the generated alerts to the location's state"""
+    key = location_key(location.lat, location.lng)
+    changes = alert_state.update(key, alert_generator.generate_alerts_for(WeatherFeatures.from_current(current), location))
+    body = {"location_key": key, **changes.to_dict(), "total_changes": len(changes)}
+    if full_state:
+        body["active"] = alert_state.active(key)
+    body["timestamp"] = datetime.now().isoformat()
+    return body
+
+@app.post("/generate-alerts/changes")
+async def generate_alert_changes(
+    api_key: str = Depends(verify_api_key),
+    request: AlertChangesRequest = Depends(decoded_body(AlertChangesRequest, CurrentAlertChangesRequest, LEAN_DECODING))
+):
+    """New, updated and cleared alerts for a location since its previous evaluation"""
+    try:
+        with metrics.stage('analysis'):
+            # Neither coalesced nor offloaded: each request must update the state once, in arrival order
+            body = alert_changes_body(request.weather_data.current, request.location, request.full_state)
+        return FastJSONResponse(body)
+    except Exception as e:
+        logger.error(f"Alert change tracking error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Alert generation failed")
+
+def grid_alerts_body(locations: List[GridLocation], precision: int) -> Dict[str, Any]:
+    """/generate-alerts/grid response body: alerts generated once per grid cell, listing the locations they cover"""
+    grid = GridIndex(precision)
+    grid.add_many([item.id for item in locations], [item.lat for item in locations], [item.lng for item in locations])
+    observers = {item.id: item for item in locations if item.weather_data is not None}
+    occupied = grid.cells()
+    cells = []
+    unobserved = []
+    deliveries = 0
+    for (cell, members), lat, lng, radius in zip(occupied.items(), *cell_geometry(list(occupied))):
+        observer = next((observers[member] for member in members if member in observers), None)
+        if observer is None:
+            unobserved.extend(members)
+            continue
+        radius = round(radius, 3)
+        area = Location(name=observer.city or f"grid cell {cell}", lat=round(lat, 6), lng=round(lng, 6), city=observer.city)
+        alerts = alert_generator.generate_alerts_for(WeatherFeatures.from_current(observer.weather_data.current), area)
+        for alert in alerts:
+            alert['location']['radius'] = radius
+        deliveries += len(alerts) * len(members)
+        cells.append({
+            "cell": cell,
+            "center": {"lat": area.lat, "lng": area.lng},
+            "radius_km": radius,
+            "observed_by": observer.id,
+            "members": members,
+            "alerts": alerts,
+            "total_alerts": len(alerts)
+        })
+    return {
+        "precision": precision,
+        "cells": cells,
+        "total_cells": len(cells),
+        "total_locations": len(grid),
+        "total_alerts": sum(cell["total_alerts"] for cell in cells),
+        "deliveries": deliveries,
+        "unobserved": unobserved,
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.post("/generate-alerts/grid")
+async def generate_grid_alerts(
+    api_key: str = Depends(verify_api_key),
+    request: GridAlertRequest = Depends(decoded_body(GridAlertRequest, GridAlertRequest, LEAN_DECODING))
+):
+    """Generate alerts once per grid cell and fan them out to the cell's locations"""
+    precision = GRID_PRECISION if request.precision is None else request.precision
+    if not 1 <= precision <= GRID_MAX_PRECISION:
+        raise HTTPException(status_code=422, detail=f"precision must be between 1 and {GRID_MAX_PRECISION}, got {precision}")
+    if len(request.locations) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch size {len(request.locations)} exceeds limit of {BATCH_MAX_ITEMS}"
+        )
+    try:
+        with metrics.stage('analysis'):
+            body = await analysis_executor.run(grid_alerts_body, request.locations, precision, size=len(request.locations))
+        return FastJSONResponse(body)
+    except Exception as e:
+        logger.error(f"Grid alert generation error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Alert generation failed")
+
+def fanout_body(current: Dict[str, Any], location: Location, radius_km: float) -> Dict[str, Any]:
+    """/generate-alerts/fanout response body: the alerts and every subscription within radius_km"""
+    body = build_alerts_response(alert_generator.generate_alerts_for(WeatherFeatures.from_current(current), location))
+    recipients = subscriptions.query_radius(location.lat, location.lng, radius_km)[0] if body["alerts"] else []
+    body.update(radius_km=radius_km, recipients=recipients, total_recipients=len(recipients))
+    return body
+
+@app.post("/generate-alerts/fanout")
+async def generate_alerts_fanout(
+    api_key: str = Depends(verify_api_key),
+    request: AlertFanoutRequest = Depends(decoded_body(AlertFanoutRequest, CurrentAlertFanoutRequest, LEAN_DECODING))
+):
+    """Generate alerts for a location and list the subscriptions within radius_km that receive them"""
+    radius_km = FANOUT_RADIUS_KM if request.radius_km is None else request.radius_km
+    if radius_km < 0:
+        raise HTTPException(status_code=422, detail="radius_km must not be negative")
+    try:
+        with metrics.stage('analysis'):
+            body = fanout_body(request.weather_data.current, request.location, radius_km)
+        return FastJSONResponse(body)
+    except Exception as e:
+        logger.error(f"Alert fan-out error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Alert generation failed")
+
+@app.post("/generate-alerts/stream")
+async def generate_alerts_stream(
+    request: Request,
+    api_key: str = Depends(verify_api_key)
+):
+    """Generate alerts for an NDJSON stream of records, emitting NDJSON as it goes"""
+    return DuplexStreamingResponse(
+        stream_alerts(
+            request.stream(),
+            alert_generator,
+            CurrentAlertRequest if LEAN_DECODING else AlertGenerationRequest,
+            STREAM_MAX_LINE_BYTES
+        ),
+        media_type="application/x-ndjson"
+    )
+
+def event_recommendations_cache_key(features: WeatherFeatures) -> tuple:
+    """Threshold buckets that fully determine build_event_recommendations"""
+    temp, uv_index, air_quality = features.temperature, features.uv_index, features.aqi
+    # Mirror the branch order so readings the endpoint never compares are not compared here
+    extreme_temperature = temp > 85 or temp < 32
+    wet_weather = not extreme_temperature and features.condition in ['rain', 'storm', 'thunderstorm']
+    high_exposure = not extreme_temperature and not wet_weather and (uv_index > 8 or air_quality > 100)
+    return (
+        'event-recommendations',
+        extreme_temperature,
+        wet_weather,
+        high_exposure,
+        temp > 80,
+        temp < 40
+    )
+
+def build_event_recommendations(features: WeatherFeatures) -> Dict[str, Any]:
+    """Build the /event-recommendations response body (without timestamp)"""
+    temp, uv_index, air_quality = features.temperature, features.uv_index, features.aqi
+    
+    # Determine suitable activities based on weather
+    suitable_activities = []
+    weather_considerations = []
+    optimal_times = []
+    
+    if temp > 85 or temp < 32:
+        suitable_activities = [
+            'Indoor activities',
+            'Museum visits',
+            'Library reading',
+            'Indoor sports',
+            'Cooking classes'
+        ]
+        weather_considerations = [
+            'Extreme temperature conditions',
+            'Limit outdoor exposure',
+            'Stay hydrated and comfortable'
+        ]
+    elif features.condition in ['rain', 'storm', 'thunderstorm']:
+        suitable_activities = [
+            'Indoor entertainment',
+            'Movie theaters',
+            'Shopping malls',
+            'Indoor games',
+            'Art galleries'
+        ]
+        weather_considerations = [
+            'Wet weather conditions',
+            'Avoid outdoor activities',
+            'Have umbrella if going out'
+        ]
+    elif uv_index > 8 or air_quality > 100:
+        suitable_activities = [
+            'Indoor activities',
+            'Gym workouts',
+            'Indoor swimming',
+            'Library visits',
+            'Home activities'
+        ]
+        weather_considerations = [
+            'High UV or poor air quality',
+            'Limit sun exposure',
+            'Use air purifiers indoors'
+        ]
+    else:
+        suitable_activities = [
+            'Outdoor sports',
+            'Hiking and walking',
+            'Picnics and barbecues',
+            'Gardening',
+            'Outdoor photography'
+        ]
+        weather_considerations = [
+            'Good weather conditions',
+            'Enjoy outdoor activities',
+            'Apply sunscreen if needed'
+        ]
+    
+    # Determine optimal times
+    if temp > 80:
+        optimal_times = ['Early morning (6-9 AM)', 'Evening (6-9 PM)']
+    elif temp < 40:
+        optimal_times = ['Midday (10 AM-2 PM)', 'Afternoon (2-5 PM)']
+    else:
+        optimal_times = ['Morning (8-11 AM)', 'Afternoon (2-5 PM)', 'Evening (6-8 PM)']
+    
+    return {
+        "suitable_activities": suitable_activities,
+        "weather_considerations": weather_considerations,
+        "optimal_times": optimal_times,
+        "confidence": 0.88
+    }
+
+def event_recommendations_body(features: WeatherFeatures) -> Dict[str, Any]:
+    """Cached /event-recommendations body (without timestamp)"""
+    return result_cache.get_or_compute(
+        event_recommendations_cache_key(features),
+        lambda: build_event_recommendations(features)
+    )
+
 @app.post("/event-recommendations")
 async def event_recommendations(
-    request: EventRecommendationRequest,
-    api_key: str = Depends(verify_api_key)
+    api_key: str = Depends(verify_api_key),
+    request: EventRecommendationRequest = Depends(decoded_body(EventRecommendationRequest, CurrentWeatherRequest, LEAN_DECODING))
 ):
     """Generate AI-powered event recommendations"""
     try:
-        current = request.weather_data.current
-        temp = current.get('temperature', 70)
-        condition = current.get('condition', {}).get('main', '').lower()
-        uv_index = current.get('uvIndex', 0)
-        air_quality = current.get('airQuality', {}).get('aqi', 0)
-        
-        # Determine suitable activities based on weather
-        suitable_activities = []
-        weather_considerations = []
-        optimal_times = []
-        
-        if temp > 85 or temp < 32:
-            suitable_activities = [
-                'Indoor activities',
-                'Museum visits',
-                'Library reading',
-                'Indoor sports',
-                'Cooking classes'
-            ]
-            weather_considerations = [
-                'Extreme temperature conditions',
-                'Limit outdoor exposure',
-                'Stay hydrated and comfortable'
-            ]
-        elif condition in ['rain', 'storm', 'thunderstorm']:
-            suitable_activities = [
-                'Indoor entertainment',
-                'Movie theaters',
-                'Shopping malls',
-                'Indoor games',
-                'Art galleries'
-            ]
-            weather_considerations = [
-                'Wet weather conditions',
-                'Avoid outdoor activities',
-                'Have umbrella if going out'
-            ]
-        elif uv_index > 8 or air_quality > 100:
-            suitable_activities = [
-                'Indoor activities',
-                'Gym workouts',
-                'Indoor swimming',
-                'Library visits',
-                'Home activities'
-            ]
-            weather_considerations = [
-                'High UV or poor air quality',
-                'Limit sun exposure',
-                'Use air purifiers indoors'
-            ]
-        else:
-            suitable_activities = [
-                'Outdoor sports',
-                'Hiking and walking',
-                'Picnics and barbecues',
-                'Gardening',
-                'Outdoor photography'
-            ]
-            weather_considerations = [
-                'Good weather conditions',
-                'Enjoy outdoor activities',
-                'Apply sunscreen if needed'
-            ]
-        
-        # Determine optimal times
-        if temp > 80:
-            optimal_times = ['Early morning (6-9 AM)', 'Evening (6-9 PM)']
-        elif temp < 40:
-            optimal_times = ['Midday (10 AM-2 PM)', 'Afternoon (2-5 PM)']
-        else:
-            optimal_times = ['Morning (8-11 AM)', 'Afternoon (2-5 PM)', 'Evening (6-8 PM)']
-        
-        return {
-            "suitable_activities": suitable_activities,
-            "weather_considerations": weather_considerations,
-            "optimal_times": optimal_times,
-            "confidence": 0.88,
-            "timestamp": datetime.now().isoformat()
-        }
+        with metrics.stage('analysis'):
+            current = request.weather_data.current
+            features = WeatherFeatures.from_current(current)
+            body = await run_analysis('event-recommendations', (current,), event_recommendations_body, features)
+        return FastJSONResponse({**body, "timestamp": datetime.now().isoformat()})
     except Exception as e:
         logger.error(f"Event recommendations error: {str(e)}")
         raise HTTPException(status_code=500, detail="Event recommendations failed")
 
+def health_insights_cache_key(features: WeatherFeatures, comfort: Optional[ComfortIndices] = None) -> tuple:
+    """Threshold buckets that fully determine build_health_insights"""
+    temp, humidity, uv_index, air_quality, _ = features.readings()
+    comfort = comfort or ComfortIndices.from_features(features)
+    heat_index, wind_chill = comfort.heat_index, comfort.wind_chill
+    return (
+        'health-insights',
+        temp > 85,
+        temp < 32,
+        temp > 90 or temp < 20,
+        humidity > 80,
+        humidity > 90,
+        uv_index > 8,
+        air_quality > 100,
+        air_quality > 150,
+        heat_index is not None and heat_index >= 90,
+        heat_index is not None and heat_index >= 103,
+        wind_chill is not None and wind_chill <= 32 and wind_chill < temp,
+        wind_chill is not None and wind_chill <= -18
+    )
+
+def build_health_insights(features: WeatherFeatures, comfort: Optional[ComfortIndices] = None) -> Dict[str, Any]:
+    """Build the /health-insights response body (without timestamp)"""
+    temp, humidity, uv_index, air_quality, _ = features.readings()
+    comfort = comfort or ComfortIndices.from_features(features)
+    heat_index, wind_chill = comfort.heat_index, comfort.wind_chill
+    
+    # Generate general health tips
+    general_tips = [
+        'Stay hydrated throughout the day',
+        'Dress appropriately for the weather',
+        'Monitor air quality for outdoor activities',
+        'Get adequate sleep for immune health'
+    ]
+    
+    # Weather-specific health advice
+    weather_specific = {}
+    
+    if temp > 85:
+        weather_specific['hot_weather'] = [
+            'Drink 8-10 glasses of water daily',
+            'Avoid alcohol and caffeine',
+            'Wear light, loose clothing',
+            'Take breaks in air conditioning',
+            'Watch for heat exhaustion signs'
+        ]
+    elif temp < 32:
+        weather_specific['cold_weather'] = [
+            'Layer clothing for warmth',
+            'Protect hands, feet, and head',
+            'Stay dry to prevent hypothermia',
+            'Limit time outdoors',
+            'Warm up gradually after being outside'
+        ]
+    
+    if humidity > 80:
+        weather_specific['high_humidity'] = [
+            'Use fans or air conditioning',
+            'Avoid strenuous activities',
+            'Stay in well-ventilated areas',
+            'Monitor for heat-related illness'
+        ]
+    
+    # What the body feels: humidity raises the heat index, wind lowers the wind chill
+    if heat_index is not None and heat_index >= 90:
+        weather_specific['heat_index'] = [
+            'Schedule strenuous activity for early morning or evening',
+            'Take frequent breaks in shade or air conditioning',
+            'Check on elderly neighbors and never leave anyone in a parked car',
+            'Know the signs of heat exhaustion and heat stroke'
+        ]
+    
+    if wind_chill is not None and wind_chill <= 32 and wind_chill < temp:
+        weather_specific['wind_chill'] = [
+            'Cover exposed skin, especially face, ears and hands',
+            'Wear a windproof outer layer',
+            'Keep time in the wind short',
+            'Watch for numbness or pale skin, early signs of frostbite'
+        ]
+    
+    if air_quality > 100:
+        weather_specific['poor_air_quality'] = [
+            'Limit outdoor activities',
+            'Use air purifiers indoors',
+            'Wear N95 masks if going out',
+            'Keep windows closed',
+            'Avoid outdoor exercise'
+        ]
+    
+    # Risk factors assessment
+    risk_factors = []
+    if temp > 90 or temp < 20:
+        risk_factors.append('Extreme temperature exposure')
+    if uv_index > 8:
+        risk_factors.append('High UV exposure')
+    if air_quality > 150:
+        risk_factors.append('Poor air quality')
+    if humidity > 90:
+        risk_factors.append('High humidity stress')
+    if heat_index is not None and heat_index >= 103:
+        risk_factors.append('Dangerous heat index')
+    if wind_chill is not None and wind_chill <= -18:
+        risk_factors.append('Frostbite risk from wind chill')
+    
+    if not risk_factors:
+        risk_factors.append('Normal risk level for current conditions')
+    
+    return {
+        "general_tips": general_tips,
+        "weather_specific": weather_specific,
+        "risk_factors": risk_factors,
+        "recommendations": {
+            "immediate_actions": [
+                "Check current conditions before going out",
+                "Dress appropriately for the weather",
+                "Stay informed about weather changes"
+            ],
+            "long_term_health": [
+                "Maintain regular exercise routine",
+                "Eat a balanced diet",
+                "Get regular health checkups",
+                "Monitor weather-related health conditions"
+            ]
+        },
+        "confidence": 0.87
+    }
+
+def health_insights_body(features: WeatherFeatures) -> Dict[str, Any]:
+    """Cached /health-insights body (without timestamp), plus the reading's exact comfort indices"""
+    comfort = ComfortIndices.from_features(features)
+    body = result_cache.get_or_compute(
+        health_insights_cache_key(features, comfort),
+        lambda: build_health_insights(features, comfort)
+    )
+    return {**body, "comfort": comfort.to_dict()}
+
 @app.post("/health-insights")
 async def health_insights(
-    request: HealthInsightsRequest,
-    api_key: str = Depends(verify_api_key)
+    api_key: str = Depends(verify_api_key),
+    request: HealthInsightsRequest = Depends(decoded_body(HealthInsightsRequest, CurrentWeatherRequest, LEAN_DECODING))
 ):
     """Generate AI-powered health insights"""
     try:
-        current = request.weather_data.current
-        temp = current.get('temperature', 70)
-        humidity = current.get('humidity', 50)
-        uv_index = current.get('uvIndex', 0)
-        air_quality = current.get('airQuality', {}).get('aqi', 0)
-        
-        # Generate general health tips
-        general_tips = [
-            'Stay hydrated throughout the day',
-            'Dress appropriately for the weather',
-            'Monitor air quality for outdoor activities',
-            'Get adequate sleep for immune health'
-        ]
-        
-        # Weather-specific health advice
-        weather_specific = {}
-        
-        if temp > 85:
-            weather_specific['hot_weather'] = [
-                'Drink 8-10 glasses of water daily',
-                'Avoid alcohol and caffeine',
-                'Wear light, loose clothing',
-                'Take breaks in air conditioning',
-                'Watch for heat exhaustion signs'
-            ]
-        elif temp < 32:
-            weather_specific['cold_weather'] = [
-                'Layer clothing for warmth',
-                'Protect hands, feet, and head',
-                'Stay dry to prevent hypothermia',
-                'Limit time outdoors',
-                'Warm up gradually after being outside'
-            ]
-        
-        if humidity > 80:
-            weather_specific['high_humidity'] = [
-                'Use fans or air conditioning',
-                'Avoid strenuous activities',
-                'Stay in well-ventilated areas',
-                'Monitor for heat-related illness'
-            ]
-        
-        if air_quality > 100:
-            weather_specific['poor_air_quality'] = [
-                'Limit outdoor activities',
-                'Use air purifiers indoors',
-                'Wear N95 masks if going out',
-                'Keep windows closed',
-                'Avoid outdoor exercise'
-            ]
-        
-        # Risk factors assessment
-        risk_factors = []
-        if temp > 90 or temp < 20:
-            risk_factors.append('Extreme temperature exposure')
-        if uv_index > 8:
-            risk_factors.append('High UV exposure')
-        if air_quality > 150:
-            risk_factors.append('Poor air quality')
-        if humidity > 90:
-            risk_factors.append('High humidity stress')
-        
-        if not risk_factors:
-            risk_factors.append('Normal risk level for current conditions')
-        
-        return {
-            "general_tips": general_tips,
-            "weather_specific": weather_specific,
-            "risk_factors": risk_factors,
-            "recommendations": {
-                "immediate_actions": [
-                    "Check current conditions before going out",
-                    "Dress appropriately for the weather",
-                    "Stay informed about weather changes"
-                ],
-                "long_term_health": [
-                    "Maintain regular exercise routine",
-                    "Eat a balanced diet",
-                    "Get regular health checkups",
-                    "Monitor weather-related health conditions"
-                ]
-            },
-            "confidence": 0.87,
-            "timestamp": datetime.now().isoformat()
-        }
+        with metrics.stage('analysis'):
+            current = request.weather_data.current
+            features = WeatherFeatures.from_current(current)
+            body = await run_analysis('health-insights', (current,), health_insights_body, features)
+        return FastJSONResponse({**body, "timestamp": datetime.now().isoformat()})
     except Exception as e:
         logger.error(f"Health insights error: {str(e)}")
         raise HTTPException(status_code=500, detail="Health insights failed")
 
+def insights_sections(
+    features: WeatherFeatures,
+    sections: List[str],
+    location: Optional[Location],
+    timestamp: str
+) -> Dict[str, Any]:
+    """/insights response body for the requested sections"""
+    response = {"sections": sections}
+    for section in sections:
+        try:
+            if section == 'analysis':
+                response[section] = analysis_body(features, timestamp)
+            elif section == 'alerts':
+                response[section] = build_alerts_response(
+                    alert_generator.generate_alerts_for(features, location)
+                )
+            elif section == 'event_recommendations':
+                body = event_recommendations_body(features)
+                response[section] = {**body, "timestamp": timestamp}
+            else:
+                response[section] = {**health_insights_body(features), "timestamp": timestamp}
+        except Exception as e:
+            # One failing section should not cost the caller the others
+            logger.error(f"Insights {section} error: {str(e)}")
+            response[section] = {"error": f"{section.replace('_', ' ').capitalize()} failed"}
+    response["timestamp"] = timestamp
+    return response
+
+@app.post("/insights")
+async def insights(
+    api_key: str = Depends(verify_api_key),
+    request: InsightsRequest = Depends(decoded_body(InsightsRequest, CurrentInsightsRequest, LEAN_DECODING))
+):
+    """Return any subset of analysis, alerts, event recommendations and health insights
+    from one parse of the payload and one read of the current readings"""
+    sections = list(dict.fromkeys(request.sections or INSIGHT_SECTIONS))
+    unknown = [section for section in sections if section not in INSIGHT_SECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown sections: {', '.join(unknown)}. Valid sections: {', '.join(INSIGHT_SECTIONS)}"
+        )
+    if 'alerts' in sections and request.location is None:
+        raise HTTPException(status_code=422, detail="location is required for the alerts section")
+    
+    try:
+        features = WeatherFeatures.from_current(request.weather_data.current)
+    except Exception as e:
+        logger.error(f"Insights error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Insights failed")
+    
+    timestamp = datetime.now().isoformat()
+    with metrics.stage('analysis'):
+        response = await run_analysis(
+            'insights',
+            (request.weather_data.current, sections, request.location),
+            insights_sections, features, sections, request.location, timestamp
+        )
+    return FastJSONResponse(response)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint(api_key: str = Depends(verify_api_key)):
+    """Request, stage latency and cache metrics in the Prometheus text format"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/profiles")
+async def list_profiles(limit: int = 20, api_key: str = Depends(verify_api_key)):
+    """Most recent request profiles, newest first"""
+    return FastJSONResponse({
+        "enabled": profiler.enabled,
+        "sample_rate": profiler.sample_rate,
+        "header_enabled": profiler.header_enabled,
+        "profiles": profiler.list_profiles(max(1, min(limit, profiler.keep))),
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.get("/profiles/{name}", response_class=PlainTextResponse)
+async def show_profile(name: str, sort: str = "cumulative", api_key: str = Depends(verify_api_key)):
+    """pstats text report of one profile"""
+    if sort not in PROFILE_SORT_KEYS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown sort key '{sort}'. Valid keys: {', '.join(PROFILE_SORT_KEYS)}"
+        )
+    report = profiler.summary(name, sort=sort)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(report)
+
+@app.get("/cache/stats")
+async def cache_stats(api_key: str = Depends(verify_api_key)):
+    """Hit, miss and eviction counters for the analysis result cache, plus request coalescing"""
+    return FastJSONResponse({
+        "cache": result_cache.stats(),
+        "coalescing": {"enabled": COALESCING_ENABLED, **coalescer.stats()},
+        "timestamp": datetime.now().isoformat()
+    })
+
+def load_subscriptions(request: SubscriptionLoadRequest) -> None:
+    if request.replace:
+        subscriptions.load(request.ids, request.lats, request.lngs)
+    else:
+        subscriptions.add_many(request.ids, request.lats, request.lngs)
+
+@app.post("/subscriptions")
+async def add_subscriptions(
+    api_key: str = Depends(verify_api_key),
+    request: SubscriptionLoadRequest = Depends(decoded_body(SubscriptionLoadRequest, SubscriptionLoadRequest, LEAN_DECODING))
+):
+    """Add or move subscriptions (ids with coordinates), or replace them all"""
+    if not len(request.ids) == len(request.lats) == len(request.lngs):
+        raise HTTPException(status_code=422, detail="ids, lats and lngs must have the same length")
+    try:
+        await index_executor.run(load_subscriptions, request, size=len(request.ids))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return FastJSONResponse({
+        "received": len(request.ids),
+        "total": len(subscriptions),
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.post("/subscriptions/remove")
+async def remove_subscriptions(
+    api_key: str = Depends(verify_api_key),
+    request: SubscriptionRemoveRequest = Depends(decoded_body(SubscriptionRemoveRequest, SubscriptionRemoveRequest, LEAN_DECODING))
+):
+    """Delete subscriptions by id"""
+    removed = await index_executor.run(subscriptions.remove_many, request.ids, size=len(request.ids))
+    return FastJSONResponse({
+        "removed": removed,
+        "total": len(subscriptions),
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.post("/subscriptions/radius")
+async def subscriptions_within_radius(
+    api_key: str = Depends(verify_api_key),
+    request: RadiusQueryRequest = Depends(decoded_body(RadiusQueryRequest, RadiusQueryRequest, LEAN_DECODING))
+):
+    """Subscriptions within radius_km of a point"""
+    if request.radius_km < 0 or (request.limit is not None and request.limit < 0):
+        raise HTTPException(status_code=422, detail="radius_km and limit must not be negative")
+    try:
+        ids, distances = subscriptions.query_radius(
+            request.lat, request.lng, request.radius_km, request.limit, request.include_distances
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    body = {"ids": ids, "count": len(ids), "radius_km": request.radius_km}
+    if distances is not None:
+        body["distances_km"] = [round(distance, 3) for distance in distances]
+    body["timestamp"] = datetime.now().isoformat()
+    return FastJSONResponse(body)
+
+@app.get("/subscriptions/stats")
+async def subscription_stats(api_key: str = Depends(verify_api_key)):
+    """Size of the subscription index, pending updates and rebuilds"""
+    return FastJSONResponse({
+        **subscriptions.stats(),
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.get("/alerts/stats")
+async def alert_state_stats(api_key: str = Depends(verify_api_key)):
+    """Locations and alerts held by the alert state store, and the changes it has sent"""
+    return FastJSONResponse({
+        **alert_state.stats(),
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.get("/admission/stats")
+async def admission_stats(api_key: str = Depends(verify_api_key)):
+    """In-flight, queued, admitted and rejected requests per endpoint"""
+    return FastJSONResponse({
+        "enabled": ADMISSION_ENABLED,
+        "endpoints": admission.stats(),
+        "timestamp": datetime.now().isoformat()
+    })
+
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
+    # Same switch as run.py: auto-reload only in development
+    if "--production" in sys.argv or os.getenv("AI_ENV") == "production":
+        from serving import run_production
+
+        run_production("main:app")
+    else:
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=True,
+            log_level="info"
+        )
@@ -0,0 +1,243 @@
+"""
+Request metrics for the AtmosAI AI Service.
+
+Counts requests and errors per endpoint and records latency histograms for
+whole requests and for the stages inside them (auth, validation, analysis,
+serialization). `render()` produces the Prometheus text exposition format
+served at /metrics. Recording is a few dict lookups and a bisect per
+observation, cheap enough to leave on in production.
+
+The endpoint label is set by MetricsMiddleware for the duration of a
+request; `stage()` outside a request records nothing, so the modules that
+call it can also be used from scripts and benchmarks.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Upper bounds in seconds; stages are often well under a millisecond
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# (name, type, help, labels, value) as yielded by collectors
+Sample = Tuple[str, str, str, Dict[str, Any], float]
+
+_endpoint: ContextVar[Optional[str]] = ContextVar('metrics_endpoint', default=None)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        # The bucket with bound `le` counts values <= le; the last slot is +Inf
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        bounds = [_number(bound) for bound in self.buckets] + ['+Inf']
+        rows = []
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            rows.append((bound, total))
+        return rows
+
+
+class _StageTimer:
+    __slots__ = ('metrics', 'stage', 'started')
+
+    def __init__(self, metrics: 'Metrics', stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self) -> '_StageTimer':
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.metrics.observe_stage(self.stage, time.perf_counter() - self.started)
+
+
+class Metrics:
+    """Thread-safe registry of request counters, latency histograms and collectors"""
+
+    def __init__(self, namespace: str = 'atmosai', buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = buckets
+        self.started_at = time.time()
+        self.in_flight = 0
+        self._requests: Dict[Tuple[str, str, int], int] = {}
+        self._errors: Dict[str, int] = {}
+        self._request_latency: Dict[str, Histogram] = {}
+        self._stage_latency: Dict[Tuple[str, str], Histogram] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        self._lock = threading.Lock()
+
+    def observe_request(self, endpoint: str, method: str, status: int, seconds: float) -> None:
+        with self._lock:
+            key = (endpoint, method, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            if status >= 500:
+                self._errors[endpoint] = self._errors.get(endpoint, 0) + 1
+            histogram = self._request_latency.get(endpoint)
+            if histogram is None:
+                histogram = self._request_latency[endpoint] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        """Record `seconds` spent in `stage` for the current request, if any"""
+        endpoint = _endpoint.get()
+        if endpoint is None:
+            return
+        with self._lock:
+            key = (endpoint, stage)
+            histogram = self._stage_latency.get(key)
+            if histogram is None:
+                histogram = self._stage_latency[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def stage(self, name: str) -> _StageTimer:
+        """Context manager timing one stage of the current request"""
+        return _StageTimer(self, name)
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """Register a callable yielding (name, type, help, labels, value) at scrape time"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        ns = self.namespace
+        lines: List[str] = []
+
+        def header(name: str, kind: str, help_text: str) -> None:
+            lines.append(f'# HELP {ns}_{name} {help_text}')
+            lines.append(f'# TYPE {ns}_{name} {kind}')
+
+        def histogram_lines(name: str, labels: Dict[str, Any], histogram: Histogram) -> None:
+            for bound, count in histogram.cumulative():
+                lines.append(f'{ns}_{name}_bucket{_labels({**labels, "le": bound})} {count}')
+            lines.append(f'{ns}_{name}_sum{_labels(labels)} {_number(histogram.sum)}')
+            lines.append(f'{ns}_{name}_count{_labels(labels)} {histogram.count}')
+
+        with self._lock:
+            header('http_requests_total', 'counter', 'Requests by endpoint, method and status code')
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                lines.append(f'{ns}_http_requests_total{_labels({"endpoint": endpoint, "method": method, "status": status})} {count}')
+
+            header('http_request_errors_total', 'counter', 'Requests that ended with a 5xx status')
+            for endpoint, count in sorted(self._errors.items()):
+                lines.append(f'{ns}_http_request_errors_total{_labels({"endpoint": endpoint})} {count}')
+
+            header('http_requests_in_flight', 'gauge', 'Requests currently being handled')
+            lines.append(f'{ns}_http_requests_in_flight {self.in_flight}')
+
+            header('http_request_duration_seconds', 'histogram', 'Request latency from first byte received to last byte sent')
+            for endpoint, histogram in sorted(self._request_latency.items()):
+                histogram_lines('http_request_duration_seconds', {'endpoint': endpoint}, histogram)
+
+            header('stage_duration_seconds', 'histogram', 'Time spent in auth, validation, analysis and serialization')
+            for (endpoint, stage), histogram in sorted(self._stage_latency.items()):
+                histogram_lines('stage_duration_seconds', {'endpoint': endpoint, 'stage': stage}, histogram)
+
+        header('process_start_time_seconds', 'gauge', 'Start time of the process since the Unix epoch')
+        lines.append(f'{ns}_process_start_time_seconds {_number(round(self.started_at, 3))}')
+
+        seen = set()
+        for collector in self._collectors:
+            for name, kind, help_text, labels, value in collector():
+                if name not in seen:
+                    seen.add(name)
+                    header(name, kind, help_text)
+                lines.append(f'{ns}_{name}{_labels(labels)} {_number(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """ASGI middleware that times each HTTP request and labels it with its route.
+
+    The label is the matched route's path template, so `/profiles/a` and
+    `/profiles/b` are both `/profiles/{name}`. Paths that match no route are
+    reported as "other" so unknown URLs cannot grow the label set.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+        self.paths: Optional[frozenset] = None
+        self.templated_routes: Tuple[BaseRoute, ...] = ()
+
+    def route_label(self, scope: Scope) -> str:
+        if self.paths is None:
+            routes = [route for route in scope['app'].routes if isinstance(getattr(route, 'path', None), str)]
+            # Plain paths are looked up directly; only templated ones need the route's own matching
+            self.templated_routes = tuple(route for route in routes if '{' in route.path)
+            self.paths = frozenset(route.path for route in routes if '{' not in route.path)
+        if scope['path'] in self.paths:
+            return scope['path']
+        for route in self.templated_routes:
+            # PARTIAL is a path match with another method, answered by the route with 405
+            if route.matches(scope)[0] != Match.NONE:
+                return route.path
+        return 'other'
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = self.route_label(scope)
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        token = _endpoint.set(endpoint)
+        self.metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.in_flight -= 1
+            self.metrics.observe_request(endpoint, scope['method'], status, time.perf_counter() - started)
+            _endpoint.reset(token)
+
+
+# Shared by main.py and the modules whose stages it times
+metrics = Metrics()
@@ -0,0 +1,135 @@
+"""
+Micro-batching for the AtmosAI AI Service.
+
+`MicroBatcher` collects single requests that arrive within a short window
+(or until a maximum batch size) and runs them through a vectorized function
+as one batch, then hands each caller its own result. Every request waits at
+most one window, and the per-item cost drops to the vectorized one.
+
+Batching only pays when several requests share a window, so the batcher
+tracks the arrival rate and processes requests one at a time, with no
+added wait, while the rate is below `min_rate`. It switches on at
+`min_rate` and back off below half of it, so it does not flap around the
+threshold.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+# Time constant of the arrival rate estimate, in seconds
+RATE_HORIZON = 1.0
+
+
+class MicroBatcher(Generic[T, R]):
+    """Runs `process_batch` over requests collected for up to `window` seconds.
+
+    `process_batch(items)` returns one result per item, in order.
+    `process_one(item)` serves requests while batching is off.
+    `run_batch(process_batch, items)`, if given, runs a batch (for instance in
+    the analysis executor); batches otherwise run on the event loop.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[T]], List[R]],
+        process_one: Callable[[T], R],
+        window: float = 0.002,
+        max_batch: int = 64,
+        min_rate: float = 1000.0,
+        run_batch: Optional[Callable[[Callable[[List[T]], List[R]], List[T]], Awaitable[List[R]]]] = None
+    ):
+        self.process_batch = process_batch
+        self.process_one = process_one
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self.min_rate = min_rate
+        self.run_batch = run_batch
+        self.active = False
+        self.rate = 0.0
+        self.batches = 0
+        self.batched_items = 0
+        self.direct_items = 0
+        self._last_arrival = time.monotonic()
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def _observe_arrival(self) -> None:
+        # Exponentially decayed count of arrivals per RATE_HORIZON seconds
+        now = time.monotonic()
+        self.rate = self.rate * math.exp((self._last_arrival - now) / RATE_HORIZON) + 1 / RATE_HORIZON
+        self._last_arrival = now
+        if not self.active and self.rate >= self.min_rate:
+            self.active = True
+            logger.info(f"Micro-batching on at {self.rate:.0f} requests/s")
+        elif self.active and self.rate < self.min_rate / 2:
+            self.active = False
+            logger.info(f"Micro-batching off at {self.rate:.0f} requests/s")
+
+    async def submit(self, item: T) -> R:
+        """Result for `item`, computed alone or as part of the next batch"""
+        self._observe_arrival()
+        if not self.active and not self._pending:
+            self.direct_items += 1
+            return self.process_one(item)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        items = [item for item, _ in batch]
+        self.batches += 1
+        self.batched_items += len(items)
+        try:
+            if self.run_batch is not None:
+                results = await self.run_batch(self.process_batch, items)
+            else:
+                results = self.process_batch(items)
+        except Exception:
+            # One bad item must not fail the requests batched with it
+            for item, future in batch:
+                if future.done():
+                    continue
+                try:
+                    future.set_result(self.process_one(item))
+                except Exception as e:
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        # Decay the rate to now so an idle batcher does not report its last burst
+        rate = self.rate * math.exp((self._last_arrival - time.monotonic()) / RATE_HORIZON)
+        return {
+            'active': self.active,
+            'arrival_rate': round(rate, 1),
+            'window_ms': self.window * 1000,
+            'max_batch': self.max_batch,
+            'min_rate': self.min_rate,
+            'batches': self.batches,
+            'batched_items': self.batched_items,
+            'direct_items': self.direct_items,
+            'mean_batch_size': round(self.batched_items / self.batches, 2) if self.batches else 0.0
+        }
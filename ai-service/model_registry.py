@@ -0,0 +1,128 @@
+"""
+Lazy model registry for the AtmosAI AI Service.
+
+Models and other expensive artifacts are registered with a loader instead
+of being built at import time. A loader runs on the first `get()` or during
+the background warmup started when the app starts, whichever comes first.
+Heavy libraries (scikit-learn, torch, ...) should be imported inside the
+loader so importing main.py stays fast.
+
+`ready()` backs the /ready probe: it is true once every required model has
+loaded, so orchestrators only route traffic to warm instances while /health
+keeps reporting liveness.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+REGISTERED, LOADING, READY, FAILED = 'registered', 'loading', 'ready', 'failed'
+
+
+class ModelUnavailableError(RuntimeError):
+    """Raised by `get()` when a model's loader failed"""
+
+
+class _Entry:
+    __slots__ = ('loader', 'warm', 'required', 'state', 'value', 'error', 'load_seconds', 'lock')
+
+    def __init__(self, loader: Callable[[], Any], warm: bool, required: bool):
+        self.loader = loader
+        self.warm = warm
+        self.required = required
+        self.state = REGISTERED
+        self.value = None
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """Named, lazily loaded models shared by all requests"""
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._warmup_thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, loader: Callable[[], Any], warm: bool = True, required: bool = True) -> None:
+        """Add a model. `warm` loads it in the startup warmup; `required` gates /ready"""
+        if name in self._entries:
+            raise ValueError(f"Model '{name}' is already registered")
+        self._entries[name] = _Entry(loader, warm, required)
+
+    def get(self, name: str) -> Any:
+        """The loaded model, loading it now if needed"""
+        entry = self._entries[name]
+        if entry.state == READY:
+            return entry.value
+        return self._load(name, entry)
+
+    def available(self, name: str) -> Optional[Any]:
+        """The loaded model, loading it now if needed, or None if it is not registered or failed.
+
+        Unlike `get()`, a failed loader is not retried on every call, so
+        optional models with a fallback can be looked up on the hot path.
+        """
+        entry = self._entries.get(name)
+        if entry is None or entry.state == FAILED:
+            return None
+        if entry.state == READY:
+            return entry.value
+        try:
+            return self._load(name, entry)
+        except ModelUnavailableError:
+            return None
+
+    def _load(self, name: str, entry: _Entry) -> Any:
+        # The lock makes concurrent first calls (and the warmup) load only once
+        with entry.lock:
+            if entry.state == READY:
+                return entry.value
+            entry.state = LOADING
+            started = time.perf_counter()
+            try:
+                value = entry.loader()
+            except Exception as e:
+                entry.state = FAILED
+                entry.error = str(e)
+                logger.error(f"Loading model '{name}' failed: {str(e)}")
+                raise ModelUnavailableError(f"Model '{name}' is unavailable") from e
+            entry.load_seconds = time.perf_counter() - started
+            entry.value = value
+            entry.error = None
+            entry.state = READY
+            logger.info(f"Loaded model '{name}' in {entry.load_seconds * 1000:.1f} ms")
+            return value
+
+    def warmup(self) -> threading.Thread:
+        """Load every `warm` model in a background thread (once)"""
+        if self._warmup_thread is None:
+            self._warmup_thread = threading.Thread(target=self.load_all, name='model-warmup', daemon=True)
+            self._warmup_thread.start()
+        return self._warmup_thread
+
+    def load_all(self) -> None:
+        """Load every `warm` model now; used before forking workers so they share it"""
+        for name, entry in list(self._entries.items()):
+            if entry.warm and entry.state != READY:
+                try:
+                    self._load(name, entry)
+                except ModelUnavailableError:
+                    pass
+
+    def ready(self) -> bool:
+        return all(entry.state == READY for entry in self._entries.values() if entry.required)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                'state': entry.state,
+                'required': entry.required,
+                'load_ms': round(entry.load_seconds * 1000, 2) if entry.load_seconds is not None else None,
+                'error': entry.error
+            }
+            for name, entry in self._entries.items()
+        }
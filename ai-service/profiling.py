@@ -0,0 +1,228 @@
+"""
+Opt-in request profiling for the AtmosAI AI Service.
+
+A request is profiled with cProfile when it carries `X-Profile: true`
+together with a valid API key, or when it is picked by the sampling rate.
+Profiles are written as pstats files (readable with `python -m pstats` or
+snakeviz) to the logs directory, and only the newest `keep` files are kept.
+
+cProfile only sees the thread it was enabled in, so analysis a profiled
+request hands to the executor's threads or processes would be missing.
+While a request is profiled, AnalysisExecutor runs each task it offloads
+under its own profiler (`profiled_call`) and the task's stats are merged
+into the request's profile.
+
+When neither trigger is enabled the middleware is not installed at all;
+when it is installed, an unprofiled request costs one header scan.
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b'x-profile'
+PROFILE_SUFFIX = '.prof'
+
+# pstats sort keys accepted by /profiles/{name}
+PROFILE_SORT_KEYS = ('cumulative', 'tottime', 'calls', 'ncalls', 'name', 'filename')
+
+# <timestamp>_<endpoint>_<status>_<milliseconds>ms_<trigger>.prof
+PROFILE_NAME = re.compile(r'^(\d{8}T\d{12})_([a-z0-9-]+)_(\d{3})_(\d+)ms_(header|sampled)\.prof$')
+
+
+# Stats of the offloaded tasks of the request being profiled; None outside a profiled request
+_task_stats: ContextVar[Optional[List[dict]]] = ContextVar('profiling_task_stats', default=None)
+
+
+def task_stats() -> Optional[List[dict]]:
+    """Where offloaded tasks of the current request add their stats, or None if it is not profiled"""
+    return _task_stats.get()
+
+
+def profiled_call(fn: Callable[..., Any], *args: Any) -> Tuple[Any, dict]:
+    """`fn(*args)` under cProfile in the calling thread or process; returns the result and the raw stats.
+
+    Module-level and returning plain data, so it also works as a process pool task.
+    """
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        result = fn(*args)
+    finally:
+        profile.disable()
+    profile.create_stats()
+    return result, profile.stats
+
+
+class _RawStats:
+    """Raw stats dict in the shape pstats.Stats.add() accepts"""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+def _slug(path: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', path.lower()).strip('-') or 'root'
+
+
+class RequestProfiler:
+    """Decides which requests to profile and manages the profile files"""
+
+    def __init__(self, directory: str, sample_rate: float = 0.0, header_enabled: bool = True, keep: int = 50):
+        self.directory = directory
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.header_enabled = header_enabled
+        self.keep = keep
+        self.active = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.header_enabled or self.sample_rate > 0
+
+    def trigger(self, scope: Scope) -> Optional[str]:
+        """'header', 'sampled' or None for this request"""
+        if self.header_enabled:
+            profile_requested = False
+            authorization = b''
+            for name, value in scope['headers']:
+                if name == PROFILE_HEADER:
+                    profile_requested = value.lower() in (b'1', b'true', b'yes')
+                elif name == b'authorization':
+                    authorization = value
+            if profile_requested:
+                expected = os.getenv("AI_SERVICE_API_KEY", "default-key")
+                if authorization == f"Bearer {expected}".encode():
+                    return 'header'
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return 'sampled'
+        return None
+
+    def save(self, profile: cProfile.Profile, path: str, status: int, seconds: float, trigger: str,
+             task_stats: Optional[List[dict]] = None) -> str:
+        """Write the request's profile, merged with the stats of its offloaded tasks"""
+        os.makedirs(self.directory, exist_ok=True)
+        name = (
+            f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}_{_slug(path)}_{status}_"
+            f"{round(seconds * 1000)}ms_{trigger}{PROFILE_SUFFIX}"
+        )
+        stats = pstats.Stats(profile)
+        for raw in task_stats or ():
+            stats.add(_RawStats(raw))
+        stats.dump_stats(os.path.join(self.directory, name))
+        self._prune()
+        return name
+
+    def _prune(self) -> None:
+        names = sorted(name for name in os.listdir(self.directory) if PROFILE_NAME.match(name))
+        for name in names[:max(0, len(names) - self.keep)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def list_profiles(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            match = PROFILE_NAME.match(name)
+            if not match:
+                continue
+            stamp, endpoint, status, milliseconds, trigger = match.groups()
+            profiles.append({
+                'name': name,
+                'created_at': datetime.strptime(stamp, '%Y%m%dT%H%M%S%f').isoformat(),
+                'endpoint': endpoint,
+                'status': int(status),
+                'duration_ms': int(milliseconds),
+                'trigger': trigger,
+                'size_bytes': os.path.getsize(os.path.join(self.directory, name))
+            })
+            if len(profiles) >= limit:
+                break
+        return profiles
+
+    def summary(self, name: str, sort: str = 'cumulative', limit: int = 40) -> Optional[str]:
+        """pstats text report for one profile, or None if `name` is not a profile"""
+        if not PROFILE_NAME.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        if not os.path.isfile(path):
+            return None
+        output = io.StringIO()
+        stats = pstats.Stats(path, stream=output)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that runs selected POST requests under cProfile.
+
+    The profiler records everything the event loop thread runs while the
+    request is in flight. Whenever the request awaits, the loop runs other
+    requests' coroutines, and those calls land in the same profile: under
+    concurrent load a profile is not limited to its own request. Trigger
+    profiles on an otherwise idle worker when that matters. Tasks the
+    request offloads to the analysis executor are profiled where they run
+    and merged in; other requests' offloaded tasks are not.
+
+    Only one request is profiled at a time, since cProfile allows a single
+    active profiler per thread. A concurrent request that would have been
+    profiled is served unprofiled.
+    """
+
+    def __init__(self, app: ASGIApp, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['method'] != 'POST' or self.profiler.active:
+            await self.app(scope, receive, send)
+            return
+        trigger = self.profiler.trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        profile = cProfile.Profile()
+        offloaded: List[dict] = []
+        token = _task_stats.set(offloaded)
+        self.profiler.active = True
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            profile.disable()
+            seconds = time.perf_counter() - started
+            self.profiler.active = False
+            _task_stats.reset(token)
+            try:
+                name = self.profiler.save(profile, scope['path'], status, seconds, trigger, offloaded)
+                logger.info(f"Profiled {scope['path']} ({trigger}, {seconds * 1000:.1f} ms): {name}")
+            except OSError as e:
+                logger.error(f"Could not write profile for {scope['path']}: {str(e)}")
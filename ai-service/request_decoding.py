@@ -0,0 +1,83 @@
+"""
+Field-selective request decoding for the AtmosAI AI Service.
+
+FastAPI normally parses the whole body with the stdlib json module and then
+walks every field of the declared model, copying 48-hour hourly arrays that
+most endpoints never read. `decoded_body` instead validates the raw bytes
+with pydantic-core against a lean model that declares only the fields an
+endpoint uses; everything else is skipped during validation and never turned
+into Python objects. The validated model does not keep the raw body, so a
+large request's bytes are freed once validation is done.
+"""
+
+import json
+from typing import Any, Callable, Type
+
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+from metrics import metrics
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _loads(raw: bytes) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson also rejects integers past 64 bits, which the stdlib parser (and FastAPI) accept;
+            # genuinely invalid JSON fails again below with the stdlib's error position
+            pass
+    return json.loads(raw)
+
+
+class LeanBodyModel(BaseModel):
+    """Base of the lean request views: declares only the fields an endpoint reads"""
+
+
+def decoded_body(full_model: Type[BaseModel], lean_model: Type[BaseModel], lean: bool, parse_first: bool = False) -> Callable:
+    """Dependency that validates the raw request body against one of two models.
+
+    With `lean` set, `lean_model` is used and only the fields it declares are
+    validated; otherwise `full_model` gives the complete original contract.
+    `parse_first` parses the body with orjson and validates the resulting
+    objects instead, which is several times faster for models that keep
+    large parts of the body as plain dicts (nothing is skipped there anyway).
+    Validation errors are reported exactly like FastAPI's own body errors.
+    """
+    model = lean_model if lean else full_model
+
+    async def dependency(request: Request) -> BaseModel:
+        raw = await request.body()
+        with metrics.stage('validation'):
+            try:
+                if parse_first:
+                    try:
+                        data = _loads(raw)
+                    except ValueError as e:
+                        raise RequestValidationError(
+                            [{
+                                'type': 'json_invalid',
+                                'loc': ('body', getattr(e, 'pos', 0)),
+                                'msg': 'JSON decode error',
+                                'input': {},
+                                'ctx': {'error': getattr(e, 'msg', str(e))}
+                            }],
+                            body=raw
+                        )
+                    payload = model.model_validate(data)
+                else:
+                    payload = model.model_validate_json(raw)
+            except ValidationError as e:
+                raise RequestValidationError(
+                    [{**error, 'loc': ('body', *error['loc'])} for error in e.errors(include_url=False)],
+                    body=raw
+                )
+        return payload
+
+    return dependency
@@ -0,0 +1,57 @@
+"""
+JSON response serialization for the AtmosAI AI Service.
+
+Endpoints return FastJSONResponse directly so FastAPI skips its generic
+jsonable_encoder pass; the body is encoded straight to bytes with orjson,
+which handles datetimes natively. The stdlib json module is used when
+orjson is not installed.
+"""
+
+import json
+from collections.abc import Mapping
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from metrics import metrics
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    # Decision-table entries are read-only mappings; everything else orjson knows
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize `content` to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with `dumps` instead of the stdlib encoder"""
+
+    def render(self, content: Any) -> bytes:
+        with metrics.stage('serialization'):
+            return dumps(content)
@@ -0,0 +1,176 @@
+"""
+Learned risk scoring for the AtmosAI AI Service.
+
+`RiskModel` predicts the overall risk level (low / moderate / high) of a
+set of readings together with the probability of each level, so responses
+can report a real confidence instead of a fixed one. It is an additive
+logistic model over binned readings: each reading falls into one of its
+learned bins, every bin carries a weight per level, and the level scores
+are the intercept plus the five bins' weights, turned into probabilities
+with a softmax.
+
+Models are trained offline with scikit-learn (KBinsDiscretizer followed by
+LogisticRegression, see train_risk_model.py) and exported to a `.npz` of
+plain arrays, so serving never imports scikit-learn. A single reading is
+scored with five `bisect` calls and a few additions in plain Python, which
+costs less than one small NumPy operation; batches are scored with
+`np.searchsorted` over whole columns.
+"""
+
+import math
+from bisect import bisect_right
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from vector_analyzer import FACTORS, RISK_LEVELS
+
+FORMAT_VERSION = 1
+
+# Below this many rows the plain Python path is faster than the NumPy one
+VECTORIZE_MIN_ROWS = 8
+
+
+class RiskModel:
+    """Exported binned logistic risk model.
+
+    `edges[f]` are the inner bin edges of reading `f` (in FACTORS order), so
+    a value falls into bin `bisect_right(edges[f], value)`. `weights[f]` has
+    one row per bin and one column per output; `intercept` has one entry per
+    output. As in scikit-learn's LogisticRegression, a model with two
+    classes has a single output, the log-odds of `classes[1]`.
+    """
+
+    def __init__(
+        self,
+        edges: Sequence[Sequence[float]],
+        weights: Sequence[np.ndarray],
+        intercept: Sequence[float],
+        classes: Sequence[str],
+        name: str = 'risk-model'
+    ):
+        unknown = set(classes) - set(RISK_LEVELS)
+        if unknown:
+            raise ValueError(f"Unknown risk classes {sorted(unknown)}, expected a subset of {RISK_LEVELS}")
+        if len(set(classes)) != len(classes) or len(classes) < 2:
+            raise ValueError(f"Expected at least two distinct classes, got {list(classes)}")
+        if len(edges) != len(FACTORS) or len(weights) != len(FACTORS):
+            raise ValueError(f"Expected bins and weights for the {len(FACTORS)} readings {FACTORS}")
+
+        self.edges = [np.asarray(factor_edges, dtype=np.float64) for factor_edges in edges]
+        self.weights = [np.asarray(factor_weights, dtype=np.float64) for factor_weights in weights]
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.classes = tuple(classes)
+        self.name = name
+
+        outputs = 1 if len(self.classes) == 2 else len(self.classes)
+        if self.intercept.shape != (outputs,):
+            raise ValueError(f"Expected {outputs} intercepts for classes {self.classes}")
+        for factor, factor_edges, factor_weights in zip(FACTORS, self.edges, self.weights):
+            if factor_weights.shape != (len(factor_edges) + 1, outputs):
+                raise ValueError(f"Weights of '{factor}' do not match its {len(factor_edges) + 1} bins")
+            if np.any(np.diff(factor_edges) < 0):
+                raise ValueError(f"Bin edges of '{factor}' are not sorted")
+
+        self._compile()
+
+    def _compile(self) -> None:
+        """Rewrite the outputs as one score per RISK_LEVELS entry.
+
+        A two-class model's log-odds z becomes the scores (0, z), and a
+        level the model never saw gets -inf, so scoring is the same softmax
+        over three columns whatever the model was trained on.
+        """
+        columns = [RISK_LEVELS.index(label) for label in self.classes]
+
+        def per_level(values: np.ndarray, missing: float) -> np.ndarray:
+            if len(self.classes) == 2:
+                values = np.concatenate((np.zeros(values.shape[:-1] + (1,)), values), axis=-1)
+            expanded = np.full(values.shape[:-1] + (len(RISK_LEVELS),), missing)
+            expanded[..., columns] = values
+            return expanded
+
+        self._intercept = per_level(self.intercept, -np.inf)
+        self._tables = [per_level(factor_weights, 0.0) for factor_weights in self.weights]
+        # Plain Python copies for scoring single readings
+        self._edge_lists = [factor_edges.tolist() for factor_edges in self.edges]
+        self._table_rows = [[tuple(row) for row in table.tolist()] for table in self._tables]
+        self._intercept_row = tuple(self._intercept.tolist())
+
+    def scores(self, rows: Sequence[Sequence[float]]) -> np.ndarray:
+        """(n, 3) level scores in RISK_LEVELS order, before the softmax"""
+        readings = np.array(rows, dtype=np.float64).reshape(-1, len(FACTORS))
+        scores = np.repeat(self._intercept[None, :], readings.shape[0], axis=0)
+        for column, (factor_edges, table) in enumerate(zip(self.edges, self._tables)):
+            scores += table[np.searchsorted(factor_edges, readings[:, column], side='right')]
+        return scores
+
+    def predict_proba(self, rows: Sequence[Sequence[float]]) -> np.ndarray:
+        """(n, 3) probabilities of each level in RISK_LEVELS order, one row per reading tuple"""
+        scores = self.scores(rows)
+        scores -= scores.max(axis=1, keepdims=True)
+        probabilities = np.exp(scores)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        return probabilities
+
+    def predict_one(self, readings: Sequence[float]) -> Tuple[int, float]:
+        """Most likely level code and its probability for one reading tuple, without NumPy"""
+        low, moderate, high = self._intercept_row
+        for value, factor_edges, rows in zip(readings, self._edge_lists, self._table_rows):
+            row = rows[bisect_right(factor_edges, value)]
+            low += row[0]
+            moderate += row[1]
+            high += row[2]
+        top = max(low, moderate, high)
+        level = 0 if low == top else 1 if moderate == top else 2
+        return level, 1 / (math.exp(low - top) + math.exp(moderate - top) + math.exp(high - top))
+
+    def predict(self, rows: Sequence[Sequence[float]]) -> Tuple[List[int], List[float]]:
+        """Most likely level code per row and its probability, as lists"""
+        if len(rows) < VECTORIZE_MIN_ROWS:
+            predictions = [self.predict_one(row) for row in rows]
+            return [level for level, _ in predictions], [confidence for _, confidence in predictions]
+        scores = self.scores(rows)
+        levels = scores.argmax(axis=1)
+        scores -= scores[np.arange(len(levels)), levels][:, None]
+        # The most likely level's shifted score is 0, so its probability is 1 / sum(exp(scores))
+        return levels.tolist(), (1 / np.exp(scores).sum(axis=1)).tolist()
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """The exported form, as stored by `save`"""
+        arrays = {
+            'format_version': np.array(FORMAT_VERSION),
+            'name': np.array(self.name),
+            'features': np.array(FACTORS),
+            'classes': np.array(self.classes),
+            'intercept': self.intercept
+        }
+        for factor, factor_edges, factor_weights in zip(FACTORS, self.edges, self.weights):
+            arrays[f'edges_{factor}'] = factor_edges
+            arrays[f'weights_{factor}'] = factor_weights
+        return arrays
+
+    def save(self, path: str) -> None:
+        np.savez(path, **self.arrays())
+
+    @classmethod
+    def load(cls, path: str) -> 'RiskModel':
+        """Load a model written by `save`; plain arrays only, nothing is unpickled"""
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data['format_version'])
+            if version != FORMAT_VERSION:
+                raise ValueError(f"Risk model format {version} is not supported (expected {FORMAT_VERSION})")
+            features = tuple(data['features'].tolist())
+            if features != FACTORS:
+                raise ValueError(f"Risk model features {features} do not match {FACTORS}")
+            return cls(
+                edges=[data[f'edges_{factor}'] for factor in FACTORS],
+                weights=[data[f'weights_{factor}'] for factor in FACTORS],
+                intercept=data['intercept'],
+                classes=data['classes'].tolist(),
+                name=str(data['name'])
+            )
+
+    def __repr__(self) -> str:
+        bins = [len(factor_edges) + 1 for factor_edges in self.edges]
+        return f"RiskModel(name={self.name!r}, bins={bins}, classes={self.classes})"
@@ -0,0 +1,74 @@
+"""
+Hourly risk timeline for the AtmosAI AI Service.
+
+Classifies every entry of WeatherData.hourly in one vectorized pass and
+merges consecutive elevated-risk hours into time ranges, replacing one
+/analyze-weather call per hour slot. The comfort indices of every hour are
+computed over the same readings arrays.
+"""
+
+from typing import Any, Dict, List
+
+import numpy as np
+
+from comfort_indices import comfort_many, rounded_lists
+from decision_table import encode_many
+from vector_analyzer import DEFAULT_READINGS, MODERATE, RISK_LEVELS, is_numeric_reading
+
+
+def elevated_runs(mask: np.ndarray) -> List[tuple]:
+    """(start, end) index pairs, end inclusive, for each run of True in `mask`"""
+    padded = np.concatenate(([0], mask.astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    return [(int(start), int(stop) - 1) for start, stop in zip(edges[::2], edges[1::2])]
+
+
+def hourly_readings(hourly: List[Dict[str, Any]]) -> np.ndarray:
+    """(n, 5) float array of readings; missing or non-numeric values use the defaults"""
+    keys = ('temperature', 'humidity', 'uvIndex', None, 'windSpeed')
+    rows = []
+    for entry in hourly:
+        row = []
+        for key, default in zip(keys, DEFAULT_READINGS):
+            if key is None:
+                air_quality = entry.get('airQuality')
+                value = air_quality.get('aqi') if isinstance(air_quality, dict) else None
+            else:
+                value = entry.get(key)
+            row.append(value if is_numeric_reading(value) else default)
+        rows.append(row)
+    return np.array(rows, dtype=np.float64).reshape(-1, len(keys))
+
+
+def build_risk_timeline(hourly: List[Dict[str, Any]], vector_analyzer, decision_table) -> Dict[str, Any]:
+    """Per-hour risk codes and comfort indices, plus merged ranges of moderate-or-higher risk"""
+    readings = hourly_readings(hourly)
+    classified = vector_analyzer.classify(*readings.T)
+    overall_risk = classified['overall_risk']
+    condition_codes = encode_many(classified['conditions'])
+
+    periods = []
+    for start, end in elevated_runs(overall_risk >= MODERATE):
+        run_codes = condition_codes[start:end + 1].tolist()
+        factors = []
+        for code in dict.fromkeys(run_codes):
+            for factor in decision_table.lookup(code)['analysis']['overall_risk']['factors']:
+                if factor not in factors:
+                    factors.append(factor)
+        periods.append({
+            'start_index': start,
+            'end_index': end,
+            'start_time': hourly[start].get('time'),
+            'end_time': hourly[end].get('time'),
+            'hours': end - start + 1,
+            'peak_level': RISK_LEVELS[int(overall_risk[start:end + 1].max())],
+            'factors': factors
+        })
+
+    return {
+        'risk_levels': list(RISK_LEVELS),
+        'risk_codes': overall_risk.tolist(),
+        'condition_codes': condition_codes.tolist(),
+        'elevated_periods': periods,
+        'comfort': rounded_lists(comfort_many(readings[:, 0], readings[:, 1], readings[:, 4]))
+    }
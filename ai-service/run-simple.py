@@ -2,10 +2,15 @@
 """
 AtmosAI AI Service Runner (Simplified Version)
 This script starts the FastAPI AI service with minimal dependencies
+
+Development (default): one process with auto-reload.
+Production: `python run-simple.py --production` or AI_ENV=production runs
+multiple preloaded workers through gunicorn (see serving.py).
 """
 
 import uvicorn
 import os
+import sys
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -17,15 +22,22 @@ if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     log_level = os.getenv("LOG_LEVEL", "info")
     
-    print(f"Starting AtmosAI AI Service (Simple Version) on {host}:{port}")
-    print(f"Log level: {log_level}")
-    
-    # Start the server
-    uvicorn.run(
-        "main-simple:app",
-        host=host,
-        port=port,
-        reload=True,
-        log_level=log_level,
-        access_log=True
-    )
+    if "--production" in sys.argv or os.getenv("AI_ENV") == "production":
+        print(f"Starting AtmosAI AI Service (Simple Version) in production mode on {host}:{port}")
+        # Only production loads the serving stack; development installs may lack gunicorn
+        from serving import run_production
+
+        run_production("main-simple:app")
+    else:
+        print(f"Starting AtmosAI AI Service (Simple Version) on {host}:{port}")
+        print(f"Log level: {log_level}")
+        
+        # Start the server
+        uvicorn.run(
+            "main-simple:app",
+            host=host,
+            port=port,
+            reload=True,
+            log_level=log_level,
+            access_log=True
+        )
@@ -0,0 +1,104 @@
+"""
+Production serving support for the AtmosAI AI Service.
+
+`gunicorn -c gunicorn.conf.py main:app` runs the app in several
+UvicornWorker processes. The app is imported and its models are loaded once
+in the master before the workers fork. Workers use uvloop and httptools when
+they are installed, are recycled after a number of requests, and finish
+in-flight requests on SIGTERM before exiting.
+
+Gunicorn does not run on Windows; `run_production` falls back to uvicorn's
+own multi-process mode there, and this module imports without it.
+"""
+
+import gc
+import importlib
+import importlib.util
+import logging
+import os
+import sys
+
+try:
+    # uvicorn.workers imports gunicorn, which is not installed on Windows or by requirements-simple.txt
+    from uvicorn.workers import UvicornWorker
+except ImportError:
+    UvicornWorker = None
+
+logger = logging.getLogger(__name__)
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+def cpu_count() -> int:
+    """CPUs this process may run on (respects container CPU sets)"""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+def default_workers() -> int:
+    """One worker per CPU: request handling is CPU-bound, not I/O-bound"""
+    return int(os.getenv("AI_WORKERS", os.getenv("WEB_CONCURRENCY", cpu_count())))
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def event_loop() -> str:
+    """AI_LOOP (auto, uvloop or asyncio); auto picks uvloop when installed"""
+    loop = os.getenv("AI_LOOP", "auto")
+    if loop == "auto":
+        return "uvloop" if _installed("uvloop") and sys.platform != "win32" else "asyncio"
+    return loop
+
+
+def http_parser() -> str:
+    """AI_HTTP (auto, httptools or h11); auto picks httptools when installed"""
+    http = os.getenv("AI_HTTP", "auto")
+    if http == "auto":
+        return "httptools" if _installed("httptools") else "h11"
+    return http
+
+
+if UvicornWorker is not None:
+    class AtmosUvicornWorker(UvicornWorker):
+        """UvicornWorker with the event loop and HTTP parser chosen by AI_LOOP / AI_HTTP"""
+
+        CONFIG_KWARGS = {"loop": event_loop(), "http": http_parser(), "lifespan": "on"}
+
+
+def warm_app(app_uri: str) -> None:
+    """Load the registered models of an already imported app module"""
+    module = sys.modules.get(app_uri.split(":")[0])
+    registry = getattr(module, "model_registry", None)
+    if registry is not None:
+        registry.load_all()
+        logger.info(f"Warmed models before fork: {', '.join(registry.status()) or 'none'}")
+    # Keep the collector from touching (and so copying) the pages workers share with the master
+    gc.freeze()
+
+
+def run_production(app_uri: str) -> None:
+    """Serve `app_uri` with multiple workers; does not return on success"""
+    config = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gunicorn.conf.py")
+    if sys.platform != "win32" and _installed("gunicorn"):
+        os.execvp(sys.executable, [sys.executable, "-m", "gunicorn", "-c", config, app_uri])
+
+    import uvicorn
+
+    logger.warning("gunicorn is not available; using uvicorn workers without preload")
+    uvicorn.run(
+        app_uri,
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", 8000)),
+        workers=default_workers(),
+        loop=event_loop(),
+        http=http_parser(),
+        log_level=os.getenv("LOG_LEVEL", "info"),
+        access_log=_env_flag("AI_ACCESS_LOG", "false"),
+        limit_max_requests=int(os.getenv("AI_MAX_REQUESTS", 10000)) or None,
+        timeout_graceful_shutdown=int(os.getenv("AI_GRACEFUL_TIMEOUT", 30))
+    )
@@ -0,0 +1,415 @@
+"""
+Spatial index of alert subscriptions for the AtmosAI AI Service.
+
+When an alert is raised for one location, every subscribed location within
+some radius must receive it. `SubscriptionIndex` answers those radius
+queries without scanning every subscription:
+
+- Points are stored as unit vectors on the sphere. The straight-line (chord)
+  distance between two unit vectors grows with their great-circle distance,
+  so a radius in km becomes a chord length and a 3-d KD-tree answers
+  haversine radius queries exactly, poles and the antimeridian included.
+- The tree is built in bulk with NumPy (median splits by `argpartition`) and
+  never modified. Inserted points go to a small buffer that queries scan
+  with one vectorized distance test; deleted points are masked out.
+- Once the buffer and the deletions outgrow `rebuild_fraction` of the tree,
+  a background thread builds a new tree. Changes made while it builds are
+  replayed onto it before it replaces the old one, so queries and updates
+  never wait for a build.
+
+State lives in the worker process, like the alert state store.
+"""
+
+import math
+import threading
+import time
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+LEAF_SIZE = 64
+
+
+def unit_vectors(lats: Sequence[float], lngs: Sequence[float]) -> np.ndarray:
+    """(n, 3) points on the unit sphere for latitudes and longitudes in degrees"""
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lng = np.radians(np.asarray(lngs, dtype=np.float64))
+    if lat.shape != lng.shape or lat.ndim != 1:
+        raise ValueError("Expected two one-dimensional coordinate arrays of the same length")
+    if not (np.isfinite(lat).all() and np.isfinite(lng).all()):
+        raise ValueError("Coordinates must be finite")
+    if (np.abs(lat) > math.pi / 2).any():
+        raise ValueError("Latitudes must be between -90 and 90")
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)))
+
+
+def chord_length(radius_km: float) -> float:
+    """Straight-line distance between unit vectors `radius_km` apart on the surface"""
+    return 2 * math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def surface_km(chords: np.ndarray) -> np.ndarray:
+    """Great-circle distances of chord lengths"""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chords / 2, 1.0))
+
+
+class _KDTree:
+    """Immutable KD-tree over unit vectors, leaves of at most `leaf_size` points.
+
+    Points are reordered so every node covers a contiguous range of slots;
+    `nodes[i]` is (start, end, low corner, high corner, left, right), with
+    children -1 for leaves.
+    """
+
+    def __init__(self, ids: Sequence[Hashable], points: np.ndarray, leaf_size: int = LEAF_SIZE):
+        self.leaf_size = max(1, leaf_size)
+        self.nodes: List[Tuple[int, int, tuple, tuple, int, int]] = []
+        order = np.arange(len(ids))
+        # One contiguous row per axis, reordered in place as the tree splits, so every node is a slice
+        columns = np.ascontiguousarray(points.T)
+        if len(ids):
+            self._build(columns, order, 0, len(ids))
+        self.points = np.ascontiguousarray(columns.T)
+        self.ids = np.array(ids, dtype=object)[order]
+        self.slots: Dict[Hashable, int] = dict(zip(self.ids.tolist(), range(len(ids))))
+        self.alive = np.ones(len(ids), dtype=bool)
+
+    def _build(self, columns: np.ndarray, order: np.ndarray, start: int, end: int) -> int:
+        section = columns[:, start:end]
+        low, high = section.min(axis=1), section.max(axis=1)
+        node = len(self.nodes)
+        self.nodes.append(None)
+        left = right = -1
+        if end - start > self.leaf_size:
+            axis = int(np.argmax(high - low))
+            middle = (start + end) // 2
+            split = np.argpartition(section[axis], middle - start)
+            columns[:, start:end] = section[:, split]
+            order[start:end] = order[start:end][split]
+            left = self._build(columns, order, start, middle)
+            right = self._build(columns, order, middle, end)
+        self.nodes[node] = (start, end, tuple(low.tolist()), tuple(high.tolist()), left, right)
+        return node
+
+    def ranges(self, query: Tuple[float, float, float], chord: float) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+        """Slot ranges entirely within `chord` of `query`, and leaf ranges that may be"""
+        inside: List[Tuple[int, int]] = []
+        candidates: List[Tuple[int, int]] = []
+        if not self.nodes:
+            return inside, candidates
+        limit = chord * chord
+        qx, qy, qz = query
+        stack = [0]
+        while stack:
+            start, end, low, high, left, right = self.nodes[stack.pop()]
+            dx = low[0] - qx if qx < low[0] else qx - high[0] if qx > high[0] else 0.0
+            dy = low[1] - qy if qy < low[1] else qy - high[1] if qy > high[1] else 0.0
+            dz = low[2] - qz if qz < low[2] else qz - high[2] if qz > high[2] else 0.0
+            if dx * dx + dy * dy + dz * dz > limit:
+                continue
+            fx = max(qx - low[0], high[0] - qx)
+            fy = max(qy - low[1], high[1] - qy)
+            fz = max(qz - low[2], high[2] - qz)
+            if fx * fx + fy * fy + fz * fz <= limit:
+                inside.append((start, end))
+            elif left < 0:
+                candidates.append((start, end))
+            else:
+                stack.append(right)
+                stack.append(left)
+        return inside, candidates
+
+
+class _Buffer:
+    """Points inserted since the last build, scanned by brute force"""
+
+    def __init__(self):
+        self.ids: List[Hashable] = []
+        self.points = np.empty((64, 3))
+        self.positions: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, member: Hashable, point: np.ndarray) -> None:
+        if len(self.ids) == len(self.points):
+            self.points = np.concatenate((self.points, np.empty_like(self.points)))
+        self.positions[member] = len(self.ids)
+        self.points[len(self.ids)] = point
+        self.ids.append(member)
+
+    def remove(self, member: Hashable) -> bool:
+        position = self.positions.pop(member, None)
+        if position is None:
+            return False
+        # Move the last point into the freed position
+        last = len(self.ids) - 1
+        if position != last:
+            moved = self.ids[last]
+            self.ids[position] = moved
+            self.points[position] = self.points[last]
+            self.positions[moved] = position
+        self.ids.pop()
+        return True
+
+
+class SubscriptionIndex:
+    """Thread-safe radius search over subscribed locations, keyed by subscription id"""
+
+    def __init__(self, leaf_size: int = LEAF_SIZE, rebuild_fraction: float = 0.05, min_rebuild: int = 1024,
+                 background: bool = True):
+        self.leaf_size = leaf_size
+        self.rebuild_fraction = max(0.0, rebuild_fraction)
+        self.min_rebuild = max(1, min_rebuild)
+        self.background = background
+        self._tree = _KDTree([], np.empty((0, 3)), leaf_size)
+        self._buffer = _Buffer()
+        self._deleted = 0
+        # Changes made while a new tree is being built, replayed onto it
+        self._changes: Optional[List[Tuple[str, Hashable, Any]]] = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._rebuilding = False
+        self.rebuilds = 0
+        self.last_build_seconds = 0.0
+        self.queries = 0
+
+    # Updates
+
+    def load(self, ids: Sequence[Hashable], lats: Sequence[float], lngs: Sequence[float], replace: bool = True) -> int:
+        """Bulk load: build a tree with these subscriptions (and the current ones unless `replace`).
+
+        A repeated id keeps its last coordinates. Returns the number of
+        subscriptions indexed afterwards.
+        """
+        points = unit_vectors(lats, lngs)
+        if len(ids) != len(points):
+            raise ValueError("Expected one coordinate pair per id")
+        self._load(ids, points, replace)
+        return len(self)
+
+    def _load(self, ids: Sequence[Hashable], points: np.ndarray, replace: bool) -> None:
+        with self._build_lock:
+            with self._lock:
+                if replace:
+                    current_ids, current_points = [], np.empty((0, 3))
+                else:
+                    current_ids, current_points = self._snapshot()
+                self._changes = []
+            self._swap(list(current_ids) + list(ids), np.concatenate((current_points, points)))
+
+    def add(self, member: Hashable, lat: float, lng: float) -> None:
+        """Insert a subscription, or move it if the id is already indexed"""
+        if not (math.isfinite(lat) and math.isfinite(lng)):
+            raise ValueError("Coordinates must be finite")
+        if abs(lat) > 90:
+            raise ValueError("Latitudes must be between -90 and 90")
+        # Plain math: NumPy's per-call overhead dominates for a single point
+        lat, lng = math.radians(lat), math.radians(lng)
+        point = (math.cos(lat) * math.cos(lng), math.cos(lat) * math.sin(lng), math.sin(lat))
+        with self._lock:
+            self._record('add', member, point)
+            self._remove(member)
+            self._buffer.add(member, point)
+        self._maybe_rebuild()
+
+    def add_many(self, ids: Sequence[Hashable], lats: Sequence[float], lngs: Sequence[float]) -> None:
+        """Insert or move subscriptions; a batch that would trigger a rebuild anyway is bulk loaded"""
+        points = unit_vectors(lats, lngs)
+        if len(ids) != len(points):
+            raise ValueError("Expected one coordinate pair per id")
+        with self._lock:
+            bulk = len(ids) >= max(self.min_rebuild, self.rebuild_fraction * len(self._tree.ids))
+        if bulk:
+            self._load(ids, points, replace=False)
+            return
+        with self._lock:
+            for member, point in zip(ids, points):
+                self._record('add', member, point)
+                self._remove(member)
+                self._buffer.add(member, point)
+        self._maybe_rebuild()
+
+    def remove(self, member: Hashable) -> bool:
+        return self.remove_many([member]) == 1
+
+    def remove_many(self, ids: Iterable[Hashable]) -> int:
+        """Delete subscriptions; returns how many were indexed"""
+        removed = 0
+        with self._lock:
+            for member in ids:
+                self._record('remove', member, None)
+                removed += self._remove(member)
+        self._maybe_rebuild()
+        return removed
+
+    def _record(self, kind: str, member: Hashable, point: Optional[np.ndarray]) -> None:
+        if self._changes is not None:
+            self._changes.append((kind, member, point))
+
+    def _remove(self, member: Hashable) -> bool:
+        slot = self._tree.slots.get(member)
+        if slot is not None and self._tree.alive[slot]:
+            self._tree.alive[slot] = False
+            self._deleted += 1
+            return True
+        return self._buffer.remove(member)
+
+    # Rebuilds
+
+    def _snapshot(self) -> Tuple[List[Hashable], np.ndarray]:
+        """Ids and points of every live subscription; call with the lock held"""
+        alive = self._tree.alive
+        buffered = len(self._buffer)
+        return (
+            self._tree.ids[alive].tolist() + self._buffer.ids,
+            np.concatenate((self._tree.points[alive], self._buffer.points[:buffered]))
+        )
+
+    def _swap(self, ids: List[Hashable], points: np.ndarray) -> None:
+        """Build a tree outside the lock, then install it and replay the changes since the snapshot"""
+        started = time.perf_counter()
+        last = dict(zip(ids, range(len(ids))))
+        if len(last) != len(ids):
+            # Last occurrence wins
+            keep = np.fromiter(sorted(last.values()), dtype=np.int64, count=len(last))
+            ids = [ids[position] for position in keep.tolist()]
+            points = points[keep]
+        tree = _KDTree(ids, points, self.leaf_size)
+        with self._lock:
+            changes, self._changes = self._changes or [], None
+            self._tree = tree
+            self._buffer = _Buffer()
+            self._deleted = 0
+            for kind, member, point in changes:
+                self._remove(member)
+                if kind == 'add':
+                    self._buffer.add(member, point)
+            self.rebuilds += 1
+            self.last_build_seconds = time.perf_counter() - started
+
+    def rebuild(self) -> None:
+        """Fold the buffer and deletions into a new tree"""
+        with self._build_lock:
+            with self._lock:
+                ids, points = self._snapshot()
+                self._changes = []
+            self._swap(ids, points)
+
+    def _needs_rebuild(self) -> bool:
+        pending = len(self._buffer) + self._deleted
+        return pending >= max(self.min_rebuild, self.rebuild_fraction * len(self._tree.ids))
+
+    def _maybe_rebuild(self) -> None:
+        with self._lock:
+            if self._rebuilding or not self._needs_rebuild():
+                return
+            self._rebuilding = True
+        if self.background:
+            threading.Thread(target=self._background_rebuild, name='subscription-index-rebuild', daemon=True).start()
+        else:
+            self._background_rebuild()
+
+    def _background_rebuild(self) -> None:
+        try:
+            self.rebuild()
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    # Queries
+
+    def query_radius(self, lat: float, lng: float, radius_km: float, limit: Optional[int] = None,
+                     with_distances: bool = False) -> Tuple[List[Hashable], Optional[List[float]]]:
+        """Ids of subscriptions within `radius_km` of (lat, lng), nearest first when `limit` is set.
+
+        Distances in km are returned too when `with_distances` is set or a
+        limit applies; otherwise the second element is None and the ids come
+        in index order.
+        """
+        if radius_km < 0:
+            raise ValueError("radius_km must not be negative")
+        query = unit_vectors([lat], [lng])[0]
+        chord = chord_length(radius_km)
+        measure = with_distances or limit is not None
+        with self._lock:
+            self.queries += 1
+            tree = self._tree
+            inside, candidates = tree.ranges(tuple(query.tolist()), chord)
+            slots = _expand(inside)
+            chords = None
+            if measure:
+                chords = np.linalg.norm(tree.points[slots] - query, axis=1)
+            if candidates:
+                candidate_slots = _expand(candidates)
+                candidate_chords = np.linalg.norm(tree.points[candidate_slots] - query, axis=1)
+                within = candidate_chords <= chord
+                slots = np.concatenate((slots, candidate_slots[within]))
+                if measure:
+                    chords = np.concatenate((chords, candidate_chords[within]))
+            alive = tree.alive[slots]
+            ids = tree.ids[slots[alive]]
+            if measure:
+                chords = chords[alive]
+
+            buffered = len(self._buffer)
+            if buffered:
+                buffer_chords = np.linalg.norm(self._buffer.points[:buffered] - query, axis=1)
+                within = np.flatnonzero(buffer_chords <= chord)
+                if len(within):
+                    buffer_ids = np.empty(len(within), dtype=object)
+                    buffer_ids[:] = [self._buffer.ids[position] for position in within.tolist()]
+                    ids = np.concatenate((ids, buffer_ids))
+                    if measure:
+                        chords = np.concatenate((chords, buffer_chords[within]))
+
+        if limit is not None:
+            nearest = np.argsort(chords, kind='stable')[:max(0, limit)]
+            ids, chords = ids[nearest], chords[nearest]
+        distances = surface_km(chords).tolist() if measure else None
+        return ids.tolist(), distances
+
+    # Introspection
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tree.ids) - self._deleted + len(self._buffer)
+
+    def __contains__(self, member: Hashable) -> bool:
+        with self._lock:
+            slot = self._tree.slots.get(member)
+            return (slot is not None and bool(self._tree.alive[slot])) or member in self._buffer.positions
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'subscriptions': len(self._tree.ids) - self._deleted + len(self._buffer),
+                'tree_size': len(self._tree.ids),
+                'tree_nodes': len(self._tree.nodes),
+                'buffered': len(self._buffer),
+                'deleted': self._deleted,
+                'rebuilding': self._rebuilding,
+                'rebuilds': self.rebuilds,
+                'last_build_seconds': round(self.last_build_seconds, 4),
+                'queries': self.queries
+            }
+
+    def collect(self) -> Iterable[Tuple[str, str, str, Dict[str, Any], float]]:
+        """Index size and rebuild counters for /metrics"""
+        stats = self.stats()
+        yield 'subscription_index_size', 'gauge', 'Subscriptions in the spatial index', {}, stats['subscriptions']
+        yield 'subscription_index_pending', 'gauge', 'Buffered inserts and deletions not yet folded into the tree', {}, stats['buffered'] + stats['deleted']
+        yield 'subscription_index_rebuilds_total', 'counter', 'Spatial index tree builds', {}, stats['rebuilds']
+        yield 'subscription_index_queries_total', 'counter', 'Spatial index radius queries', {}, stats['queries']
+
+
+def _expand(ranges: List[Tuple[int, int]]) -> np.ndarray:
+    """Slots of a list of (start, end) ranges"""
+    if not ranges:
+        return np.zeros(0, dtype=np.int64)
+    if len(ranges) == 1:
+        return np.arange(*ranges[0])
+    return np.concatenate([np.arange(start, end) for start, end in ranges])
@@ -0,0 +1,11 @@
+"""Shared setup for the AI service tests: run against the modules in ai-service/"""
+
+import logging
+import os
+import sys
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVICE_DIR not in sys.path:
+    sys.path.insert(0, SERVICE_DIR)
+
+logging.disable(logging.INFO)
@@ -0,0 +1,52 @@
+"""AlertStateStore keeps and evicts only locations with active alerts"""
+
+from datetime import datetime, timedelta
+
+from alert_state import AlertStateStore
+
+NOW = datetime(2026, 7, 1, 12, 0)
+
+
+def heat_alert(now: datetime = NOW) -> dict:
+    return {
+        'category': 'heat', 'type': 'warning', 'severity': 'high', 'precautions': ['Stay hydrated'],
+        'title': 'Heat', 'startTime': now, 'endTime': now + timedelta(hours=6)
+    }
+
+
+def test_location_without_alerts_is_not_stored():
+    store = AlertStateStore(max_locations=1)
+    changes = store.update('quiet', [], NOW)
+    assert len(changes) == 0
+    assert store.evictions == 0
+    assert len(store._locations) == 0
+
+
+def test_location_without_alerts_does_not_evict_an_alerting_one():
+    store = AlertStateStore(max_locations=1)
+    store.update('hot', [heat_alert()], NOW)
+    for index in range(5):
+        store.update(f'quiet-{index}', [], NOW)
+    assert store.evictions == 0
+    assert store.active('hot')
+    # Still known, so its alert is unchanged rather than new again
+    changes = store.update('hot', [heat_alert()], NOW + timedelta(minutes=1))
+    assert changes.new == [] and changes.unchanged == 1
+
+
+def test_new_alerting_location_evicts_the_least_recently_evaluated():
+    store = AlertStateStore(max_locations=2)
+    store.update('a', [heat_alert()], NOW)
+    store.update('b', [heat_alert()], NOW)
+    store.update('a', [heat_alert()], NOW)
+    store.update('c', [heat_alert()], NOW)
+    assert store.evictions == 1
+    assert list(store._locations) == ['a', 'c']
+
+
+def test_cleared_location_is_dropped():
+    store = AlertStateStore(max_locations=2, clear_grace_seconds=0)
+    store.update('a', [heat_alert()], NOW)
+    changes = store.update('a', [], NOW + timedelta(minutes=1))
+    assert len(changes.cleared) == 1
+    assert len(store._locations) == 0
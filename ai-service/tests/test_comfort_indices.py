@@ -0,0 +1,59 @@
+"""Comfort indices stay defined or None for readings at and past the float limits"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from comfort_indices import INDICES, ComfortIndices, comfort_dicts
+
+HEADERS = {"Authorization": "Bearer default-key"}
+
+EXTREME_ROWS = [
+    (1e308, 50, 5), (-1e308, 50, 5), (1e300, 50, 5), (-1e300, 50, 50),
+    (70, 1e308, 5), (50, 50, 1e308), (90, 0, 5), (88, 75, 2), (20, 40, 25),
+    (70, 5e-324, 5), (90, -5e-324, 5), (70, 1e-300, 5),
+    (10 ** 400, 50, 5), (70, -10 ** 400, 5), (90, 50, 10 ** 400), (-10 ** 400, 50, 50)
+]
+
+
+@pytest.mark.parametrize('row', EXTREME_ROWS)
+def test_arrays_match_the_scalar_functions(row):
+    assert comfort_dicts(*([value] for value in row)) == [ComfortIndices.from_readings(*row).to_dict()]
+
+
+def test_arrays_match_the_scalar_functions_row_by_row():
+    # One huge int leaves only its own row without indices
+    rows = EXTREME_ROWS + [(88, 75, 2)]
+    expected = [ComfortIndices.from_readings(*row).to_dict() for row in rows]
+    assert comfort_dicts(*zip(*rows)) == expected
+    assert expected[-1]['heat_index'] is not None
+
+
+@pytest.mark.parametrize('row', [(10 ** 400, 50, 5), (70, -10 ** 400, 5), (70, 50, 10 ** 400), (1e308, 50, 5)])
+def test_readings_past_the_float_range_give_no_indices(row):
+    assert ComfortIndices.from_readings(*row).to_dict() == dict.fromkeys(INDICES)
+
+
+@pytest.mark.parametrize('humidity', [0, 5e-324, -5e-324, 1e-322])
+def test_dew_point_is_undefined_when_the_humidity_ratio_is_zero(humidity):
+    assert ComfortIndices.from_readings(70, humidity, 5).dew_point is None
+
+
+def weather_data(**current) -> dict:
+    reading = {
+        "temperature": 70, "humidity": 50, "windSpeed": 5, "uvIndex": 3,
+        "airQuality": {"aqi": 40}, "condition": {"main": "Clear", "description": "clear sky"}
+    }
+    reading.update(current)
+    return {"current": reading, "hourly": [], "forecast": [], "alerts": []}
+
+
+@pytest.mark.parametrize('current', [
+    {"temperature": 1e308}, {"temperature": -1e308}, {"temperature": 10 ** 400},
+    {"humidity": 10 ** 400}, {"windSpeed": 10 ** 400}, {"humidity": 5e-324}
+])
+@pytest.mark.parametrize('path', ["/analyze-weather", "/health-insights"])
+def test_extreme_readings_are_answered(path, current):
+    with TestClient(main.app) as client:
+        response = client.post(path, json={"weather_data": weather_data(**current)}, headers=HEADERS)
+    assert response.status_code == 200, response.text
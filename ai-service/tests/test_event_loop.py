@@ -0,0 +1,42 @@
+"""The event loop keeps serving while large batches are analysed off it"""
+
+import asyncio
+import json
+import os
+import sys
+from argparse import Namespace
+
+import pytest
+
+from conftest import SERVICE_DIR
+
+sys.path.insert(0, os.path.join(SERVICE_DIR, 'benchmarks'))
+
+import main
+from event_loop_responsiveness import batch_body, measure
+from executor import THREAD, AnalysisExecutor
+from payloads import PayloadGenerator
+
+MAX_LAG_MS = float(os.getenv('AI_TEST_MAX_LOOP_LAG_MS', 50))
+
+
+@pytest.fixture
+def thread_executor():
+    previous = main.analysis_executor
+    main.analysis_executor = AnalysisExecutor(mode=THREAD, initializer=main.warm_analysis_process)
+    yield main.analysis_executor
+    main.analysis_executor.shutdown()
+    main.analysis_executor = previous
+
+
+def test_loop_lag_stays_bounded_during_large_batches(thread_executor):
+    generator = PayloadGenerator(hours=0, forecast_days=0, seed=0)
+    heavy_body = batch_body(generator, 1000)
+    small_body = json.dumps(generator.request_body()).encode()
+    args = Namespace(heavy_requests=2, rounds=3, interval_ms=5.0)
+
+    result = asyncio.run(measure(main.app, heavy_body, small_body, args))
+
+    assert result['lag_p99_ms'] <= MAX_LAG_MS, result
+    # Small requests were answered while the batches were in flight, not queued behind them
+    assert result['small_requests'] > 0, result
@@ -0,0 +1,29 @@
+"""Forecast readings take only real numbers, whatever the JSON held"""
+
+import math
+
+import numpy as np
+import pytest
+
+from forecast_alerts import _number, _numbers
+
+
+@pytest.mark.parametrize('values', [
+    [1, 2.5, None],
+    ['35', 40.0],
+    [True, False, 3],
+    [10 ** 400, -10 ** 400, 7],
+    [{'max': 90}, [1], 1e308],
+    []
+])
+def test_numbers_match_number_value_by_value(values):
+    expected = [_number(value) for value in values]
+    np.testing.assert_array_equal(_numbers(values), np.array(expected, dtype=np.float64))
+
+
+def test_strings_and_bools_are_not_readings():
+    assert np.isnan(_numbers(['35', True, False])).all()
+
+
+def test_ints_past_the_float_range_stay_past_every_threshold():
+    assert _numbers([10 ** 400, -10 ** 400]).tolist() == [math.inf, -math.inf]
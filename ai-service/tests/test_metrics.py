@@ -0,0 +1,89 @@
+"""MetricsMiddleware labels requests by route template"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from metrics import Metrics, MetricsMiddleware
+
+
+def client_and_metrics():
+    app = FastAPI()
+
+    @app.get("/profiles/{name}")
+    async def profile(name: str):
+        return {"name": name}
+
+    @app.post("/analyze-weather")
+    async def analyze():
+        return {}
+
+    metrics = Metrics()
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+    return TestClient(app), metrics
+
+
+def request_counts(metrics: Metrics) -> dict:
+    return dict(metrics._requests)
+
+
+def test_templated_route_is_labelled_by_its_template():
+    client, metrics = client_and_metrics()
+    assert client.get("/profiles/a").status_code == 200
+    assert client.get("/profiles/b").status_code == 200
+    assert request_counts(metrics) == {("/profiles/{name}", "GET", 200): 2}
+    assert 'endpoint="/profiles/{name}"' in metrics.render()
+
+
+def test_plain_route_keeps_its_path():
+    client, metrics = client_and_metrics()
+    assert client.post("/analyze-weather").status_code == 200
+    assert request_counts(metrics) == {("/analyze-weather", "POST", 200): 1}
+
+
+def test_wrong_method_on_a_route_is_labelled_with_the_route():
+    client, metrics = client_and_metrics()
+    assert client.post("/profiles/a").status_code == 405
+    assert client.get("/analyze-weather").status_code == 405
+    assert request_counts(metrics) == {("/profiles/{name}", "POST", 405): 1, ("/analyze-weather", "GET", 405): 1}
+
+
+def test_unknown_paths_share_the_other_label():
+    client, metrics = client_and_metrics()
+    for path in ("/nope", "/profiles/a/b", "/profiles/"):
+        assert client.get(path).status_code == 404
+    assert request_counts(metrics) == {("other", "GET", 404): 3}
+
+
+def test_main_app_labels_profile_downloads_by_template():
+    import main
+
+    if not main.METRICS_ENABLED:
+        pytest.skip("AI_METRICS_ENABLED is off")
+    key = ("/profiles/{name}", "GET", 404)
+    before = main.metrics._requests.get(key, 0)
+    response = TestClient(main.app).get("/profiles/missing.prof", headers={"Authorization": "Bearer default-key"})
+    assert response.status_code == 404
+    assert main.metrics._requests.get(key, 0) == before + 1
+
+
+def test_main_app_times_batch_serialization_as_its_own_stage():
+    import main
+
+    if not main.METRICS_ENABLED:
+        pytest.skip("AI_METRICS_ENABLED is off")
+
+    def stage_count(stage: str) -> int:
+        histogram = main.metrics._stage_latency.get(("/analyze-weather/batch", stage))
+        return histogram.count if histogram is not None else 0
+
+    before = {stage: stage_count(stage) for stage in ("analysis", "serialization")}
+    current = {"temperature": 70, "humidity": 50, "uvIndex": 3, "airQuality": {"aqi": 40}, "windSpeed": 5}
+    response = TestClient(main.app).post(
+        "/analyze-weather/batch",
+        json={"items": [{"weather_data": {"current": current, "forecast": [], "hourly": [], "alerts": []}}] * 3},
+        headers={"Authorization": "Bearer default-key"}
+    )
+    assert response.status_code == 200
+    assert response.json()["succeeded"] == 3
+    assert {stage: stage_count(stage) - count for stage, count in before.items()} == {"analysis": 1, "serialization": 1}
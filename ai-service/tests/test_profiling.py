@@ -0,0 +1,70 @@
+"""Request profiles include the analysis a request offloads to the executor"""
+
+import os
+import pickle
+import pstats
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from executor import PROCESS, THREAD, AnalysisExecutor
+from profiling import ProfilingMiddleware, RequestProfiler, profiled_call, task_stats
+
+
+def offloaded_analysis(count: int) -> int:
+    return sum(index * index for index in range(count))
+
+
+def inline_analysis(count: int) -> int:
+    return count + 1
+
+
+def profiled_functions(profiler: RequestProfiler) -> set:
+    [profile] = profiler.list_profiles()
+    stats = pstats.Stats(os.path.join(profiler.directory, profile['name']))
+    return {function for _, _, function in stats.stats}
+
+
+def profiled_app(tmp_path, mode: str):
+    executor = AnalysisExecutor(mode=mode, max_workers=1, min_size=10)
+    profiler = RequestProfiler(str(tmp_path), header_enabled=True)
+    app = FastAPI()
+
+    @app.post("/analyze")
+    async def analyze():
+        offloaded = await executor.run(offloaded_analysis, 1000, size=100)
+        inline = await executor.run(inline_analysis, 1, size=1)
+        return {"offloaded": offloaded, "inline": inline}
+
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+    return TestClient(app), profiler, executor
+
+
+@pytest.mark.parametrize('mode', [THREAD, PROCESS])
+def test_profile_includes_offloaded_and_inline_work(tmp_path, mode):
+    client, profiler, executor = profiled_app(tmp_path, mode)
+    try:
+        response = client.post("/analyze", headers={"X-Profile": "true", "Authorization": "Bearer default-key"})
+    finally:
+        executor.shutdown()
+    assert response.json() == {"offloaded": offloaded_analysis(1000), "inline": 2}
+    functions = profiled_functions(profiler)
+    assert {'offloaded_analysis', 'inline_analysis', 'analyze'} <= functions
+
+
+def test_unprofiled_requests_leave_tasks_unprofiled(tmp_path):
+    client, profiler, executor = profiled_app(tmp_path, THREAD)
+    try:
+        response = client.post("/analyze", headers={"Authorization": "Bearer default-key"})
+    finally:
+        executor.shutdown()
+    assert response.status_code == 200
+    assert profiler.list_profiles() == []
+    assert task_stats() is None
+
+
+def test_profiled_call_returns_picklable_stats():
+    result, stats = profiled_call(offloaded_analysis, 10)
+    assert result == offloaded_analysis(10)
+    assert any(function == 'offloaded_analysis' for _, _, function in pickle.loads(pickle.dumps(stats)))
@@ -0,0 +1,47 @@
+"""The runners and serving.py import without gunicorn, which only production needs"""
+
+import subprocess
+import sys
+
+import pytest
+
+from conftest import SERVICE_DIR
+
+# Makes `import gunicorn` fail as it does where gunicorn is not installed
+WITHOUT_GUNICORN = """
+import sys
+
+class NoGunicorn:
+    def find_spec(self, name, path=None, target=None):
+        if name.split('.')[0] == 'gunicorn':
+            raise ModuleNotFoundError("No module named 'gunicorn'")
+
+sys.meta_path.insert(0, NoGunicorn())
+"""
+
+
+def run_without_gunicorn(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, '-c', WITHOUT_GUNICORN + code],
+        cwd=SERVICE_DIR, capture_output=True, text=True
+    )
+
+
+def test_serving_imports_without_gunicorn():
+    completed = run_without_gunicorn("import serving; print(hasattr(serving, 'AtmosUvicornWorker'))")
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip() == 'False'
+
+
+@pytest.mark.parametrize('runner', ['run.py', 'run-simple.py'])
+def test_runners_import_without_gunicorn(runner):
+    # Run as a module, not __main__, so no server starts
+    completed = run_without_gunicorn(f"import runpy; runpy.run_path({runner!r}, run_name='runner')")
+    assert completed.returncode == 0, completed.stderr
+
+
+def test_worker_class_is_defined_with_gunicorn():
+    pytest.importorskip('gunicorn')
+    import serving
+
+    assert serving.AtmosUvicornWorker.CONFIG_KWARGS['lifespan'] == 'on'
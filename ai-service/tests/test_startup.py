@@ -0,0 +1,56 @@
+"""`import main` stays within the cold-start budget and leaves models to their loaders"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import SERVICE_DIR
+
+sys.path.insert(0, os.path.join(SERVICE_DIR, 'benchmarks'))
+
+from startup_budget import HEAVY_MODULES, import_profile
+
+BUDGET_MS = float(os.getenv('AI_STARTUP_BUDGET_MS', 2000))
+
+REPORT = (
+    "import json, sys, main; "
+    "print(json.dumps({'modules': sorted(sys.modules), 'models': main.model_registry.status()}))"
+)
+
+
+@pytest.fixture(scope='module')
+def imported():
+    """Loaded modules and registry status right after `import main` in a new interpreter"""
+    completed = subprocess.run(
+        [sys.executable, '-c', REPORT],
+        cwd=SERVICE_DIR,
+        capture_output=True,
+        text=True,
+        # A model path that does not exist: registered, and failing only if something loads it
+        env={**os.environ, 'AI_RISK_MODEL_ENABLED': 'true', 'AI_RISK_MODEL_PATH': os.path.join(SERVICE_DIR, 'missing.npz')}
+    )
+    assert completed.returncode == 0, completed.stderr[-2000:]
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def test_import_finishes_within_the_budget():
+    # Best of three fresh interpreters, so one slow start on a busy machine does not fail the suite
+    import_ms = min(import_profile()['import_ms'] for _ in range(3))
+    assert 0 < import_ms <= BUDGET_MS, f"import main took {import_ms:.1f} ms, budget {BUDGET_MS:.0f} ms"
+
+
+def test_import_does_not_pull_in_heavy_libraries(imported):
+    heavy = sorted({name.split('.')[0] for name in imported['modules']} & set(HEAVY_MODULES))
+    assert heavy == []
+
+
+def test_registered_models_are_not_loaded_at_import(imported):
+    models = imported['models']
+    assert set(models) == {'decision_table', 'risk_model'}
+    assert {name: status['state'] for name, status in models.items()} == {
+        'decision_table': 'registered',
+        'risk_model': 'registered'
+    }
@@ -0,0 +1,196 @@
+"""VectorizedWeatherAnalyzer must classify every reading exactly as WeatherAnalyzer does"""
+
+import itertools
+import json
+import random
+
+import numpy as np
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from responses import dumps
+from vector_analyzer import FACTORS, RISK_LEVELS, VectorizedWeatherAnalyzer, extract_readings, is_numeric_reading
+from weather_features import WeatherFeatures
+
+ANALYZER = main.WeatherAnalyzer()
+VECTOR = VectorizedWeatherAnalyzer(ANALYZER)
+
+# (low, high) of the random readings per factor, wider than every threshold
+RANGES = ((-40, 130), (0, 100), (0, 14), (0, 400), (0, 80))
+# Thresholds per factor in FACTORS order
+THRESHOLDS = (
+    (ANALYZER.risk_factors['temperature']['hot'], ANALYZER.risk_factors['temperature']['cold']),
+    (ANALYZER.risk_factors['humidity']['high'], ANALYZER.risk_factors['humidity']['low']),
+    (ANALYZER.risk_factors['uv_index']['high'], ANALYZER.risk_factors['uv_index']['moderate']),
+    (ANALYZER.risk_factors['air_quality']['unhealthy'], ANALYZER.risk_factors['air_quality']['moderate']),
+    (ANALYZER.risk_factors['wind_speed']['high'], ANALYZER.risk_factors['wind_speed']['moderate'])
+)
+ANALYZER_METHODS = (
+    ANALYZER._analyze_temperature,
+    ANALYZER._analyze_humidity,
+    ANALYZER._analyze_uv_index,
+    ANALYZER._analyze_air_quality,
+    ANALYZER._analyze_wind
+)
+
+
+def boundary_values(factor: int) -> list:
+    """Each threshold of a factor, the nearest floats on either side, and a whole unit either side"""
+    values = []
+    for threshold in THRESHOLDS[factor]:
+        values += [
+            threshold - 1,
+            float(np.nextafter(threshold, -np.inf)),
+            threshold,
+            float(threshold),
+            float(np.nextafter(threshold, np.inf)),
+            threshold + 1
+        ]
+    return values
+
+
+def random_rows(count: int, seed: int) -> list:
+    rnd = random.Random(seed)
+    return [
+        tuple(rnd.choice((rnd.randint(int(low), int(high)), rnd.uniform(low, high))) for low, high in RANGES)
+        for _ in range(count)
+    ]
+
+
+def boundary_rows(seed: int) -> list:
+    """Every boundary value of each factor, with random readings for the other factors"""
+    rows = []
+    others = iter(random_rows(len(FACTORS) * 12, seed))
+    for factor in range(len(FACTORS)):
+        for value in boundary_values(factor):
+            row = list(next(others))
+            row[factor] = value
+            rows.append(tuple(row))
+    # Every factor on a boundary at once: a spread-out sample of all combinations
+    combinations = itertools.product(*(boundary_values(factor) for factor in range(len(FACTORS))))
+    rows += list(itertools.islice(combinations, 0, None, 997))
+    return rows
+
+
+ROWS = random_rows(2000, seed=1) + boundary_rows(seed=2)
+
+
+def assert_rows_match(rows: list) -> None:
+    classified = VECTOR.classify_readings(rows)
+    for index, row in enumerate(rows):
+        assessment = ANALYZER.assess(WeatherFeatures(*row))
+        codes = classified['conditions'][:, index].tolist()
+        assert tuple(codes) == VECTOR.condition_codes(row), row
+        for factor, code in enumerate(codes):
+            assert VECTOR.condition_results[factor][code].to_dict() == ANALYZER_METHODS[factor](row[factor]).to_dict(), (row, FACTORS[factor])
+            assert RISK_LEVELS[classified['risks'][factor, index]] == assessment.conditions()[factor].risk, (row, FACTORS[factor])
+        assert RISK_LEVELS[classified['overall_risk'][index]] == assessment.overall_risk.level, row
+
+
+def test_random_readings_match_scalar_analyzer():
+    assert_rows_match(random_rows(2000, seed=1))
+
+
+def test_threshold_boundaries_match_scalar_analyzer():
+    assert_rows_match(boundary_rows(seed=2))
+
+
+def test_classify_columns_match_classify_readings():
+    columns = VECTOR.classify(*np.array(ROWS, dtype=np.float64).T)
+    rows = VECTOR.classify_readings(ROWS)
+    for key in ('conditions', 'risks', 'overall_risk'):
+        assert np.array_equal(columns[key], rows[key])
+
+
+def strip_timestamps(analysis) -> dict:
+    """The analysis as JSON would carry it, without timestamps and derived comfort indices"""
+    # Comfort indices are derived readings, not part of classification
+    analysis = orjson.loads(dumps(analysis))
+    return {key: value for key, value in analysis.items() if key not in ('timestamp', 'comfort')}
+
+
+def current_of(row: tuple) -> dict:
+    temperature, humidity, uv_index, aqi, wind_speed = row
+    return {'temperature': temperature, 'humidity': humidity, 'uvIndex': uv_index,
+            'airQuality': {'aqi': aqi}, 'windSpeed': wind_speed}
+
+
+def test_analyze_many_matches_analyze_weather_conditions():
+    currents = [current_of(row) for row in ROWS[:500] + boundary_rows(seed=3)]
+    for current, analysis in zip(currents, VECTOR.analyze_many(currents)):
+        expected = ANALYZER.analyze_weather_conditions(main.WeatherData(current=current, forecast=[], hourly=[], alerts=[]))
+        assert strip_timestamps(analysis) == strip_timestamps(expected), current
+
+
+@pytest.mark.parametrize('missing', [(), ('temperature',), ('humidity', 'uvIndex'), ('airQuality',), ('windSpeed', 'temperature'),
+                                     ('temperature', 'humidity', 'uvIndex', 'airQuality', 'windSpeed')])
+def test_missing_fields_use_scalar_defaults(missing):
+    currents = []
+    for row in random_rows(50, seed=len(missing)):
+        current = current_of(row)
+        for key in missing:
+            del current[key]
+        currents.append(current)
+    currents.append({'airQuality': {}})
+    for current, analysis in zip(currents, VECTOR.analyze_many(currents)):
+        assert extract_readings(current) == WeatherFeatures.from_current(current).readings()
+        expected = ANALYZER.analyze_weather_conditions(main.WeatherData(current=current, forecast=[], hourly=[], alerts=[]))
+        assert strip_timestamps(analysis) == strip_timestamps(expected), current
+
+
+@pytest.mark.parametrize('factor', range(len(FACTORS)))
+def test_none_readings_are_routed_to_the_scalar_path(factor):
+    # The scalar analyzer cannot compare None with a threshold; callers must not vectorize such rows
+    row = list(random_rows(1, seed=factor)[0])
+    row[factor] = None
+    assert not all(is_numeric_reading(value) for value in row)
+    with pytest.raises(TypeError):
+        ANALYZER.assess(WeatherFeatures(*row))
+
+
+def test_batch_with_none_reading_fails_like_a_lone_request():
+    rows = random_rows(3, seed=4)
+    items = [{'weather_data': {'current': current_of(row), 'forecast': [], 'hourly': [], 'alerts': []}} for row in rows]
+    items[1]['weather_data']['current']['temperature'] = None
+    results = main.analyze_batch_items(items)
+    assert [result['success'] for result in results] == [True, False, True]
+    for row, result in zip((rows[0], rows[2]), (results[0], results[2])):
+        expected = ANALYZER.analyze_weather_conditions(main.WeatherData(current=current_of(row), forecast=[], hourly=[], alerts=[]))
+        assert strip_timestamps(result['data']['analysis']) == strip_timestamps(expected)
+
+
+@pytest.mark.parametrize('factor', range(len(FACTORS)))
+def test_ints_past_the_float_range_are_routed_to_the_scalar_path(factor):
+    row = list(random_rows(1, seed=factor)[0])
+    row[factor] = 10 ** 400
+    assert not all(is_numeric_reading(value) for value in row)
+    ANALYZER.assess(WeatherFeatures(*row))
+
+
+@pytest.mark.parametrize('field', ['temperature', 'humidity', 'uvIndex', 'windSpeed'])
+def test_batch_item_with_a_huge_int_is_answered_like_a_lone_request(field):
+    rows = random_rows(2, seed=5)
+    items = [{'weather_data': {'current': current_of(row), 'forecast': [], 'hourly': [], 'alerts': []}} for row in rows]
+    items[0]['weather_data']['current'][field] = -10 ** 400 if field == 'humidity' else 10 ** 400
+    headers = {'Authorization': 'Bearer default-key', 'Content-Type': 'application/json'}
+    with TestClient(main.app) as client:
+        # json.dumps: orjson cannot write such ints either
+        batch = client.post('/analyze-weather/batch', content=json.dumps({'items': items}), headers=headers)
+        single = client.post('/analyze-weather', content=json.dumps(items[0]), headers=headers)
+    assert batch.status_code == 200 and single.status_code == 200
+    assert [result['success'] for result in batch.json()['results']] == [True, True]
+    data = batch.json()['results'][0]['data']
+    assert strip_timestamps(data['analysis']) == strip_timestamps(single.json()['analysis'])
+    assert data['analysis']['comfort'] == single.json()['analysis']['comfort']
+
+
+def test_batch_with_invalid_json_is_rejected():
+    with TestClient(main.app) as client:
+        response = client.post(
+            '/analyze-weather/batch', content=b'{"items": [}',
+            headers={'Authorization': 'Bearer default-key', 'Content-Type': 'application/json'}
+        )
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['type'] == 'json_invalid'
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Train the AtmosAI risk model and export it for serving.
+
+Fits a scikit-learn pipeline (KBinsDiscretizer + LogisticRegression) on
+labelled observations and exports it to the NumPy-only `.npz` form read by
+risk_model.RiskModel, so the service never imports scikit-learn. Before
+saving, the exported model's probabilities are checked against the
+pipeline's on the holdout set, through both the batched and the
+single-reading path.
+
+Observations are a CSV with one row per reading and the columns
+temperature, humidity, uv_index, air_quality (the AQI), wind_speed and risk
+(low, moderate or high). Without labelled data, --bootstrap N samples N
+readings and labels them with the current thresholds; the resulting model
+only reproduces WeatherAnalyzer and is meant for trying out the pipeline.
+
+Requires requirements-ml.txt.
+
+Usage:
+    python train_risk_model.py --data observations.csv [--output models/risk_model.npz]
+        [--bins 32] [--regularization 1.0] [--test-size 0.2] [--seed 0]
+    python train_risk_model.py --bootstrap 50000
+"""
+
+import argparse
+import csv
+import logging
+import os
+import sys
+from typing import List, Tuple
+
+import numpy as np
+
+from risk_model import RiskModel
+from vector_analyzer import FACTORS, RISK_LEVELS
+
+SERVICE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(SERVICE_DIR, 'models', 'risk_model.npz')
+
+# Largest difference in any probability allowed between the pipeline and its export
+EXPORT_TOLERANCE = 1e-9
+
+# (low, high) of the uniform samples drawn by --bootstrap, per reading in FACTORS order
+BOOTSTRAP_RANGES = ((-10, 115), (5, 100), (0, 12), (0, 300), (0, 50))
+
+
+def load_observations(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Readings (n, 5) in FACTORS order and risk labels (n,) from a CSV"""
+    rows: List[List[float]] = []
+    labels: List[str] = []
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        missing = set(FACTORS + ('risk',)) - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"{path} is missing columns {sorted(missing)}")
+        for line, record in enumerate(reader, start=2):
+            label = record['risk'].strip().lower()
+            if label not in RISK_LEVELS:
+                raise ValueError(f"{path}:{line}: risk '{record['risk']}' is not one of {RISK_LEVELS}")
+            rows.append([float(record[factor]) for factor in FACTORS])
+            labels.append(label)
+    return np.array(rows, dtype=np.float64), np.array(labels)
+
+
+def bootstrap_observations(count: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Uniformly sampled readings labelled by the threshold analyzer"""
+    # Imported here: only bootstrapping needs the service's analyzers
+    from main import vector_analyzer
+
+    rng = np.random.default_rng(seed)
+    readings = np.column_stack([rng.uniform(low, high, count) for low, high in BOOTSTRAP_RANGES])
+    overall = vector_analyzer.classify_readings(readings)['overall_risk']
+    return readings, np.array(RISK_LEVELS)[overall]
+
+
+def export_pipeline(pipeline, name: str) -> RiskModel:
+    """RiskModel with the fitted bins and per-bin coefficients"""
+    binner = pipeline.named_steps['bins']
+    classifier = pipeline.named_steps['classifier']
+    # One-hot columns are grouped by reading, one column per bin
+    offsets = np.concatenate(([0], np.cumsum(binner.n_bins_)))
+    coefficients = classifier.coef_.T
+    return RiskModel(
+        edges=[edges[1:-1] for edges in binner.bin_edges_],
+        weights=[coefficients[start:end] for start, end in zip(offsets[:-1], offsets[1:])],
+        intercept=classifier.intercept_,
+        classes=[str(label) for label in classifier.classes_],
+        name=name
+    )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--data', help='CSV of labelled observations')
+    source.add_argument('--bootstrap', type=int, metavar='N', help='train on N readings labelled by the thresholds')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='where to write the exported model')
+    parser.add_argument('--name', default='risk-binned-logistic', help='model name recorded in the export')
+    parser.add_argument('--bins', type=int, default=32, help='quantile bins per reading')
+    parser.add_argument('--regularization', type=float, default=1.0, help='inverse regularization strength (C)')
+    parser.add_argument('--test-size', type=float, default=0.2, help='fraction held out for evaluation')
+    parser.add_argument('--max-iter', type=int, default=1000, help='solver iterations')
+    parser.add_argument('--seed', type=int, default=0, help='sampling and training seed')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import accuracy_score, classification_report, log_loss
+    from sklearn.model_selection import train_test_split
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import KBinsDiscretizer
+
+    if args.data:
+        readings, labels = load_observations(args.data)
+    else:
+        readings, labels = bootstrap_observations(args.bootstrap, args.seed)
+    print(f"{len(labels)} observations: " + ", ".join(f"{level} {int((labels == level).sum())}" for level in RISK_LEVELS))
+
+    train_x, test_x, train_y, test_y = train_test_split(
+        readings, labels, test_size=args.test_size, random_state=args.seed, stratify=labels
+    )
+    pipeline = Pipeline([
+        ('bins', KBinsDiscretizer(n_bins=args.bins, encode='onehot', strategy='quantile', subsample=200000, random_state=args.seed)),
+        ('classifier', LogisticRegression(C=args.regularization, max_iter=args.max_iter))
+    ])
+    pipeline.fit(train_x, train_y)
+
+    probabilities = pipeline.predict_proba(test_x)
+    predicted = pipeline.classes_[probabilities.argmax(axis=1)]
+    print(f"holdout accuracy {accuracy_score(test_y, predicted):.4f}, log loss {log_loss(test_y, probabilities, labels=pipeline.classes_):.4f}\n")
+    print(classification_report(test_y, predicted, labels=list(RISK_LEVELS), zero_division=0))
+
+    model = export_pipeline(pipeline, args.name)
+    columns = [RISK_LEVELS.index(label) for label in pipeline.classes_]
+    difference = np.abs(model.predict_proba(test_x)[:, columns] - probabilities).max()
+    for row, expected in zip(test_x[:1000], probabilities):
+        _, confidence = model.predict_one(row.tolist())
+        difference = max(difference, abs(confidence - expected.max()))
+    if difference > EXPORT_TOLERANCE:
+        print(f"FAIL: exported model differs from the pipeline by {difference:.3g}")
+        sys.exit(1)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    model.save(args.output)
+    print(f"Saved {model!r} to {args.output} (export matches the pipeline within {difference:.1g})")
+
+
+if __name__ == '__main__':
+    main_cli()
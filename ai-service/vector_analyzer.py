@@ -0,0 +1,208 @@
+"""
+Columnar weather classification for the AtmosAI AI Service.
+
+Classifies whole arrays of readings in one vectorized pass using the same
+thresholds as WeatherAnalyzer, so large batches avoid the per-reading
+if/elif chains of the scalar path.
+"""
+
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from weather_features import (
+    DEFAULT_AQI,
+    DEFAULT_HUMIDITY,
+    DEFAULT_TEMPERATURE,
+    DEFAULT_UV_INDEX,
+    DEFAULT_WIND_SPEED,
+    RiskAssessment,
+    WeatherAssessment
+)
+
+# Risk levels as stored in the int8 code arrays
+RISK_LEVELS = ('low', 'moderate', 'high')
+RISK_CODES = {level: code for code, level in enumerate(RISK_LEVELS)}
+LOW, MODERATE, HIGH = 0, 1, 2
+
+# Factor order used for the rows of the condition and risk arrays
+FACTORS = ('temperature', 'humidity', 'uv_index', 'air_quality', 'wind_speed')
+ANALYSIS_KEYS = WeatherAssessment.ANALYSIS_KEYS
+
+# Default readings used when a key is missing from `current`
+DEFAULT_READINGS = (DEFAULT_TEMPERATURE, DEFAULT_HUMIDITY, DEFAULT_UV_INDEX, DEFAULT_AQI, DEFAULT_WIND_SPEED)
+
+
+def _band(values: np.ndarray, upper: float, lower: float) -> np.ndarray:
+    """Code 1 above `upper`, 2 below `lower`, otherwise 0 (checked in that order)"""
+    return np.where(values > upper, 1, np.where(values < lower, 2, 0)).astype(np.int8)
+
+
+def _ladder(values: np.ndarray, high: float, moderate: float) -> np.ndarray:
+    """Code 2 at or above `high`, 1 at or above `moderate`, otherwise 0"""
+    return np.where(values >= high, 2, np.where(values >= moderate, 1, 0)).astype(np.int8)
+
+
+def _band_code(value: float, upper: float, lower: float) -> int:
+    if value > upper:
+        return 1
+    if value < lower:
+        return 2
+    return 0
+
+
+def _ladder_code(value: float, high: float, moderate: float) -> int:
+    if value >= high:
+        return 2
+    if value >= moderate:
+        return 1
+    return 0
+
+
+def extract_readings(current: Dict[str, Any]) -> tuple:
+    """Read the five classified values from `current` with the scalar path's defaults.
+
+    Same values as WeatherFeatures.from_current(current).readings(), without
+    building a record per row when whole batches are classified.
+    """
+    return (
+        current.get('temperature', DEFAULT_READINGS[0]),
+        current.get('humidity', DEFAULT_READINGS[1]),
+        current.get('uvIndex', DEFAULT_READINGS[2]),
+        current.get('airQuality', {}).get('aqi', DEFAULT_READINGS[3]),
+        current.get('windSpeed', DEFAULT_READINGS[4])
+    )
+
+
+def is_numeric_reading(value: Any) -> bool:
+    """True if the scalar path would compare `value` against numeric thresholds and a float64 array can hold it"""
+    if isinstance(value, float):
+        return True
+    # Ints past the float range are left to the scalar path, which compares them exactly
+    return isinstance(value, int) and -sys.float_info.max <= value <= sys.float_info.max
+
+
+class VectorizedWeatherAnalyzer:
+    """Array-at-a-time counterpart of WeatherAnalyzer.
+
+    Condition text is taken from the scalar analyzer itself by probing each
+    threshold bucket once, so both engines always return the same content.
+    """
+
+    def __init__(self, analyzer):
+        self.risk_factors = analyzer.risk_factors
+        rf = self.risk_factors
+
+        probes = (
+            (analyzer._analyze_temperature, self._band_probes(rf['temperature']['hot'], rf['temperature']['cold'])),
+            (analyzer._analyze_humidity, self._band_probes(rf['humidity']['high'], rf['humidity']['low'])),
+            (analyzer._analyze_uv_index, self._ladder_probes(rf['uv_index']['high'], rf['uv_index']['moderate'])),
+            (analyzer._analyze_air_quality, self._ladder_probes(rf['air_quality']['unhealthy'], rf['air_quality']['moderate'])),
+            (analyzer._analyze_wind, self._ladder_probes(rf['wind_speed']['high'], rf['wind_speed']['moderate']))
+        )
+        # condition_results[factor][code] is the scalar analyzer's ConditionResult for that bucket
+        self.condition_results = tuple(
+            tuple(method(value) for value in values) for method, values in probes
+        )
+        self.risk_table = np.array(
+            [[RISK_CODES[result.risk] for result in results] for results in self.condition_results],
+            dtype=np.int8
+        )
+        self.overall_recommendations = tuple(
+            analyzer._get_overall_recommendations(level) for level in RISK_LEVELS
+        )
+
+    @staticmethod
+    def _band_probes(upper: float, lower: float) -> tuple:
+        return ((upper + lower) / 2, upper + 1, lower - 1)
+
+    @staticmethod
+    def _ladder_probes(high: float, moderate: float) -> tuple:
+        return (moderate - 1, moderate, high)
+
+    def classify(
+        self,
+        temperature: Sequence[float],
+        humidity: Sequence[float],
+        uv_index: Sequence[float],
+        aqi: Sequence[float],
+        wind_speed: Sequence[float]
+    ) -> Dict[str, np.ndarray]:
+        """Classify equal-length arrays of readings.
+
+        Returns int8 arrays: `conditions` and `risks` with one row per factor
+        (shape (5, n), rows in FACTORS order) and `overall_risk` of shape (n,).
+        """
+        rf = self.risk_factors
+        temperature = np.asarray(temperature, dtype=np.float64)
+
+        conditions = np.empty((len(FACTORS), temperature.shape[0]), dtype=np.int8)
+        conditions[0] = _band(temperature, rf['temperature']['hot'], rf['temperature']['cold'])
+        conditions[1] = _band(np.asarray(humidity, dtype=np.float64), rf['humidity']['high'], rf['humidity']['low'])
+        conditions[2] = _ladder(np.asarray(uv_index, dtype=np.float64), rf['uv_index']['high'], rf['uv_index']['moderate'])
+        conditions[3] = _ladder(np.asarray(aqi, dtype=np.float64), rf['air_quality']['unhealthy'], rf['air_quality']['moderate'])
+        conditions[4] = _ladder(np.asarray(wind_speed, dtype=np.float64), rf['wind_speed']['high'], rf['wind_speed']['moderate'])
+
+        risks = np.empty_like(conditions)
+        for row in range(len(FACTORS)):
+            risks[row] = self.risk_table[row][conditions[row]]
+
+        high_count = (risks == HIGH).sum(axis=0)
+        moderate_count = (risks == MODERATE).sum(axis=0)
+        overall_risk = np.where(
+            high_count >= 2, HIGH,
+            np.where((high_count >= 1) | (moderate_count >= 3), MODERATE, LOW)
+        ).astype(np.int8)
+
+        return {
+            'conditions': conditions,
+            'risks': risks,
+            'overall_risk': overall_risk
+        }
+
+    def condition_codes(self, readings: Sequence[float]) -> tuple:
+        """Bucket a single reading tuple; the scalar twin of `classify`'s conditions"""
+        rf = self.risk_factors
+        temperature, humidity, uv_index, aqi, wind_speed = readings
+        return (
+            _band_code(temperature, rf['temperature']['hot'], rf['temperature']['cold']),
+            _band_code(humidity, rf['humidity']['high'], rf['humidity']['low']),
+            _ladder_code(uv_index, rf['uv_index']['high'], rf['uv_index']['moderate']),
+            _ladder_code(aqi, rf['air_quality']['unhealthy'], rf['air_quality']['moderate']),
+            _ladder_code(wind_speed, rf['wind_speed']['high'], rf['wind_speed']['moderate'])
+        )
+
+    def classify_readings(self, rows: Sequence[Sequence[float]]) -> Dict[str, np.ndarray]:
+        """Classify reading tuples in FACTORS order, e.g. WeatherFeatures.readings()"""
+        readings = np.array(rows, dtype=np.float64).reshape(-1, len(FACTORS))
+        return self.classify(*readings.T)
+
+    def classify_current(self, currents: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Classify a list of `current` dicts as sent in WeatherData"""
+        return self.classify_readings([extract_readings(current) for current in currents])
+
+    def build_analysis(self, condition_codes: Sequence[int], overall_risk: int) -> Dict[str, Any]:
+        """Materialize one row into the dict returned by analyze_weather_conditions"""
+        results = [
+            self.condition_results[row][code] for row, code in enumerate(condition_codes)
+        ]
+        risk = RiskAssessment(
+            level=RISK_LEVELS[overall_risk],
+            factors=[result.condition for result in results if result.risk != 'low'],
+            recommendations=self.overall_recommendations[overall_risk]
+        )
+        analysis = WeatherAssessment(results, risk).to_dict()
+        analysis['timestamp'] = datetime.now().isoformat()
+        return analysis
+
+    def analyze_many(self, currents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Vectorized equivalent of calling analyze_weather_conditions per item"""
+        classified = self.classify_current(currents)
+        conditions = classified['conditions'].T.tolist()
+        overall_risk = classified['overall_risk'].tolist()
+        return [
+            self.build_analysis(codes, overall)
+            for codes, overall in zip(conditions, overall_risk)
+        ]
@@ -0,0 +1,139 @@
+"""
+Typed weather features and analysis results for the AtmosAI AI Service.
+
+Every endpoint reads the same handful of values from WeatherData.current.
+WeatherFeatures extracts them once into a slotted record that analyzers and
+endpoints pass around; the result types below are converted to the JSON
+response shape only when a response is built (`to_dict`). This module has
+no third-party dependencies so both main.py and main-simple.py can use it.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+# Values used when a reading is missing from `current`
+DEFAULT_TEMPERATURE = 70
+DEFAULT_HUMIDITY = 50
+DEFAULT_UV_INDEX = 0
+DEFAULT_AQI = 0
+DEFAULT_WIND_SPEED = 0
+
+
+class WeatherFeatures:
+    """The readings analyzers classify, extracted once per request"""
+
+    __slots__ = ('temperature', 'humidity', 'uv_index', 'aqi', 'wind_speed', 'current')
+
+    def __init__(
+        self,
+        temperature: float = DEFAULT_TEMPERATURE,
+        humidity: float = DEFAULT_HUMIDITY,
+        uv_index: float = DEFAULT_UV_INDEX,
+        aqi: float = DEFAULT_AQI,
+        wind_speed: float = DEFAULT_WIND_SPEED,
+        current: Optional[Dict[str, Any]] = None
+    ):
+        self.temperature = temperature
+        self.humidity = humidity
+        self.uv_index = uv_index
+        self.aqi = aqi
+        self.wind_speed = wind_speed
+        self.current = current if current is not None else {}
+
+    @classmethod
+    def from_current(cls, current: Dict[str, Any]) -> 'WeatherFeatures':
+        return cls(
+            current.get('temperature', DEFAULT_TEMPERATURE),
+            current.get('humidity', DEFAULT_HUMIDITY),
+            current.get('uvIndex', DEFAULT_UV_INDEX),
+            current.get('airQuality', {}).get('aqi', DEFAULT_AQI),
+            current.get('windSpeed', DEFAULT_WIND_SPEED),
+            current
+        )
+
+    @property
+    def condition(self) -> str:
+        """Lower-cased main condition, e.g. 'rain'.
+
+        Read lazily: endpoints that never look at the condition do not fail
+        on a malformed `condition` object.
+        """
+        return self.current.get('condition', {}).get('main', '').lower()
+
+    def readings(self) -> tuple:
+        """(temperature, humidity, uv_index, aqi, wind_speed)"""
+        return (self.temperature, self.humidity, self.uv_index, self.aqi, self.wind_speed)
+
+    def __repr__(self) -> str:
+        return (
+            f"WeatherFeatures(temperature={self.temperature!r}, humidity={self.humidity!r}, "
+            f"uv_index={self.uv_index!r}, aqi={self.aqi!r}, wind_speed={self.wind_speed!r})"
+        )
+
+
+class ConditionResult:
+    """Classification of one factor, e.g. temperature -> hot / high risk"""
+
+    __slots__ = ('condition', 'risk', 'recommendations')
+
+    def __init__(self, condition: str, risk: str, recommendations: List[str]):
+        self.condition = condition
+        self.risk = risk
+        self.recommendations = recommendations
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'condition': self.condition,
+            'risk': self.risk,
+            'recommendations': list(self.recommendations)
+        }
+
+    def __repr__(self) -> str:
+        return f"ConditionResult(condition={self.condition!r}, risk={self.risk!r})"
+
+
+class RiskAssessment:
+    """Overall risk level combined from the per-factor results"""
+
+    __slots__ = ('level', 'factors', 'recommendations')
+
+    def __init__(self, level: str, factors: List[str], recommendations: List[str]):
+        self.level = level
+        self.factors = factors
+        self.recommendations = recommendations
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'level': self.level,
+            'factors': list(self.factors),
+            'recommendations': list(self.recommendations)
+        }
+
+
+class WeatherAssessment:
+    """All per-factor results plus the overall risk for one set of readings"""
+
+    __slots__ = ('temperature', 'humidity', 'uv_index', 'air_quality', 'wind', 'overall_risk')
+
+    # Response keys, in the order analyze_weather_conditions has always used
+    ANALYSIS_KEYS = (
+        'temperature_analysis',
+        'humidity_analysis',
+        'uv_analysis',
+        'air_quality_analysis',
+        'wind_analysis'
+    )
+
+    def __init__(self, conditions: Sequence[ConditionResult], overall_risk: RiskAssessment):
+        self.temperature, self.humidity, self.uv_index, self.air_quality, self.wind = conditions
+        self.overall_risk = overall_risk
+
+    def conditions(self) -> tuple:
+        return (self.temperature, self.humidity, self.uv_index, self.air_quality, self.wind)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The analyze_weather_conditions response shape, without the timestamp"""
+        analysis = {
+            key: result.to_dict() for key, result in zip(self.ANALYSIS_KEYS, self.conditions())
+        }
+        analysis['overall_risk'] = self.overall_risk.to_dict()
+        return analysis
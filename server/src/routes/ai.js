@@ -9,6 +9,9 @@ const router = express.Router();
 const AI_SERVICE_URL = process.env.AI_SERVICE_URL || 'http://localhost:8000';
 // Default to the AI service's default key so local dev works out of the box
 const AI_SERVICE_API_KEY = process.env.AI_SERVICE_API_KEY || 'default-key';
+// Give up and use the fallback instead of waiting indefinitely; an overloaded AI service
+// answers 429/503 with Retry-After right away, which also ends in the fallback
+const AI_SERVICE_TIMEOUT_MS = parseInt(process.env.AI_SERVICE_TIMEOUT_MS, 10) || 10000;
 
 // @route   POST /api/ai/analyze-weather
 // @desc    Get AI weather analysis and recommendations
@@ -33,7 +36,8 @@ router.post('/analyze-weather', optionalAuth, async (req, res) => {
       headers: {
         'Authorization': `Bearer ${AI_SERVICE_API_KEY}`,
         'Content-Type': 'application/json'
-      }
+      },
+      timeout: AI_SERVICE_TIMEOUT_MS
     });
     
     res.json({
@@ -93,7 +97,8 @@ router.post('/generate-alerts', optionalAuth, async (req, res) => {
       headers: {
         'Authorization': `Bearer ${AI_SERVICE_API_KEY}`,
         'Content-Type': 'application/json'
-      }
+      },
+      timeout: AI_SERVICE_TIMEOUT_MS
     });
     
     res.json({
@@ -166,7 +171,8 @@ router.post('/event-recommendations', optionalAuth, async (req, res) => {
       headers: {
         'Authorization': `Bearer ${AI_SERVICE_API_KEY}`,
         'Content-Type': 'application/json'
-      }
+      },
+      timeout: AI_SERVICE_TIMEOUT_MS
     });
     
     res.json({
@@ -226,7 +232,8 @@ router.post('/health-insights', optionalAuth, async (req, res) => {
       headers: {
         'Authorization': `Bearer ${AI_SERVICE_API_KEY}`,
         'Content-Type': 'application/json'
-      }
+      },
+      timeout: AI_SERVICE_TIMEOUT_MS
     });
     
     res.json({